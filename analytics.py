@@ -0,0 +1,135 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from compact_graph import CompactGraph
+from scc import SCCResult
+from closure_cache import bits_from_ids, popcount
+
+
+class WeightMasks:
+    """
+    Весовая функция над битовыми множествами в «побитовом» разложении
+
+    Для каждого разряда b весов хранится маска вершин, у которых этот разряд
+    установлен; сумма весов множества X равна сумме popcount(X & mask_b) << b.
+    Так суммирование по замыканию выполняется несколькими операциями над
+    целыми числами вместо обхода всех его элементов.
+    """
+
+    def __init__(self, weights: Sequence[int]):
+        self.masks: List[Tuple[int, int]] = []
+        max_weight = max(weights, default=0)
+        for bit in range(max_weight.bit_length()):
+            mask = bits_from_ids(node_id for node_id, weight in enumerate(weights) if weight >> bit & 1)
+            if mask:
+                self.masks.append((bit, mask))
+
+    def total(self, bits: int) -> int:
+        """Сумма весов вершин множества"""
+        return sum(popcount(bits & mask) << bit for bit, mask in self.masks)
+
+
+def analyze_repository(graph: CompactGraph, components: SCCResult,
+                       sizes: Optional[Sequence[int]] = None) -> List[Dict]:
+    """
+    Метрики всех пакетов репозитория за два прохода по графу компонент
+
+    Замыкания вычисляются одновременно для всех пакетов: компонента сильной
+    связности получает битовое множество своих вершин, объединённое (ИЛИ) с
+    множествами компонент, от которых она зависит, в топологическом порядке.
+    Множество освобождается, как только обработаны все зависящие от него
+    компоненты, поэтому в памяти находится только «фронт» обхода. Обратные
+    замыкания (транзитивные зависимые) считаются так же в обратном порядке.
+
+    Args:
+        graph: Полный граф репозитория
+        components: Компоненты сильной связности этого графа
+        sizes: Установленный размер каждого пакета (поле 'I') по идентификаторам графа
+
+    Returns:
+        List[Dict]: Для каждого пакета с записью в репозитории: package,
+        dependencies (число транзитивных зависимостей), installed_size (сумма 'I'
+        по замыканию, включая сам пакет), size, max_depth (длина самой длинной
+        цепочки зависимостей; цикл считается одним уровнем), fan_in (число прямых
+        зависимых пакетов), transitive_fan_in, in_cycle
+    """
+    node_count = len(graph)
+    if sizes is None:
+        sizes = [0] * node_count
+    condensed = components.condensation()
+    members = components.components
+    component_count = len(members)
+    weights = WeightMasks(sizes)
+
+    closure_size = array('q', bytes(8 * node_count))
+    installed = array('q', bytes(8 * node_count))
+    depth = array('i', bytes(4 * component_count))
+
+    # Прямой проход: зависимости (с меньшими номерами компонент) обработаны раньше
+    reverse_condensed = condensed.transpose()
+    pending = array('i', (len(reverse_condensed.successors(component_id)) for component_id in range(component_count)))
+    closures: Dict[int, int] = {}
+    for component_id in range(component_count):
+        bits = _component_bits(members[component_id])
+        component_depth = 0
+        for successor in condensed.successors(component_id):
+            bits |= closures[successor]
+            component_depth = max(component_depth, depth[successor] + 1)
+            pending[successor] -= 1
+            if not pending[successor]:
+                del closures[successor]
+        depth[component_id] = component_depth
+
+        count = popcount(bits) - 1
+        total = weights.total(bits)
+        for node_id in members[component_id]:
+            closure_size[node_id] = count
+            installed[node_id] = total
+        if pending[component_id]:
+            closures[component_id] = bits
+
+    # Обратный проход: зависящие компоненты (с большими номерами) обработаны раньше
+    transitive_fan_in = array('q', bytes(8 * node_count))
+    pending = array('i', (len(condensed.successors(component_id)) for component_id in range(component_count)))
+    closures = {}
+    for component_id in range(component_count - 1, -1, -1):
+        bits = _component_bits(members[component_id])
+        for dependent in reverse_condensed.successors(component_id):
+            bits |= closures[dependent]
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                del closures[dependent]
+
+        count = popcount(bits) - 1
+        for node_id in members[component_id]:
+            transitive_fan_in[node_id] = count
+        if pending[component_id]:
+            closures[component_id] = bits
+
+    reverse = graph.transpose()
+    names, has_record = graph.names, graph.has_record
+    results = []
+    for node_id in range(node_count):
+        if not has_record[node_id]:
+            continue
+        component_id = components.component_of[node_id]
+        results.append({
+            'package': names[node_id],
+            'dependencies': closure_size[node_id],
+            'installed_size': installed[node_id],
+            'size': sizes[node_id],
+            'max_depth': depth[component_id],
+            'fan_in': reverse.offsets[node_id + 1] - reverse.offsets[node_id],
+            'transitive_fan_in': transitive_fan_in[node_id],
+            'in_cycle': components.is_cyclic(component_id)
+        })
+    return results
+
+
+def _component_bits(component: List[int]) -> int:
+    """Битовое множество вершин компоненты (большинство компонент - один пакет)"""
+    return 1 << component[0] if len(component) == 1 else bits_from_ids(component)
+
+
+def rank_packages(metrics: Iterable[Dict], key: str = 'installed_size') -> List[Dict]:
+    """Сортирует метрики по убыванию показателя (при равенстве - по числу зависимостей и имени)"""
+    return sorted(metrics, key=lambda item: (-item[key], -item['dependencies'], item['package']))
@@ -1,18 +1,34 @@
-import urllib.request
-import urllib.error
-import re
-from typing import List, Dict
-import gzip
-import io
+from typing import List, Dict, Optional, Iterator, BinaryIO, TYPE_CHECKING
 import os
+import threading
+from repository_index import RepositoryIndex, VERSION_SPLIT_RE, dependency_specs
+from apkindex_reader import iter_index_records
+from profiler import PROFILER, span, count
+from compact_graph import is_graph_store
+
+if TYPE_CHECKING:
+    # Хранилище графа (mmap, struct) открывается только при repository_url *.apkgraph
+    from graph_store import MappedGraph
+    # Кэш индекса (hashlib, pickle) нужен только в реальном режиме и передаётся извне
+    from index_cache import IndexCache
 
 class APKParser:
     """Парсер для извлечения зависимостей APK пакетов Alpine Linux"""
     
-    def __init__(self, repository_url: str, test_mode: bool = False):
+    def __init__(self, repository_url: str, test_mode: bool = False,
+                 index: Optional[RepositoryIndex] = None, arch: str = "x86_64",
+                 cache: Optional['IndexCache'] = None):
         self.repository_url = repository_url.rstrip('/')
         self.test_mode = test_mode
         self.package_cache = {}
+        self.index = index
+        self.arch = arch
+        self.cache = cache
+        # Файл хранилища графа (.apkgraph) используется вместо индекса: граф уже разрешён
+        self.uses_store = is_graph_store(self.repository_url)
+        self.store: Optional['MappedGraph'] = None
+        # Индекс может запрашиваться одновременно из нескольких потоков сервера
+        self._index_lock = threading.Lock()
     
     def get_package_dependencies(self, package_name: str) -> List[str]:
         """
@@ -25,6 +41,8 @@ class APKParser:
             List[str]: Список прямых зависимостей
         """
         try:
+            if self.uses_store:
+                return self._get_store_dependencies(package_name)
             if self.test_mode:
                 return self._get_test_dependencies(package_name)
             else:
@@ -33,15 +51,30 @@ class APKParser:
         except Exception as e:
             raise RuntimeError(f"Ошибка при получении зависимостей: {e}")
     
+    def get_all_dependencies(self) -> Dict[str, List[str]]:
+        """
+        Возвращает прямые зависимости всех пакетов индекса
+        
+        Returns:
+            Dict[str, List[str]]: Полный граф репозитория {пакет: [зависимости]}
+        """
+        if self.uses_store:
+            return self.get_store().as_dict_view()
+        index = self.get_index()
+        return {package: self.get_record_dependencies(record) for package, record in index.packages.items()}
+    
+    def get_record_dependencies(self, package_info: Dict[str, str]) -> List[str]:
+        """Прямые зависимости по записи индекса (без вывода и без обращения к кэшу пакетов)"""
+        if self.test_mode:
+            return package_info['D'].split()
+        return self._extract_dependencies(package_info)
+    
     def _get_real_dependencies(self, package_name: str) -> List[str]:
         """Получает зависимости из реального репозитория"""
         print(f"🔍 Поиск информации о пакете: {package_name}")
         
-        # Получаем индекс пакетов
-        packages_index = self._fetch_packages_index()
-        
-        # Ищем информацию о конкретном пакете
-        package_info = self._find_package_info(packages_index, package_name)
+        # Индекс загружается один раз и далее используется из памяти
+        package_info = self.get_index().get(package_name)
         
         if not package_info:
             raise ValueError(f"Пакет '{package_name}' не найден в репозитории")
@@ -55,91 +88,115 @@ class APKParser:
         if package_name in self.package_cache:
             return self.package_cache[package_name]
         
-        # Читаем тестовый файл
-        if not os.path.exists(self.repository_url):
-            raise FileNotFoundError(f"Тестовый файл {self.repository_url} не найден")
+        # Файл разбирается один раз в общий индекс, далее - поиск по словарю
+        package_info = self.get_index().get(package_name)
+        
+        if package_info is None:
+            raise ValueError(f"Пакет '{package_name}' не найден в тестовом репозитории")
         
-        with open(self.repository_url, 'r', encoding='utf-8') as f:
-            content = f.read()
+        deps = package_info['D'].split()
+        self.package_cache[package_name] = deps
+        return deps
+    
+    def _get_store_dependencies(self, package_name: str) -> List[str]:
+        """Получает зависимости из хранилища графа"""
+        store = self.get_store()
+        node_id = store.node_id(package_name)
         
-        # Ищем зависимости для пакета (формат: A: B C D)
-        lines = content.split('\n')
-        for line in lines:
-            if line.startswith(f"{package_name}:"):
-                deps = line.split(':', 1)[1].strip().split()
-                self.package_cache[package_name] = deps
-                return deps
+        if node_id is None or not store.has_record[node_id]:
+            raise ValueError(f"Пакет '{package_name}' не найден в хранилище графа")
         
-        raise ValueError(f"Пакет '{package_name}' не найден в тестовом репозитории")
+        names = store.names
+        return [names[target] for target in store.successors(node_id)]
+    
+    def get_store(self) -> 'MappedGraph':
+        """Возвращает хранилище графа, открывая файл при первом обращении"""
+        if self.store is None:
+            with self._index_lock:
+                if self.store is None:
+                    from graph_store import open_graph_store
+                    self.store = open_graph_store(self.repository_url)
+        return self.store
     
-    def _fetch_packages_index(self) -> str:
-        """Загружает индекс пакетов из репозитория"""
-        index_url = f"{self.repository_url}/x86_64/APKINDEX.tar.gz"
+    def get_index(self) -> RepositoryIndex:
+        """
+        Возвращает индекс пакетов репозитория, загружая его при первом обращении
+        
+        Returns:
+            RepositoryIndex: Индекс пакетов (общий для всех запросов парсера)
+        """
+        if self.index is None:
+            with self._index_lock:
+                if self.index is None:
+                    self.index = self._load_index()
+        return self.index
+    
+    def _load_index(self) -> RepositoryIndex:
+        """Загружает индекс из тестового файла, локального кэша или из сети"""
+        if self.uses_store:
+            raise RuntimeError("Хранилище графа не содержит индекса пакетов: пересоберите его через --build-store")
+        with span('index.load'):
+            index = self._read_index()
+        count('index.parses')
+        count('index.packages', len(index))
+        return index
+    
+    def _read_index(self) -> RepositoryIndex:
+        """Читает индекс из источника, соответствующего режиму работы"""
+        if self.test_mode:
+            if not os.path.exists(self.repository_url):
+                raise FileNotFoundError(f"Тестовый файл {self.repository_url} не найден")
+            with span('index.parse'):
+                return RepositoryIndex.from_test_file(self.repository_url)
+        if self.cache is not None:
+            # Снимок из локального кэша, перепроверяемый через ETag/Last-Modified
+            return self.cache.get_index(self.repository_url, self.arch, self._parse_index_stream)
+        with span('index.parse'):
+            return RepositoryIndex(self._fetch_index_records())
+    
+    def _fetch_index_records(self) -> Iterator[Dict[str, str]]:
+        """Загружает индекс пакетов из репозитория, возвращая записи по мере распаковки"""
+        # Сетевой стек загружается только в реальном режиме (быстрый запуск тестового режима)
+        import urllib.request
+        import urllib.error
+        
+        index_url = f"{self.repository_url}/{self.arch}/APKINDEX.tar.gz"
         
         print(f"📥 Загрузка индекса пакетов: {index_url}")
         
         try:
             with urllib.request.urlopen(index_url) as response:
-                compressed_data = response.read()
-            
-            # Распаковываем gzip с обработкой бинарных данных
-            with gzip.open(io.BytesIO(compressed_data), 'rb') as f:
-                decompressed_data = f.read()
-            
-            # Пробуем разные кодировки
-            try:
-                return decompressed_data.decode('utf-8')
-            except UnicodeDecodeError:
-                # Если utf-8 не работает, пробуем latin-1
-                return decompressed_data.decode('latin-1')
-                
+                # Разбор идёт параллельно с загрузкой: архив читается потоково
+                yield from iter_index_records(PROFILER.wrap_reader(response, 'index.download', 'bytes_fetched'))
         except urllib.error.HTTPError as e:
             raise ConnectionError(f"Не удалось загрузить индекс пакетов: {e.code} {e.reason}")
-        except gzip.BadGzipFile:
-            raise ValueError("Загруженный файл не является корректным gzip архивом")
     
-    def _find_package_info(self, packages_index: str, package_name: str) -> Dict[str, str]:
-        """
-        Ищет информацию о конкретном пакете в индексе
-        """
-        # Разбиваем индекс на пакеты (разделитель - пустая строка)
-        packages = packages_index.strip().split('\n\n')
-        
-        for package_block in packages:
-            package_info = self._parse_package_block(package_block)
-            if package_info.get('P') == package_name:
-                return package_info
-        
-        return {}
-    
-    def _parse_package_block(self, package_block: str) -> Dict[str, str]:
-        """Парсит блок информации о пакете"""
-        info = {}
-        lines = package_block.split('\n')
-        
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                info[key.strip()] = value.strip()
-        
-        return info
+    def _parse_index_stream(self, fileobj: BinaryIO) -> RepositoryIndex:
+        """Строит индекс из потока с архивом APKINDEX.tar.gz"""
+        with span('index.parse'):
+            return RepositoryIndex(iter_index_records(fileobj))
     
     def _extract_dependencies(self, package_info: Dict[str, str]) -> List[str]:
         """
         Извлекает зависимости из информации о пакете
+        
+        Виртуальные зависимости (so:, cmd:, pc:, имена из поля 'p') заменяются
+        пакетами-поставщиками из индекса с учётом ограничений версий,
+        конфликты ('!pkg') пропускаются.
         """
         dependencies = []
         
-        # Зависимости хранятся в поле 'D'
-        if 'D' in package_info and package_info['D']:
-            dep_string = package_info['D']
-            # Зависимости разделены пробелами, могут содержать версии
-            raw_deps = dep_string.split()
+        # Зависимости хранятся в поле 'D', конфликты отбрасываются
+        for dep in dependency_specs(package_info):
+            # Имя без ограничения версии (всё что после =, <, >, ~)
+            clean_dep = VERSION_SPLIT_RE.split(dep, 1)[0]
+            if not clean_dep:
+                continue
+            if self.index is not None:
+                # Неразрешённое имя оставляем как есть, чтобы отсутствующая зависимость была видна в графе
+                clean_dep = self.index.resolve(dep) or clean_dep
             
-            for dep in raw_deps:
-                # Убираем информацию о версиях (всё что после =, <, >, ~)
-                clean_dep = re.split(r'[=<>~]', dep)[0]
-                if clean_dep and clean_dep not in dependencies:
-                    dependencies.append(clean_dep)
+            if clean_dep != package_info.get('P') and clean_dep not in dependencies:
+                dependencies.append(clean_dep)
         
-        return dependencies
\ No newline at end of file
+        return dependencies
@@ -0,0 +1,138 @@
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Версия apk: числа через точку, необязательная буква, суффиксы (_rc1, _p2) и ревизия (-r3)
+VERSION_RE = re.compile(
+    r'^(?P<numbers>\d+(?:\.\d+)*)(?P<letter>[a-z]?)'
+    r'(?P<suffixes>(?:_(?:alpha|beta|pre|rc|cvs|svn|git|hg|p)\d*)*)'
+    r'(?:-r(?P<revision>\d+))?$'
+)
+SUFFIX_RE = re.compile(r'_(alpha|beta|pre|rc|cvs|svn|git|hg|p)(\d*)')
+
+# Порядок суффиксов как в apk-tools: предварительные версии меньше версии без суффикса
+SUFFIX_ORDER = {'alpha': 0, 'beta': 1, 'pre': 2, 'rc': 3, 'cvs': 5, 'svn': 6, 'git': 7, 'hg': 8, 'p': 9}
+NO_SUFFIX = (4, 0)
+
+# Ограничение версии в зависимости: pkg>=1.2, so:libfoo.so.1=1, pkg~3.1
+CONSTRAINT_RE = re.compile(r'^(?P<name>[^=<>~]+)(?:(?P<op>[<>=~]{1,2})(?P<version>.+))?$')
+CONSTRAINT_OPS = {'=', '==', '<', '<=', '>', '>=', '~', '~=', '><'}
+
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> tuple:
+    """
+    Ключ сравнения версии, совместимый с порядком apk
+
+    1.2 < 1.2.1 < 1.2.1a < 1.3_rc1 < 1.3 < 1.3-r1 < 1.3_p1; строки, не
+    соответствующие формату apk, сравниваются как строки и считаются
+    меньше любой корректной версии. Ключи кэшируются.
+    """
+    match = VERSION_RE.match(version)
+    if match is None:
+        return (0, version)
+
+    numbers = tuple(int(part) for part in match.group('numbers').split('.'))
+    letter = ord(match.group('letter')) if match.group('letter') else 0
+    suffixes = tuple((SUFFIX_ORDER[name], int(number or 0))
+                     for name, number in SUFFIX_RE.findall(match.group('suffixes')))
+    revision = int(match.group('revision') or 0)
+    return (1, numbers, letter, suffixes + (NO_SUFFIX,), revision)
+
+
+def compare_versions(left: str, right: str) -> int:
+    """Сравнивает версии: -1, 0 или 1"""
+    left_key, right_key = version_key(left), version_key(right)
+    return (left_key > right_key) - (left_key < right_key)
+
+
+def parse_dependency(dependency: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Разбирает зависимость из поля 'D'
+
+    Returns:
+        Tuple[str, Optional[str], Optional[str]]: (имя, оператор, версия);
+        оператор и версия - None, если ограничения нет или оно не распознано
+    """
+    match = CONSTRAINT_RE.match(dependency)
+    if match is None:
+        return dependency, None, None
+    op = match.group('op')
+    if op not in CONSTRAINT_OPS:
+        return match.group('name'), None, None
+    return match.group('name'), op, match.group('version')
+
+
+def satisfies(version: Optional[str], op: Optional[str], required: Optional[str]) -> bool:
+    """Проверяет, удовлетворяет ли версия ограничению (без ограничения - всегда)"""
+    if op is None:
+        return True
+    if version is None:
+        # Версия не указана (например, виртуальное имя без '=') - ограничение не выполняется
+        return False
+    if op in ('~', '~='):
+        return fuzzy_match(version, required)
+    if op == '><':
+        return True
+
+    result = compare_versions(version, required)
+    if op in ('=', '=='):
+        return result == 0
+    if op == '<':
+        return result < 0
+    if op == '<=':
+        return result <= 0
+    if op == '>':
+        return result > 0
+    return result >= 0
+
+
+def fuzzy_match(version: str, required: str) -> bool:
+    """Нечёткое совпадение '~': версия начинается с required по границе компонента"""
+    if not version.startswith(required):
+        return False
+    rest = version[len(required):]
+    return not rest or not rest[0].isdigit()
+
+
+def best_match(keys: List[tuple], op: Optional[str], required: Optional[str],
+               versions: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Индекс наибольшей версии, удовлетворяющей ограничению
+
+    Args:
+        keys: Ключи version_key, отсортированные по возрастанию
+        op: Оператор ограничения (None - без ограничения)
+        required: Версия в ограничении
+        versions: Строки версий в том же порядке (нужны только для '~')
+
+    Returns:
+        Optional[int]: Позиция в списке или None, если подходящей версии нет
+    """
+    if not keys:
+        return None
+    if op is None or op == '><':
+        return len(keys) - 1
+
+    required_key = version_key(required)
+    if op in ('>', '>='):
+        # Наибольшая версия подходит, если подходит хоть одна
+        last = len(keys) - 1
+        return last if (keys[last] > required_key or (op == '>=' and keys[last] == required_key)) else None
+    if op == '<':
+        position = bisect_left(keys, required_key) - 1
+    elif op == '<=':
+        position = bisect_right(keys, required_key) - 1
+    elif op in ('=', '=='):
+        position = bisect_right(keys, required_key) - 1
+        if position >= 0 and keys[position] != required_key:
+            position = -1
+    else:
+        # '~': подходящие версии идут подряд начиная с required
+        position = -1
+        for candidate in range(bisect_left(keys, required_key), len(keys)):
+            if not fuzzy_match(versions[candidate], required):
+                break
+            position = candidate
+    return position if position >= 0 else None
@@ -0,0 +1,146 @@
+import re
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Pattern, Tuple
+from profiler import PROFILER
+
+# Поля, нужные для разрешения зависимостей ('P', 'V', 'D', 'p', 'k'), аналитики ('I')
+# и сравнения версий индекса ('C'); остальные поля APKINDEX пропускаются
+INDEX_FIELDS = ('C', 'P', 'V', 'D', 'p', 'I', 'k')
+
+# Размер порции распакованного индекса для выборочного разбора
+SCAN_CHUNK_SIZE = 1 << 20
+
+
+def iter_index_records(fileobj: BinaryIO,
+                       fields: Optional[Iterable[str]] = INDEX_FIELDS) -> Iterator[Dict[str, str]]:
+    """
+    Потоково читает архив APKINDEX.tar.gz и возвращает записи о пакетах по одной
+
+    Архив может состоять из нескольких склеенных gzip-потоков (сегмент подписи
+    .SIGN.* и основной tar с DESCRIPTION и APKINDEX), поэтому распаковка идёт
+    через GzipFile, а tar читается в потоковом режиме. В памяти одновременно
+    находится только текущая порция индекса.
+
+    Args:
+        fileobj: Бинарный поток с архивом (например, HTTP-ответ)
+        fields: Извлекаемые поля записи (None - все поля)
+
+    Yields:
+        Dict[str, str]: Поля записи о пакете
+    """
+    # Модули распаковки нужны только для реального индекса: тестовый режим их не загружает
+    import gzip
+    import tarfile
+    import zlib
+    
+    try:
+        with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+            # Время распаковки включает время чтения сжатого потока
+            with tarfile.open(fileobj=PROFILER.wrap_reader(gz, 'index.decompress'), mode='r|') as tar:
+                for member in tar:
+                    if member.isfile() and member.name == 'APKINDEX':
+                        stream = tar.extractfile(member)
+                        if fields is None:
+                            yield from iter_records(stream)
+                        else:
+                            yield from scan_records(stream, fields)
+    except (gzip.BadGzipFile, zlib.error, EOFError):
+        raise ValueError("Загруженный файл не является корректным gzip архивом")
+    except tarfile.TarError as e:
+        raise ValueError(f"Некорректный tar-архив индекса: {e}")
+
+
+def iter_records(lines: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """
+    Разбирает текст APKINDEX построчно, возвращая записи по мере их завершения
+
+    Args:
+        lines: Строки индекса в байтах (блоки разделены пустой строкой)
+
+    Yields:
+        Dict[str, str]: Поля записи о пакете
+    """
+    info = {}
+
+    for raw_line in lines:
+        line = _decode_line(raw_line).strip()
+
+        if not line:
+            if info:
+                yield info
+                info = {}
+            continue
+
+        if ':' in line:
+            key, value = line.split(':', 1)
+            info[key.strip()] = value.strip()
+
+    if info:
+        yield info
+
+
+def scan_records(stream: BinaryIO, fields: Iterable[str] = INDEX_FIELDS) -> Iterator[Dict[str, str]]:
+    """
+    Выборочно разбирает APKINDEX в байтах, извлекая только заданные поля
+
+    Индекс читается порциями, обрезанными по границе блока; строки нужных
+    полей и пустые строки-разделители находятся одним регулярным выражением
+    за проход по порции, так что остальные строки не разбиваются и не
+    декодируются. Декодируются только значения извлечённых полей.
+
+    Args:
+        stream: Распакованный текст индекса (файловый объект в байтах)
+        fields: Извлекаемые поля ('P' должно входить в набор, чтобы запись попала в индекс)
+
+    Yields:
+        Dict[str, str]: Запись, содержащая только заданные поля
+    """
+    pattern, keys = _field_pattern(tuple(fields))
+    tail = b''
+
+    while True:
+        chunk = stream.read(SCAN_CHUNK_SIZE)
+        data = tail + chunk
+        if chunk:
+            # Разбираем только целые блоки, остаток переносим в следующую порцию
+            cut = data.rfind(b'\n\n')
+            if cut < 0:
+                tail = data
+                continue
+            tail = data[cut + 2:]
+            data = data[:cut + 1]
+
+        info = {}
+        for key, value in pattern.findall(b'\n' + data):
+            if key:
+                info[keys[key]] = value.strip().decode('utf-8', 'replace')
+            elif info:
+                yield info
+                info = {}
+        if info:
+            yield info
+
+        if not chunk:
+            return
+
+
+@lru_cache(maxsize=16)
+def _field_pattern(fields: Tuple[str, ...]) -> Tuple[Pattern[bytes], Dict[bytes, str]]:
+    """
+    Регулярное выражение для строк заданных полей и пустых строк-разделителей
+
+    Шаблон начинается с литерала перевода строки, поэтому поиск переходит
+    от строки к строке без проверки каждой позиции; строки остальных полей
+    отбрасываются по первому символу.
+    """
+    keys = {field.encode('utf-8'): field for field in fields}
+    alternatives = b'|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True))
+    return re.compile(rb'\n(?:(' + alternatives + rb'):(.*)|(?=\n))'), keys
+
+
+def _decode_line(raw_line: bytes) -> str:
+    """Декодирует строку индекса (utf-8, при ошибке - latin-1)"""
+    try:
+        return raw_line.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw_line.decode('latin-1')
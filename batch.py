@@ -0,0 +1,93 @@
+import json
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+from closure_cache import iter_bits
+from dependency_graph import DependencyGraph
+
+
+class BatchResolver:
+    """
+    Пакетное вычисление транзитивных зависимостей для многих корневых пакетов
+
+    Все запросы используют один индекс репозитория, один полный граф и общий
+    кэш замыканий DependencyGraph. Полные замыкания вычисляются на
+    конденсированном графе компонент сильной связности и кэшируются по
+    компонентам, поэтому общие подграфы (musl, busybox, openssl) обходятся
+    один раз за весь пакет запросов.
+
+    Замыкание считается полным (без ограничения max_depth): это весь набор
+    пакетов, который будет установлен вместе с корневым.
+    """
+
+    def __init__(self, graph_builder: DependencyGraph):
+        self.graph_builder = graph_builder
+
+    def closure(self, package_name: str) -> int:
+        """Транзитивное замыкание пакета (включая сам пакет) в виде битового множества"""
+        return self.graph_builder.get_closure(package_name)
+
+    def resolve(self, root_package: str) -> Dict:
+        """
+        Результат для одного корневого пакета
+
+        Returns:
+            Dict: root, found, total_packages, dependencies (по алфавиту), missing
+            (зависимости, отсутствующие в индексе)
+        """
+        graph = self.graph_builder.get_compact_graph()
+        root_id = graph.node_id(root_package)
+        closure = self.closure(root_package)
+        if not closure or not graph.has_record[root_id]:
+            return {'root': root_package, 'found': False, 'total_packages': 0,
+                    'dependencies': [], 'missing': []}
+
+        names, has_record = graph.names, graph.has_record
+        member_ids = [node_id for node_id in iter_bits(closure) if node_id != root_id]
+        return {
+            'root': root_package,
+            'found': True,
+            'total_packages': len(member_ids) + 1,
+            'dependencies': sorted(names[node_id] for node_id in member_ids),
+            'missing': sorted(names[node_id] for node_id in member_ids if not has_record[node_id])
+        }
+
+    def resolve_many(self, root_packages: Iterable[str], depends_on: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Результаты для списка корневых пакетов по мере вычисления
+
+        Args:
+            root_packages: Корневые пакеты
+            depends_on: Оставить только пакеты, транзитивно зависящие от этого
+                пакета (проверка по индексу достижимости, неизвестные пакеты отбрасываются)
+        """
+        if depends_on is not None:
+            root_packages = self.graph_builder.filter_depending_on(list(root_packages), depends_on)
+        for root_package in root_packages:
+            yield self.resolve(root_package)
+
+    def write_jsonl(self, out: TextIO, root_packages: Iterable[str], depends_on: Optional[str] = None) -> int:
+        """
+        Записывает результаты в формате JSON Lines (одна строка на корневой пакет)
+
+        Args:
+            out: Файловый объект для записи
+            root_packages: Корневые пакеты
+            depends_on: Оставить только пакеты, транзитивно зависящие от этого пакета
+
+        Returns:
+            int: Число обработанных корневых пакетов
+        """
+        count = 0
+        for result in self.resolve_many(root_packages, depends_on):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+
+
+def read_package_list(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Читает список корневых пакетов: по одному или несколько через пробел в строке,
+    пустые строки и комментарии ('#') пропускаются
+    """
+    for line in lines:
+        for package in line.split('#', 1)[0].split():
+            yield package
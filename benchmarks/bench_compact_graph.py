@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Сравнение словарного графа Dict[str, List[str]] и CSR-графа CompactGraph:
+занимаемая память, обход BFS и построение обратного графа
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from compact_graph import CompactGraph
+
+
+def make_graph(packages: int, edges: int, seed: int = 16):
+    """Случайный граф размером с полный репозиторий Alpine (~20k пакетов, ~100k рёбер)"""
+    rng = random.Random(seed)
+    names = [f"pkg-{i}" for i in range(packages)]
+    graph = {name: [] for name in names}
+    for _ in range(edges):
+        graph[names[rng.randrange(packages)]].append(names[rng.randrange(packages)])
+    return graph
+
+
+def measure_memory(build):
+    """Память (байт), выделенная при построении структуры"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def bfs_dict(graph, root):
+    seen = {root}
+    queue = deque([root])
+    while queue:
+        for dep in graph.get(queue.popleft(), ()):
+            if dep not in seen:
+                seen.add(dep)
+                queue.append(dep)
+    return len(seen)
+
+
+def reverse_dict(graph):
+    reverse = {}
+    for package, deps in graph.items():
+        for dep in deps:
+            reverse.setdefault(dep, []).append(package)
+    return reverse
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=20000)
+    parser.add_argument('--edges', type=int, default=100000)
+    parser.add_argument('--roots', type=int, default=20)
+    args = parser.parse_args()
+
+    source = make_graph(args.packages, args.edges)
+    # Строки имён общие для обоих представлений, поэтому измеряется только структура
+    dict_graph, dict_memory = measure_memory(lambda: {name: list(deps) for name, deps in source.items()})
+    compact, compact_memory = measure_memory(lambda: CompactGraph.from_dict(source))
+
+    roots = list(source)[:args.roots]
+    root_ids = [compact.node_id(name) for name in roots]
+    assert [bfs_dict(dict_graph, root) for root in roots] == [len(compact.bfs(root_id)) for root_id in root_ids]
+
+    dict_bfs = timed(lambda: [bfs_dict(dict_graph, root) for root in roots], 3)
+    compact_bfs = timed(lambda: [compact.bfs(root_id) for root_id in root_ids], 3)
+    dict_reverse = timed(lambda: reverse_dict(dict_graph), 3)
+    compact_reverse = timed(compact.transpose, 3)
+
+    print(f"Граф: {len(compact)} вершин, {compact.edge_count} рёбер")
+    print(f"{'':24}{'dict':>12}{'CSR':>12}")
+    print(f"{'Память, МБ':24}{dict_memory / 2**20:>12.2f}{compact_memory / 2**20:>12.2f}")
+    print(f"{'BFS x' + str(len(roots)) + ', мс':24}{dict_bfs * 1000:>12.1f}{compact_bfs * 1000:>12.1f}")
+    print(f"{'Обратный граф, мс':24}{dict_reverse * 1000:>12.1f}{compact_reverse * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Сравнение способов разбора распакованного APKINDEX: декодирование всего
+текста с разбиением на блоки, построчный разбор всех полей и выборочный
+разбор нужных полей в байтах (scan_records)
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(__file__))
+
+from apkindex_reader import INDEX_FIELDS, iter_records, scan_records
+from repository_index import parse_package_block
+from synthetic_repository import generate_records
+
+
+def make_index(packages: int) -> bytes:
+    """Текст APKINDEX синтетического репозитория размером с main+community"""
+    records = generate_records(packages=packages)
+    return "".join(
+        "".join(f"{key}:{value}\n" for key, value in record.items() if value) + "\n"
+        for record in records
+    ).encode('utf-8')
+
+
+def parse_blocks(data: bytes):
+    """Разбор по блокам: весь индекс декодируется, затем делится на записи"""
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        text = data.decode('latin-1')
+    return [parse_package_block(block) for block in text.strip().split('\n\n')]
+
+
+def timed(function, repeat):
+    """Минимальное время выполнения (с) и результат"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=30000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fields', default=''.join(INDEX_FIELDS),
+                        help='Извлекаемые поля (по одному символу на поле)')
+    parser.add_argument('--min-speedup', type=float, default=1.0,
+                        help='Минимальное ускорение относительно разбора по блокам (иначе код возврата 1)')
+    args = parser.parse_args()
+
+    data = make_index(args.packages)
+    block_time, block_records = timed(lambda: parse_blocks(data), args.repeat)
+    line_time, _ = timed(lambda: list(iter_records(io.BytesIO(data))), args.repeat)
+    fields = tuple(args.fields)
+    scan_time, scan_records_list = timed(lambda: list(scan_records(io.BytesIO(data), fields)), args.repeat)
+
+    expected = [{key: value for key, value in record.items() if key in fields} for record in block_records]
+    expected = [record for record in expected if record]
+    assert scan_records_list == expected, "Выборочный разбор расходится с разбором по блокам"
+
+    speedup = block_time / scan_time
+    print(f"Индекс: {len(block_records)} записей, {len(data) / 2**20:.1f} МБ; поля: {' '.join(fields)}")
+    print(f"{'Разбор по блокам, мс':28}{block_time * 1000:>10.1f}")
+    print(f"{'Построчный разбор, мс':28}{line_time * 1000:>10.1f}")
+    print(f"{'Выборочный разбор, мс':28}{scan_time * 1000:>10.1f}")
+    print(f"Ускорение: {speedup:.1f}x (построчный разбор: {line_time / scan_time:.1f}x)")
+
+    if speedup < args.min_speedup:
+        print(f"❌ Ускорение меньше {args.min_speedup}x", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
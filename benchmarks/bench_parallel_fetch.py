@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк параллельной загрузки индексов: несколько синтетических репозиториев
+раздаются локальным http.server с задержкой на каждый запрос (имитация удалённого
+зеркала) и загружаются AsyncRepositoryClient с разным числом соединений; затем
+BFS от самого широкого пакета объединённого индекса с разным max_workers
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(__file__))
+
+from dependency_graph import DependencyGraph
+from repository_client import AsyncRepositoryClient
+from synthetic_repository import generate_records, write_repository
+
+
+class SlowRequestHandler(SimpleHTTPRequestHandler):
+    """Раздаёт файлы каталога с задержкой перед каждым ответом (keep-alive HTTP/1.1)"""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(directory: str, latency: float) -> ThreadingHTTPServer:
+    """Запускает сервер репозиториев на свободном порту в фоновом потоке"""
+    handler = type('BoundSlowRequestHandler', (SlowRequestHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(handler, directory=directory))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(repositories, max_connections: int):
+    client = AsyncRepositoryClient(repositories, max_connections=max_connections)
+    start = time.perf_counter()
+    # Сообщения о загрузке не входят в измерение
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = client.load_index()
+    return index, time.perf_counter() - start
+
+
+def run_bfs(index, root: str, max_workers: int):
+    graph_builder = DependencyGraph("", max_depth=4, index=index, max_workers=max_workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = graph_builder.build_dependency_graph(root)
+    return graph, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repositories', type=int, default=8)
+    parser.add_argument('--packages', type=int, default=2000, help="пакетов в каждом репозитории")
+    parser.add_argument('--latency', type=float, default=0.2, help="задержка ответа сервера, с")
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for number in range(args.repositories):
+            records = generate_records(args.packages, seed=number)
+            for record in records:
+                record['P'] = f"repo{number}-{record['P']}"
+                record['D'] = ' '.join(f"repo{number}-{dep}" if dep.startswith('pkg-') else dep
+                                       for dep in record['D'].split())
+            write_repository(os.path.join(directory, f"repo{number}"), records)
+
+        server = start_server(directory, args.latency)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        repositories = [f"{base_url}/repo{number}" for number in range(args.repositories)]
+
+        print(f"Репозиториев: {args.repositories} по {args.packages} пакетов, "
+              f"задержка: {args.latency * 1000:.0f} мс")
+        reference = None
+        try:
+            for connections in args.connections:
+                index, elapsed = run(repositories, connections)
+                if reference is None:
+                    reference = (index, elapsed)
+                # Объединённый индекс не должен зависеть от числа соединений
+                same = list(index.packages) == list(reference[0].packages)
+                print(f"  соединений={connections:>3}: {elapsed:.3f} с, "
+                      f"ускорение x{reference[1] / elapsed:.1f}, индекс совпадает: {same}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    # Разрешение зависимостей идёт по индексу в памяти: пул потоков не обходит GIL
+    index = reference[0]
+    root = max(index.packages, key=lambda name: len(index.packages[name].get('D', '').split()))
+    print(f"BFS от {root} (max_depth=4):")
+    reference = None
+    for workers in args.workers:
+        graph, elapsed = run_bfs(index, root, workers)
+        if reference is None:
+            reference = (graph, elapsed)
+        # Порядок и содержимое графа не должны зависеть от числа потоков
+        same = list(graph.items()) == list(reference[0].items())
+        print(f"  max_workers={workers:>3}: {elapsed * 1000:.1f} мс, пакетов {len(graph)}, граф совпадает: {same}")
+
+
+if __name__ == "__main__":
+    main()
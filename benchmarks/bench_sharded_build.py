@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Сборка полного графа репозитория: последовательно и в пуле процессов
+с разбиением индекса на шарды (sharded_build)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(__file__))
+
+from apk_parser import APKParser
+from compact_graph import CompactGraph
+from repository_index import RepositoryIndex
+from sharded_build import build_compact_graph_sharded
+from synthetic_repository import generate_records
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=200000,
+                        help='Число записей индекса (несколько архитектур и релизов зеркала)')
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    index = RepositoryIndex(generate_records(packages=args.packages))
+    apk_parser = APKParser("", index=index)
+    serial_time, serial = timed(lambda: CompactGraph.from_dict(apk_parser.get_all_dependencies()))
+    print(f"Индекс: {len(index)} пакетов; ядер: {os.cpu_count()}")
+    print(f"{'Процессов':>10}{'Время, с':>12}{'Ускорение':>12}")
+    print(f"{1:>10}{serial_time:>12.2f}{1:>12.1f}")
+
+    for processes in sorted(set(args.processes)):
+        if processes < 2:
+            continue
+        sharded_time, sharded = timed(lambda: build_compact_graph_sharded(index, processes))
+        assert (sharded.names, sharded.offsets, sharded.targets) == (serial.names, serial.offsets, serial.targets), \
+            "Граф шардированной сборки отличается от последовательной"
+        print(f"{processes:>10}{sharded_time:>12.2f}{serial_time / sharded_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Время запуска CLI: python -X importtime main.py в тестовом режиме
+
+Суммирует время импорта модулей, загружаемых запуском сверх самого
+интерпретатора, проверяет, что тестовый режим не загружает сетевой стек,
+распаковку и пулы процессов, и завершается с кодом 1 при превышении бюджета.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Модули, которые не должны загружаться при запуске в тестовом режиме
+FORBIDDEN_MODULES = ('urllib.request', 'http.client', 'ssl', 'asyncio', 'gzip', 'tarfile',
+                     'concurrent.futures', 'xml.sax.saxutils', 'hashlib', 'pickle', 'mmap')
+
+
+def import_times(command):
+    """Запускает команду с -X importtime: {модуль верхнего уровня: мкс} и все загруженные модули"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + command, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    top_level = {}
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        # Уровень вложенности - число пробелов перед именем
+        if name.startswith(' ') and not name.startswith('  '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=75.0,
+                        help='Максимальное время импорта модулей запуска (медиана)')
+    parser.add_argument('--config', default='config.json',
+                        help='Конфигурация тестового режима (по умолчанию config.json репозитория)')
+    args = parser.parse_args()
+
+    command = ['main.py'] if args.config == 'config.json' else ['main.py', '--config', args.config]
+    interpreter, _ = import_times(['-c', 'pass'])
+
+    import_totals = []
+    wall_times = []
+    loaded = set()
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        top_level, modules = import_times(command)
+        wall_times.append(time.perf_counter() - start)
+        import_totals.append(sum(us for name, us in top_level.items() if name not in interpreter))
+        loaded |= modules
+
+    import_ms = statistics.median(import_totals) / 1000
+    print(f"Импорт модулей: {import_ms:.1f} мс (бюджет {args.budget_ms:.0f} мс)")
+    print(f"Запуск целиком: {statistics.median(wall_times) * 1000:.1f} мс (с -X importtime)")
+
+    forbidden = [name for name in FORBIDDEN_MODULES if name in loaded]
+    failed = False
+    if forbidden:
+        print(f"❌ Тестовый режим загружает: {', '.join(forbidden)}", file=sys.stderr)
+        failed = True
+    if import_ms > args.budget_ms:
+        print(f"❌ Время импорта превышает бюджет {args.budget_ms:.0f} мс", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
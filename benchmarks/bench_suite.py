@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Набор бенчмарков на синтетическом репозитории: разбор индекса (тестовый
+формат и APKINDEX.tar.gz), BFS, обратные зависимости, поиск циклов и
+визуализация. Результаты (время и пиковая память процесса) выводятся в JSON
+для отслеживания регрессий между версиями.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.dirname(__file__))
+
+try:
+    import resource
+except ImportError:
+    # resource есть только в Unix; на Windows пиковая память не измеряется
+    resource = None
+
+from apk_parser import APKParser
+from dependency_graph import DependencyGraph
+from scc import strongly_connected_components
+from visualizer import GraphVisualizer
+from synthetic_repository import generate_records, write_test_repository, write_repository
+
+
+def peak_memory_mb():
+    """Пиковый объём резидентной памяти процесса (МБ) или None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+class Stages:
+    """
+    Замер этапов: время выполнения и пиковая память процесса после этапа
+
+    При trace_memory этап дополнительно выполняется под tracemalloc, чтобы
+    получить пиковый объём памяти, выделенной самим этапом (замедляет прогон).
+    """
+
+    def __init__(self, repeat: int, trace_memory: bool = False):
+        self.repeat = repeat
+        self.trace_memory = trace_memory
+        self.results = {}
+
+    def run(self, name: str, function, repeat: int = None):
+        """Выполняет этап repeat раз, сохраняя минимальное время; возвращает результат"""
+        times = []
+        result = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            # Диагностический вывод парсера и построителя не входит в измерение
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = function()
+            times.append(time.perf_counter() - start)
+        self.results[name] = {
+            'seconds': round(min(times), 6),
+            'runs': len(times),
+            'peak_rss_mb': peak_memory_mb()
+        }
+        if self.trace_memory:
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                function()
+            self.results[name]['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+        print(f"  {name:<24}{min(times) * 1000:>10.1f} мс", file=sys.stderr)
+        return result
+
+
+def run_suite(args, workdir: str) -> dict:
+    records = generate_records(args.packages, args.fanout, args.depth,
+                               args.cycle_density, args.provides_ratio, args.seed)
+    test_path = os.path.join(workdir, 'repository.txt')
+    write_test_repository(test_path, records)
+    repository_url = write_repository(os.path.join(workdir, 'repository'), records)
+
+    roots = [record['P'] for record in records[:args.roots]]
+    # Листовые пакеты последнего слоя имеют больше всего обратных зависимостей
+    targets = [record['P'] for record in records[-args.roots:]]
+    stages = Stages(args.repeat, args.trace_memory)
+
+    stages.run('parse_test_index', lambda: APKParser(test_path, test_mode=True).get_index())
+    index = stages.run('parse_apkindex', lambda: APKParser(repository_url).get_index())
+
+    def new_builder():
+        return DependencyGraph(repository_url, max_depth=args.max_depth, index=index)
+
+    graph_builder = new_builder()
+    stages.run('full_graph', lambda: new_builder().get_compact_graph())
+    compact = graph_builder.get_compact_graph()
+
+    graphs = stages.run('bfs', lambda: [graph_builder.build_dependency_graph(root) for root in roots])
+    stages.run('reverse_index', lambda: new_builder().get_reverse_index())
+    reverse_index = graph_builder.get_reverse_index()
+    stages.run('reverse_direct', lambda: [reverse_index.transitive(target, 1) for target in targets])
+    stages.run('reverse_transitive', lambda: [reverse_index.transitive(target, None) for target in targets])
+    components = stages.run('cycle_detection', lambda: strongly_connected_components(compact))
+    cycle_groups = components.cycle_groups()
+    # Иначе этап cycle_detection измеряет граф без циклов
+    assert cycle_groups or not args.cycle_density, "Синтетический репозиторий не содержит циклов"
+
+    visualizer = GraphVisualizer()
+
+    def render(write):
+        out = io.StringIO()
+        for root, graph in zip(roots, graphs):
+            write(out, graph, root)
+        return out.tell()
+
+    stages.run('render_plantuml', lambda: render(visualizer.write_plantuml))
+    stages.run('render_ascii', lambda: render(visualizer.write_ascii_tree))
+
+    return {
+        'label': args.label,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'packages': args.packages,
+            'fanout': args.fanout,
+            'depth': args.depth,
+            'cycle_density': args.cycle_density,
+            'provides_ratio': args.provides_ratio,
+            'seed': args.seed,
+            'roots': len(roots),
+            'max_depth': args.max_depth,
+            'repeat': args.repeat,
+            'trace_memory': args.trace_memory
+        },
+        'repository': {
+            'packages': len(index),
+            'nodes': len(compact),
+            'edges': compact.edge_count,
+            'cycle_groups': len(cycle_groups),
+            'apkindex_bytes': os.path.getsize(os.path.join(workdir, 'repository', 'x86_64', 'APKINDEX.tar.gz')),
+            'bfs_nodes': sum(len(graph) for graph in graphs)
+        },
+        'results': stages.results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=20000)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--cycle-density', type=float, default=0.01)
+    parser.add_argument('--provides-ratio', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=16)
+    parser.add_argument('--roots', type=int, default=20, help="число корневых пакетов для BFS и обратных запросов")
+    parser.add_argument('--max-depth', type=int, default=10, help="max_depth построителя графа")
+    parser.add_argument('--repeat', type=int, default=3, help="число повторов каждого этапа (берётся минимум)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="измерять пиковую память каждого этапа через tracemalloc")
+    parser.add_argument('--label', default="", help="метка версии в результатах")
+    parser.add_argument('--output', default='-', help="файл для JSON с результатами ('-' - стандартный вывод)")
+    args = parser.parse_args()
+
+    print(f"Синтетический репозиторий: {args.packages} пакетов", file=sys.stderr)
+    with tempfile.TemporaryDirectory(prefix='apk-bench-') as workdir:
+        report = run_suite(args, workdir)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
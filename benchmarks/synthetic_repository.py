@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических репозиториев для бенчмарков
+
+Пакеты распределяются по слоям (приложения -> библиотеки -> базовые пакеты):
+зависимости идут в более глубокие слои с предпочтением «популярных» пакетов
+последнего слоя (аналог musl, busybox), доля обратных рёбер задаёт плотность
+циклов. Репозиторий записывается в тестовом формате (A: B C) или в формате
+APKINDEX.tar.gz (сегмент подписи + tar с DESCRIPTION и APKINDEX).
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import io
+import os
+import random
+import tarfile
+import time
+from typing import Dict, List
+
+
+def generate_records(packages: int = 1000, fanout: int = 4, depth: int = 6,
+                     cycle_density: float = 0.01, provides_ratio: float = 0.3,
+                     seed: int = 16) -> List[Dict[str, str]]:
+    """
+    Генерирует записи о пакетах в формате полей APKINDEX
+
+    Args:
+        packages: Число пакетов
+        fanout: Среднее число прямых зависимостей пакета
+        depth: Число слоёв (максимальная длина цепочки зависимостей без циклов)
+        cycle_density: Число обратных рёбер (каждое замыкает цикл) как доля прямых
+        provides_ratio: Доля пакетов, предоставляющих so:-библиотеку; зависимости
+            на них записываются через виртуальное имя
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        List[Dict[str, str]]: Записи о пакетах (P, V, A, S, I, T, D, p, ...)
+    """
+    rng = random.Random(seed)
+    depth = max(1, min(depth, packages))
+    names = [f"pkg-{i}" for i in range(packages)]
+    layer_start = [layer * packages // depth for layer in range(depth + 1)]
+    layer_of = [0] * packages
+    for layer in range(depth):
+        for i in range(layer_start[layer], layer_start[layer + 1]):
+            layer_of[i] = layer
+
+    provides = {i: f"so:lib{names[i]}.so.{rng.randint(0, 3)}"
+                for i in range(packages) if rng.random() < provides_ratio}
+
+    # Прямые рёбра - только в более глубокие слои (без циклов)
+    targets_of = []
+    for i in range(packages):
+        deeper = layer_start[layer_of[i] + 1]
+        targets = set()
+        if deeper < packages:
+            for _ in range(rng.randint(0, 2 * fanout)):
+                # Смещение к концу: пакеты последних слоёв используются чаще
+                targets.add(deeper + int((packages - deeper) * (1 - rng.random() ** 2)))
+        targets_of.append(targets)
+
+    # Обратные рёбра: пакет начинает зависеть от одного из пакетов, которые транзитивно
+    # зависят от него самого, поэтому каждое такое ребро замыкает цикл
+    dependents = [[] for _ in range(packages)]
+    for i, targets in enumerate(targets_of):
+        for target in targets:
+            dependents[target].append(i)
+    candidates = [i for i in range(packages) if dependents[i]]
+    back_edges = round(cycle_density * sum(len(targets) for targets in targets_of))
+    for _ in range(back_edges if candidates else 0):
+        source = rng.choice(candidates)
+        ancestor = source
+        for _ in range(rng.randint(1, depth)):
+            if not dependents[ancestor]:
+                break
+            ancestor = rng.choice(dependents[ancestor])
+        targets_of[source].add(ancestor)
+
+    records = []
+    for i, name in enumerate(names):
+        record = {
+            'C': 'Q1' + base64.b64encode(hashlib.sha1(name.encode()).digest()).decode(),
+            'P': name,
+            'V': f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.{rng.randint(0, 9)}-r{rng.randint(0, 5)}",
+            'A': 'x86_64',
+            'S': str(rng.randint(2_000, 2_000_000)),
+            'I': str(rng.randint(8_000, 8_000_000)),
+            'T': f"Synthetic package {name}",
+            'U': 'https://example.org/',
+            'L': 'MIT',
+            'o': name,
+            'm': 'Benchmark <bench@example.org>',
+            't': str(1_700_000_000 + i),
+            'D': ' '.join(provides.get(target, names[target]) for target in sorted(targets_of[i]))
+        }
+        if i in provides:
+            record['p'] = f"{provides[i]}=0"
+        records.append(record)
+
+    return records
+
+
+def write_test_repository(path: str, records: List[Dict[str, str]]) -> None:
+    """Записывает репозиторий в тестовом формате 'A: B C' (виртуальные имена заменяются пакетами)"""
+    providers = {}
+    for record in records:
+        for provided in record.get('p', '').split():
+            providers[provided.split('=', 1)[0]] = record['P']
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Синтетический репозиторий\n")
+        for record in records:
+            deps = [providers.get(dep, dep) for dep in record.get('D', '').split()]
+            f.write(f"{record['P']}: {' '.join(deps)}\n")
+
+
+def write_apkindex(path: str, records: List[Dict[str, str]]) -> None:
+    """
+    Записывает репозиторий в формате APKINDEX.tar.gz
+
+    Как и настоящий индекс, архив состоит из двух склеенных gzip-потоков:
+    подписи (tar без завершающих блоков) и tar с DESCRIPTION и APKINDEX.
+    """
+    index_text = "".join(
+        "".join(f"{key}:{value}\n" for key, value in record.items() if value) + "\n"
+        for record in records
+    ).encode('utf-8')
+    mtime = int(time.time())
+
+    signature = tarfile.TarInfo('.SIGN.RSA.synthetic.rsa.pub')
+    signature_data = os.urandom(512)
+    signature.size = len(signature_data)
+    signature.mtime = mtime
+
+    with open(path, 'wb') as f:
+        with gzip.GzipFile(fileobj=f, mode='wb', mtime=mtime) as gz:
+            gz.write(signature.tobuf(format=tarfile.USTAR_FORMAT) + signature_data)
+
+        with gzip.GzipFile(fileobj=f, mode='wb', mtime=mtime) as gz:
+            with tarfile.open(fileobj=gz, mode='w', format=tarfile.USTAR_FORMAT) as tar:
+                for member_name, data in (('DESCRIPTION', b'synthetic'), ('APKINDEX', index_text)):
+                    info = tarfile.TarInfo(member_name)
+                    info.size = len(data)
+                    info.mtime = mtime
+                    tar.addfile(info, io.BytesIO(data))
+
+
+def write_repository(directory: str, records: List[Dict[str, str]], arch: str = "x86_64") -> str:
+    """
+    Создаёт каталог репозитория <directory>/<arch>/APKINDEX.tar.gz
+
+    Returns:
+        str: URL репозитория (file://) для APKParser
+    """
+    arch_dir = os.path.join(directory, arch)
+    os.makedirs(arch_dir, exist_ok=True)
+    write_apkindex(os.path.join(arch_dir, 'APKINDEX.tar.gz'), records)
+    return 'file://' + os.path.abspath(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('output', help="файл тестового репозитория или каталог репозитория APKINDEX")
+    parser.add_argument('--format', choices=['test', 'apkindex'], default='test')
+    parser.add_argument('--packages', type=int, default=1000)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--cycle-density', type=float, default=0.01)
+    parser.add_argument('--provides-ratio', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=16)
+    args = parser.parse_args()
+
+    records = generate_records(args.packages, args.fanout, args.depth,
+                               args.cycle_density, args.provides_ratio, args.seed)
+    if args.format == 'test':
+        write_test_repository(args.output, records)
+        print(f"Тестовый репозиторий: {args.output} ({len(records)} пакетов)")
+    else:
+        url = write_repository(args.output, records)
+        print(f"Репозиторий APKINDEX: {url} ({len(records)} пакетов)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,23 @@ CLI-приложение для визуализации графа зависи
 Этап 5: Визуализация
 """
 
+import contextlib
+import json
 import sys
 import os
+from typing import Optional
 
 # Добавляем путь для импорта модулей
 sys.path.append(os.path.dirname(__file__))
 
 from config_loader import ConfigLoader
-from apk_parser import APKParser
-from dependency_graph import DependencyGraph
-from visualizer import GraphVisualizer
+from profiler import PROFILER, span
+from compact_graph import GRAPH_STORE_SUFFIX
+
+# Построитель графа, сетевой стек (urllib, asyncio, http), распаковка и визуализация
+# импортируются в функциях режимов: запуск CLI из хуков не платит за неиспользуемые модули
+
+DEFAULT_CONFIG = "config.json"
 
 def display_graph(graph: dict, title: str):
     """Отображает граф зависимостей"""
@@ -38,14 +45,184 @@ def display_reverse_dependencies(reverse_deps: dict, target_package: str):
     for package, deps in reverse_deps.items():
         print(f"  {package} зависит от {target_package}")
 
-def main():
+def create_graph_builder(config: dict) -> 'DependencyGraph':
+    """Создаёт построитель графа по конфигурации (с общим индексом всех репозиториев)"""
+    from dependency_graph import DependencyGraph
+    
+    test_mode = config['test_repository_mode']
+    repository_path = config['repository_url']
+    
+    cache = None
+    if config['cache_dir'] and not test_mode:
+        from index_cache import IndexCache
+        cache = IndexCache(config['cache_dir'])
+    
+    # Несколько репозиториев/архитектур загружаются одновременно и объединяются в один индекс
+    index = None
+    index_loader = None
+    if not test_mode and (config['extra_repositories'] or len(config['architectures']) > 1):
+        from repository_client import AsyncRepositoryClient
+        client = AsyncRepositoryClient(
+            [repository_path] + config['extra_repositories'],
+            arches=config['architectures'],
+            max_connections=config['max_workers'],
+            cache=cache
+        )
+        index_loader = client.load_index
+        index = index_loader()
+        print(f" Загружено пакетов из {len(client.repositories)} репозиториев: {len(index)}")
+    
+    return DependencyGraph(
+        repository_path,
+        max_depth=config['max_dependency_depth'],
+        package_filter=config['package_filter'],
+        test_mode=test_mode,
+        max_workers=config['max_workers'],
+        index=index,
+        arch=config['architectures'][0],
+        closure_cache_bytes=config['closure_cache_mb'] * 2**20,
+        build_processes=config['build_processes'],
+        cache=cache,
+        index_loader=index_loader
+    )
+
+def parse_args(argv=None) -> 'argparse.Namespace':
+    """Разбирает аргументы командной строки"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Визуализатор графа зависимостей пакетов Alpine Linux")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help="путь к конфигурационному файлу")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="пакетный режим: файл со списком корневых пакетов ('-' - стандартный ввод)")
+    parser.add_argument('--depends-on', metavar='PACKAGE',
+                        help="пакетный режим: оставить только корневые пакеты, транзитивно зависящие от PACKAGE")
+    parser.add_argument('--output', metavar='FILE', default='-',
+                        help="файл для результатов пакетного режима в формате JSON Lines ('-' - стандартный вывод)")
+    parser.add_argument('--analytics', action='store_true',
+                        help="метрики всех пакетов репозитория (зависимости, установленный размер, глубина, "
+                             "зависящие пакеты) в формате JSON Lines, по убыванию размера")
+    parser.add_argument('--top', type=int, default=0, metavar='N',
+                        help="вывести только N пакетов с наибольшим установленным размером (0 - все)")
+    parser.add_argument('--serve', action='store_true',
+                        help="режим сервера: HTTP/JSON API запросов к графу (/deps, /rdeps, /depends, /resolve, /cycles, /render)")
+    parser.add_argument('--host', default="127.0.0.1", help="адрес сервера запросов")
+    parser.add_argument('--port', type=int, default=8080, help="порт сервера запросов")
+    parser.add_argument('--refresh', type=float, default=0, metavar='SECONDS',
+                        help="период фонового обновления индекса в режиме сервера (0 - отключено)")
+    parser.add_argument('--build-store', metavar='FILE',
+                        help=f"сохранить полный граф репозитория в хранилище для mmap (файл *{GRAPH_STORE_SUFFIX}, "
+                             "указывается затем как repository_url)")
+    parser.add_argument('--profile', action='store_true',
+                        help="вывести в stderr время этапов и счётчики (загрузка, разбор, BFS, визуализация)")
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help="сохранить профиль в формате Chrome trace events (включает --profile)")
+    return parser.parse_args(argv)
+
+def build_store(config: dict, store_path: str) -> None:
+    """Строит полный граф репозитория и записывает его в файл хранилища"""
+    if not store_path.endswith(GRAPH_STORE_SUFFIX):
+        raise ValueError(f"Файл хранилища должен иметь расширение {GRAPH_STORE_SUFFIX}")
+    from graph_store import write_graph_store
+    
+    graph = create_graph_builder(config).get_compact_graph()
+    write_graph_store(store_path, graph)
+    print(f" Хранилище графа: {store_path} ({graph.record_count()} пакетов, {graph.edge_count} рёбер)")
+
+def run_analytics(config: dict, output_path: str, top: int = 0) -> int:
+    """
+    Метрики всех пакетов репозитория, отсортированные по установленному размеру
+    
+    Returns:
+        int: Число выведенных пакетов
+    """
+    from analytics import rank_packages
+    
+    with contextlib.redirect_stdout(sys.stderr):
+        metrics = rank_packages(create_graph_builder(config).get_repository_analytics())
+    if top:
+        metrics = metrics[:top]
+    
+    output_file = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    try:
+        for item in metrics:
+            output_file.write(json.dumps(item, ensure_ascii=False) + "\n")
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+    return len(metrics)
+
+def run_batch(config: dict, batch_path: str, output_path: str, depends_on: Optional[str] = None) -> int:
+    """
+    Пакетный режим: транзитивные зависимости для списка корневых пакетов
+    
+    Все пакеты обрабатываются на одном индексе с общим кэшем замыканий,
+    результаты записываются в формате JSON Lines. Диагностические сообщения
+    выводятся в stderr, чтобы не смешиваться с результатами. Если задан
+    depends_on, выводятся только пакеты, транзитивно зависящие от него.
+    
+    Returns:
+        int: Число обработанных пакетов
+    """
+    from batch import BatchResolver, read_package_list
+    
+    with contextlib.redirect_stdout(sys.stderr):
+        resolver = BatchResolver(create_graph_builder(config))
+        # Индекс и полный граф загружаются до начала записи результатов
+        resolver.closure(config['package_name'])
+    
+    input_file = sys.stdin if batch_path == '-' else open(batch_path, 'r', encoding='utf-8')
+    output_file = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    try:
+        return resolver.write_jsonl(output_file, read_package_list(input_file), depends_on)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+def main(argv=None):
     """Основная функция CLI-приложения"""
+    args = parse_args(argv)
+    
+    if args.profile or args.profile_trace:
+        PROFILER.enable()
+    
+    try:
+        if args.batch:
+            config = ConfigLoader(args.config).load_config()
+            count = run_batch(config, args.batch, args.output, args.depends_on)
+            print(f" Обработано корневых пакетов: {count}", file=sys.stderr)
+        elif args.analytics:
+            count = run_analytics(ConfigLoader(args.config).load_config(), args.output, args.top)
+            print(f" Пакетов в отчёте: {count}", file=sys.stderr)
+        elif args.build_store:
+            build_store(ConfigLoader(args.config).load_config(), args.build_store)
+        elif args.serve:
+            from server import serve
+            config = ConfigLoader(args.config).load_config()
+            try:
+                serve(create_graph_builder(config), args.host, args.port, args.refresh)
+            except RuntimeError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            with span('cli.total'):
+                run_visualization(args.config)
+    finally:
+        if PROFILER.enabled:
+            PROFILER.report(sys.stderr)
+            if args.profile_trace:
+                PROFILER.write_chrome_trace(args.profile_trace)
+                print(f" Профиль сохранён в {args.profile_trace}", file=sys.stderr)
+
+def run_visualization(config_path: str):
+    """Интерактивный режим: граф, обратные зависимости, визуализация и статистика"""
     print("=== Визуализатор графа зависимостей пакетов ===")
     print("Этап 5: Визуализация")
     
     try:
         # Загрузка конфигурации
-        loader = ConfigLoader("config.json")
+        loader = ConfigLoader(config_path)
         config = loader.load_config()
         
         # Вывод параметров
@@ -63,12 +240,7 @@ def main():
         
         # Построение графа зависимостей
         print(f"\n Построение графа зависимостей...")
-        graph_builder = DependencyGraph(
-            repository_path,
-            max_depth=config['max_dependency_depth'],
-            package_filter=config['package_filter'],
-            test_mode=test_mode
-        )
+        graph_builder = create_graph_builder(config)
         
         # Обычные зависимости
         graph = graph_builder.build_dependency_graph(config['package_name'])
@@ -82,20 +254,35 @@ def main():
         print(f"\n{'='*50}")
         print(" ВИЗУАЛИЗАЦИЯ (ЭТАП 5)")
         
+        from visualizer import GraphVisualizer
         visualizer = GraphVisualizer()
         
         # 1. PlantUML визуализация
-        plantuml_code = visualizer.generate_plantuml(graph, config['package_name'], reverse_deps)
         print(f"\n PlantUML описание графа:")
         print("```plantuml")
-        print(plantuml_code)
+        visualizer.write_plantuml(sys.stdout, graph, config['package_name'], reverse_deps)
+        print()
         print("```")
         
+        # Экспорт в файл (потоковая запись, без построения всего текста в памяти)
+        if config['export_path']:
+            with open(config['export_path'], 'w', encoding='utf-8') as export_file:
+                visualizer.export(
+                    export_file, graph, config['package_name'],
+                    export_format=config['export_format'],
+                    condensed=config['export_condensed'],
+                    max_nodes=config['export_max_nodes'] or None
+                )
+            print(f"\n Граф сохранён в {config['export_path']} ({config['export_format']})")
+        
         # 2. ASCII-дерево (если включено в конфигурации)
         if config['ascii_tree_output']:
-            ascii_tree = visualizer.generate_ascii_tree(graph, config['package_name'])
             print(f"\n ASCII-дерево зависимостей:")
-            print(ascii_tree)
+            visualizer.write_ascii_tree(
+                sys.stdout, graph, config['package_name'],
+                max_depth=config['ascii_max_depth'] or None,
+                max_lines=config['ascii_max_lines'] or None
+            )
         
         # Статистика
         stats = graph_builder.get_statistics()
@@ -107,7 +294,7 @@ def main():
         if graph_builder.cycles_detected:
             print(f"   Обнаружены циклические зависимости:")
             for cycle in graph_builder.cycles_detected:
-                print(f"    {cycle}")
+                print(f"    {{{', '.join(cycle)}}}")
         
         # Демонстрация фильтрации
         if config['package_filter']:
@@ -0,0 +1,113 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Iterator, Optional
+from profiler import count
+
+# Приблизительные накладные расходы на запись кэша (ключ, узел OrderedDict)
+ENTRY_OVERHEAD = 200
+
+# int.bit_count появился в Python 3.10
+HAS_BIT_COUNT = hasattr(int, 'bit_count')
+
+
+class ClosureCache:
+    """
+    LRU-кэш транзитивных замыканий в виде битовых множеств
+
+    Замыкание хранится как целое число Python, в котором бит i установлен,
+    если пакет с идентификатором i (CompactGraph) входит в замыкание. Объединение
+    замыканий нескольких пакетов - побитовое ИЛИ. При превышении бюджета памяти
+    вытесняются давно не использованные записи.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Возвращает битовое множество по ключу (None, если его нет в кэше)"""
+        with self._lock:
+            bits = self._entries.get(key)
+            if bits is None:
+                self.misses += 1
+                count('closure_cache.miss')
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        count('closure_cache.hit')
+        return bits
+
+    def put(self, key: Hashable, bits: int) -> None:
+        """Сохраняет битовое множество, вытесняя старые записи при нехватке памяти"""
+        size = self._entry_size(bits)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old_bits = self._entries.pop(key, None)
+            if old_bits is not None:
+                self.used_bytes -= self._entry_size(old_bits)
+
+            self._entries[key] = bits
+            self.used_bytes += size
+
+            while self.used_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.used_bytes -= self._entry_size(evicted)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Удаляет записи, для ключей которых predicate возвращает True
+
+        Returns:
+            int: Число удалённых записей
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self.used_bytes -= self._entry_size(self._entries.pop(key))
+            return len(stale)
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry_size(self, bits: int) -> int:
+        return sys.getsizeof(bits) + ENTRY_OVERHEAD
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Идентификаторы установленных битов в порядке возрастания"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index * 8
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield base + bit
+
+
+def popcount(bits: int) -> int:
+    """Число установленных битов"""
+    return bits.bit_count() if HAS_BIT_COUNT else bin(bits).count('1')
+
+
+def bits_from_ids(node_ids: Iterable[int]) -> int:
+    """Битовое множество из идентификаторов (за линейное время)"""
+    buffer = bytearray()
+    for node_id in node_ids:
+        byte_index = node_id >> 3
+        if byte_index >= len(buffer):
+            buffer.extend(bytes(byte_index + 1 - len(buffer)))
+        buffer[byte_index] |= 1 << (node_id & 7)
+    return int.from_bytes(buffer, 'little')
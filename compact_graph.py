@@ -0,0 +1,223 @@
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Расширение файла хранилища графа (graph_store): такой repository_url открывается как готовый граф.
+# Определено здесь, чтобы проверка пути не загружала mmap и struct
+GRAPH_STORE_SUFFIX = '.apkgraph'
+
+
+def is_graph_store(path: str) -> bool:
+    """Указывает ли путь на файл хранилища графа"""
+    return path.endswith(GRAPH_STORE_SUFFIX)
+
+
+class CompactGraph:
+    """
+    Компактное представление графа зависимостей в формате CSR
+
+    Имена пакетов интернируются в целочисленные идентификаторы, а рёбра
+    хранятся в двух массивах array('i'): offsets (начало списка соседей
+    каждой вершины) и targets (идентификаторы соседей подряд). Соседи
+    вершины v - это targets[offsets[v]:offsets[v + 1]].
+    """
+
+    def __init__(self, names: List[str], offsets: array, targets: array, has_record: bytearray):
+        self.names = names
+        self.ids: Dict[str, int] = {name: node_id for node_id, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        # 1 - вершина была ключом исходного графа, 0 - встречается только как зависимость
+        self.has_record = has_record
+
+    @classmethod
+    def from_dict(cls, graph: Dict[str, List[str]]) -> 'CompactGraph':
+        """
+        Строит CSR-граф из словаря {пакет: [зависимости]}
+
+        Идентификаторы назначаются сначала ключам в порядке словаря, затем
+        зависимостям, отсутствующим среди ключей, поэтому порядок обхода
+        совпадает с порядком исходного словаря.
+        """
+        names = list(graph)
+        ids = {name: node_id for node_id, name in enumerate(names)}
+        has_record = bytearray(b'\x01') * len(names)
+
+        offsets = array('i', [0])
+        targets = array('i')
+        for dependencies in graph.values():
+            for dep in dependencies:
+                dep_id = ids.get(dep)
+                if dep_id is None:
+                    dep_id = ids[dep] = len(names)
+                    names.append(dep)
+                targets.append(dep_id)
+            offsets.append(len(targets))
+
+        # Вершины без записи не имеют исходящих рёбер
+        missing = len(names) - len(has_record)
+        offsets.extend([len(targets)] * missing)
+        has_record.extend(b'\x00' * missing)
+
+        return cls(names, offsets, targets, has_record)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def record_count(self) -> int:
+        """Число вершин, имеющих запись в репозитории"""
+        return self.has_record.count(1)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        """Идентификатор пакета или None, если его нет в графе"""
+        return self.ids.get(name)
+
+    def successors(self, node_id: int) -> array:
+        """Идентификаторы прямых зависимостей вершины"""
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def transpose(self) -> 'CompactGraph':
+        """
+        Строит обратный граф (рёбра развёрнуты) подсчётом, за O(V + E)
+
+        Списки соседей в обратном графе упорядочены по идентификатору источника.
+        """
+        node_count = len(self.names)
+        counts = array('i', bytes(4 * (node_count + 1)))
+        for target in self.targets:
+            counts[target + 1] += 1
+        for node_id in range(node_count):
+            counts[node_id + 1] += counts[node_id]
+
+        offsets = array('i', counts)
+        position = array('i', counts)
+        targets = array('i', bytes(4 * len(self.targets)))
+        source_offsets, source_targets = self.offsets, self.targets
+        for source in range(node_count):
+            for target in source_targets[source_offsets[source]:source_offsets[source + 1]]:
+                targets[position[target]] = source
+                position[target] += 1
+
+        reverse = CompactGraph.__new__(CompactGraph)
+        reverse.names = self.names
+        reverse.ids = self.ids
+        reverse.offsets = offsets
+        reverse.targets = targets
+        reverse.has_record = self.has_record
+        return reverse
+
+    def bfs(self, root_id: int, max_depth: Optional[int] = None) -> List[int]:
+        """
+        Обход в ширину по идентификаторам
+
+        Args:
+            root_id: Идентификатор начальной вершины
+            max_depth: Число уровней обхода (None - без ограничения)
+
+        Returns:
+            List[int]: Достижимые вершины в порядке обхода (включая root_id)
+        """
+        seen = bytearray(len(self.names))
+        seen[root_id] = 1
+        order = [root_id]
+        frontier = [root_id]
+        depth = 0
+        offsets, targets = self.offsets, self.targets
+
+        while frontier and (max_depth is None or depth < max_depth):
+            next_frontier = []
+            for node_id in frontier:
+                for target in targets[offsets[node_id]:offsets[node_id + 1]]:
+                    if not seen[target]:
+                        seen[target] = 1
+                        next_frontier.append(target)
+            order.extend(next_frontier)
+            frontier = next_frontier
+            depth += 1
+
+        return order
+
+    def with_updates(self, updates: Dict[str, List[str]], removed: Iterable[str] = ()) -> 'CompactGraph':
+        """
+        Возвращает новый граф с заменёнными списками зависимостей части пакетов
+
+        Идентификаторы существующих вершин сохраняются (удалённые пакеты остаются
+        вершинами без записи и без исходящих рёбер), новые имена добавляются в
+        конец, а рёбра неизменённых вершин копируются срезами массивов.
+
+        Args:
+            updates: {пакет: [новые зависимости]} для изменённых и добавленных пакетов
+            removed: Пакеты, удалённые из репозитория
+        """
+        names = list(self.names)
+        ids = dict(self.ids)
+        has_record = bytearray(self.has_record)
+        old_count = len(names)
+
+        def intern(name: str) -> int:
+            node_id = ids.get(name)
+            if node_id is None:
+                node_id = ids[name] = len(names)
+                names.append(name)
+                has_record.append(0)
+            return node_id
+
+        replaced: Dict[int, List[int]] = {}
+        for name, dependencies in updates.items():
+            node_id = intern(name)
+            has_record[node_id] = 1
+            replaced[node_id] = [intern(dep) for dep in dependencies]
+        for name in removed:
+            node_id = ids.get(name)
+            if node_id is not None:
+                has_record[node_id] = 0
+                replaced[node_id] = []
+
+        offsets = array('i', [0])
+        targets = array('i')
+        for node_id in range(len(names)):
+            new_targets = replaced.get(node_id)
+            if new_targets is not None:
+                targets.extend(new_targets)
+            elif node_id < old_count:
+                targets.extend(self.targets[self.offsets[node_id]:self.offsets[node_id + 1]])
+            offsets.append(len(targets))
+
+        graph = CompactGraph.__new__(CompactGraph)
+        graph.names = names
+        graph.ids = ids
+        graph.offsets = offsets
+        graph.targets = targets
+        graph.has_record = has_record
+        return graph
+
+    def as_dict_view(self) -> 'CompactGraphView':
+        """Представление, совместимое с Dict[str, List[str]] для существующего кода"""
+        return CompactGraphView(self)
+
+
+class CompactGraphView(Mapping):
+    """Только для чтения: словарь {пакет: [зависимости]} поверх CompactGraph"""
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+
+    def __getitem__(self, name: str) -> List[str]:
+        node_id = self.graph.ids.get(name)
+        if node_id is None or not self.graph.has_record[node_id]:
+            raise KeyError(name)
+        names = self.graph.names
+        return [names[target] for target in self.graph.successors(node_id)]
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.graph.names
+        for node_id, present in enumerate(self.graph.has_record):
+            if present:
+                yield names[node_id]
+
+    def __len__(self) -> int:
+        return self.graph.record_count()
@@ -14,6 +14,22 @@ class ConfigLoader:
         'package_filter': str
     }
     
+    # Необязательные параметры: ключ -> (тип, значение по умолчанию)
+    OPTIONAL_KEYS = {
+        'cache_dir': (str, ""),
+        'max_workers': (int, 1),
+        'extra_repositories': (list, []),
+        'architectures': (list, ["x86_64"]),
+        'export_path': (str, ""),
+        'export_format': (str, "plantuml"),
+        'export_condensed': (bool, False),
+        'export_max_nodes': (int, 0),
+        'ascii_max_depth': (int, 0),
+        'ascii_max_lines': (int, 0),
+        'closure_cache_mb': (int, 64),
+        'build_processes': (int, 0)
+    }
+    
     def __init__(self, config_path: str = "config.json"):
         self.config_path = config_path
         self.config = {}
@@ -51,6 +67,13 @@ class ConfigLoader:
             elif not isinstance(self.config[key], expected_type):
                 invalid_types.append(f"{key} (ожидался {expected_type.__name__})")
         
+        # Необязательные параметры получают значения по умолчанию
+        for key, (expected_type, default) in self.OPTIONAL_KEYS.items():
+            if key not in self.config:
+                self.config[key] = default
+            elif not isinstance(self.config[key], expected_type):
+                invalid_types.append(f"{key} (ожидался {expected_type.__name__})")
+        
         if missing_keys:
             raise ValueError(f"Отсутствуют обязательные параметры: {', '.join(missing_keys)}")
         
@@ -63,6 +86,18 @@ class ConfigLoader:
         
         if not isinstance(self.config['repository_url'], str) or not self.config['repository_url']:
             raise ValueError("repository_url должен быть непустой строкой")
+        
+        if not self.config['architectures']:
+            raise ValueError("architectures должен содержать хотя бы одну архитектуру")
+        
+        if self.config['export_format'] not in ('plantuml', 'dot', 'graphml', 'json'):
+            raise ValueError("export_format должен быть одним из: plantuml, dot, graphml, json")
+        
+        if self.config['max_workers'] < 1:
+            raise ValueError("max_workers должен быть положительным числом")
+        
+        if self.config['build_processes'] < 0:
+            raise ValueError("build_processes не может быть отрицательным")
 
     def display_config(self) -> None:
         """Вывод конфигурации в формате ключ-значение"""
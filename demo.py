@@ -12,28 +12,14 @@ from config_loader import ConfigLoader
 from dependency_graph import DependencyGraph
 from visualizer import GraphVisualizer
 
-def demo_package(package_name, config_path="config.json"):
-    """Демонстрация для одного пакета"""
+def demo_package(package_name, graph_builder, config):
+    """Демонстрация для одного пакета (построитель графа и индекс общие для всех пакетов)"""
     print(f"\n{'='*60}")
     print(f"🎯 ДЕМОНСТРАЦИЯ ДЛЯ ПАКЕТА: {package_name}")
     print(f"{'='*60}")
     
     try:
-        # Загружаем конфигурацию
-        loader = ConfigLoader(config_path)
-        config = loader.load_config()
-        
-        # Меняем пакет для демонстрации
-        config['package_name'] = package_name
-        
         # Строим граф
-        graph_builder = DependencyGraph(
-            config['repository_url'],
-            max_depth=config['max_dependency_depth'],
-            package_filter=config['package_filter'],
-            test_mode=config['test_repository_mode']
-        )
-        
         graph = graph_builder.build_dependency_graph(package_name)
         
         # Визуализация
@@ -67,8 +53,24 @@ def main():
     # Три различных пакета для демонстрации
     packages = ["A", "X", "M"]
     
+    # Конфигурация загружается, а индекс репозитория разбирается один раз для всех пакетов
+    try:
+        loader = ConfigLoader("config.json")
+        config = loader.load_config()
+    except Exception as e:
+        print(f"❌ Ошибка загрузки конфигурации: {e}")
+        return
+    
+    graph_builder = DependencyGraph(
+        config['repository_url'],
+        max_depth=config['max_dependency_depth'],
+        package_filter=config['package_filter'],
+        test_mode=config['test_repository_mode'],
+        max_workers=config['max_workers']
+    )
+    
     for package in packages:
-        demo_package(package)
+        demo_package(package, graph_builder, config)
     
     print(f"\n{'='*60}")
     print("✅ ДЕМОНСТРАЦИЯ ЗАВЕРШЕНА")
@@ -1,160 +1,566 @@
-from typing import Dict, List, Set, Optional
-from collections import deque
+from typing import Callable, Dict, List, Set, Optional, Tuple, TYPE_CHECKING
 from apk_parser import APKParser
+from repository_index import RepositoryIndex, VERSION_SPLIT_RE, dependency_names
+from compact_graph import CompactGraph
+from closure_cache import ClosureCache, bits_from_ids, iter_bits, popcount
+from profiler import span, count
+
+if TYPE_CHECKING:
+    # Модули отдельных режимов (сервер, аналитика, сборка в пуле процессов) импортируются в методах
+    from index_cache import IndexCache
+    from index_diff import IndexDiff
+    from reverse_index import ReverseIndex
+    from scc import SCCResult
+    from reachability import ReachabilityIndex
 
 class DependencyGraph:
     """Класс для построения и анализа графа зависимостей"""
     
-    def __init__(self, repository_url: str, max_depth: int = 3, package_filter: str = "", test_mode: bool = False):
+    def __init__(self, repository_url: str, max_depth: int = 3, package_filter: str = "", test_mode: bool = False,
+                 index: Optional[RepositoryIndex] = None, cache: Optional['IndexCache'] = None,
+                 max_workers: int = 1, arch: str = "x86_64", closure_cache_bytes: int = 64 * 2**20,
+                 build_processes: int = 0, index_loader: Optional[Callable[[], RepositoryIndex]] = None):
         self.repository_url = repository_url
         self.max_depth = max_depth
+        # Число потоков, которыми раскрывается уровень BFS (1 - в текущем потоке)
+        self.max_workers = max_workers
+        # Число процессов для сборки полного графа (0 или 1 - в текущем процессе)
+        self.build_processes = build_processes
         self.package_filter = package_filter.lower()
         self.test_mode = test_mode
-        self.parser = APKParser(repository_url, test_mode=test_mode)
+        # Индекс репозитория можно передать извне, чтобы разделить его между несколькими графами
+        self.parser = APKParser(repository_url, test_mode=test_mode, index=index, arch=arch, cache=cache)
+        # Источник, построивший переданный индекс (например, объединение нескольких репозиториев):
+        # им же загружается свежая версия при обновлении
+        self.index_loader = index_loader
         self.visited = set()
         self.cycles_detected = []
         self._full_graph_cache = None
+        self._reverse_index = None
+        self._components = None
+        self._raw_dependents = None
+        self._condensed = None
+        self._filter_mask = None
+        self._reachability = None
+        # Замыкания по ключу (пакет, глубина, фильтр) в виде битовых множеств
+        self.closure_cache = ClosureCache(closure_cache_bytes)
     
     def build_dependency_graph(self, root_package: str) -> Dict[str, List[str]]:
         """
         Строит граф зависимостей с помощью BFS
         
+        Обход идёт по уровням: при max_workers > 1 пакеты уровня делятся на
+        max_workers непрерывных частей, которые разрешаются в пуле потоков, а
+        результаты обрабатываются в исходном порядке, поэтому граф совпадает с
+        результатом последовательного BFS.
+        
         Args:
             root_package: Корневой пакет для анализа
             
         Returns:
             Dict[str, List[str]]: Граф зависимостей {пакет: [зависимости]}
         """
+        with span('graph.bfs'):
+            graph = self._bfs(root_package)
+        
+        from scc import find_cycle_groups
+        
+        # Обнаружение циклов: все компоненты сильной связности построенного графа
+        with span('graph.cycles'):
+            self.cycles_detected = find_cycle_groups(graph)
+        
+        return graph
+    
+    def _bfs(self, root_package: str) -> Dict[str, List[str]]:
+        """Поуровневый BFS от корневого пакета (см. build_dependency_graph)"""
         graph = {}
-        queue = deque()
         
         # Инициализация BFS
-        queue.append((root_package, 0))  # (пакет, глубина)
+        frontier = [root_package]
+        current_depth = 0
         self.visited = {root_package}
         self.cycles_detected = []
         
-        while queue:
-            current_package, current_depth = queue.popleft()
-            
-            # Пропускаем пакеты с фильтром
-            if self._should_filter_package(current_package):
-                continue
-            
-            # Получаем зависимости текущего пакета
-            try:
-                dependencies = self.parser.get_package_dependencies(current_package)
-                filtered_dependencies = [dep for dep in dependencies if not self._should_filter_package(dep)]
+        executor = None
+        if self.max_workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        
+        try:
+            while frontier:
+                # Пропускаем пакеты с фильтром
+                level = [package for package in frontier if not self._should_filter_package(package)]
                 
-                graph[current_package] = filtered_dependencies
+                # Получаем зависимости всех пакетов уровня
+                if executor is not None and len(level) > 1:
+                    size = -(-len(level) // self.max_workers)
+                    chunks = [level[start:start + size] for start in range(0, len(level), size)]
+                    results = [result for chunk in executor.map(self._fetch_dependencies, chunks)
+                               for result in chunk]
+                else:
+                    results = self._fetch_dependencies(level)
                 
-                # Добавляем зависимости в очередь, если не превышена глубина
-                if current_depth < self.max_depth - 1:
-                    for dep in filtered_dependencies:
-                        if dep not in self.visited:
-                            self.visited.add(dep)
-                            queue.append((dep, current_depth + 1))
-                        else:
-                            # Обнаружение циклов
-                            if dep in graph and current_package in graph.get(dep, []):
-                                cycle = f"{current_package} -> {dep}"
-                                if cycle not in self.cycles_detected:
-                                    self.cycles_detected.append(cycle)
-                                    
-            except Exception as e:
-                print(f"⚠️ Ошибка при получении зависимостей {current_package}: {e}")
-                graph[current_package] = []
+                count('bfs.nodes_expanded', len(level))
+                edges = 0
+                next_frontier = []
+                for current_package, (dependencies, error) in zip(level, results):
+                    if error is not None:
+                        print(f"⚠️ Ошибка при получении зависимостей {current_package}: {error}")
+                        graph[current_package] = []
+                        continue
+                    
+                    filtered_dependencies = [dep for dep in dependencies if not self._should_filter_package(dep)]
+                    
+                    graph[current_package] = filtered_dependencies
+                    edges += len(filtered_dependencies)
+                    
+                    # Добавляем зависимости в следующий уровень, если не превышена глубина
+                    if current_depth < self.max_depth - 1:
+                        for dep in filtered_dependencies:
+                            if dep not in self.visited:
+                                self.visited.add(dep)
+                                next_frontier.append(dep)
+                
+                count('bfs.edges_emitted', edges)
+                frontier = next_frontier
+                current_depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
         return graph
     
-    def find_reverse_dependencies(self, target_package: str) -> Dict[str, List[str]]:
+    def _fetch_dependencies(self, packages: List[str]) -> List[Tuple[List[str], Optional[Exception]]]:
+        """Зависимости пакетов части уровня; ошибка возвращается вместо исключения (для пула потоков)"""
+        results = []
+        for package_name in packages:
+            try:
+                results.append((self.parser.get_package_dependencies(package_name), None))
+            except Exception as e:
+                results.append(([], e))
+        return results
+    
+    def query_dependency_graph(self, root_package: str, max_depth: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Строит тот же граф, что и build_dependency_graph, по закэшированному
+        полному графу репозитория
+
+        Состояние построителя (visited, cycles_detected) не меняется, поэтому
+        метод можно вызывать одновременно из нескольких потоков.
+
+        Args:
+            root_package: Корневой пакет для анализа
+            max_depth: Глубина (None - без ограничения)
+
+        Returns:
+            Dict[str, List[str]]: Граф зависимостей {пакет: [зависимости]}
+        """
+        if self._should_filter_package(root_package):
+            return {}
+
+        graph = self.get_compact_graph()
+        node_id = graph.node_id(root_package)
+        if node_id is None:
+            return {root_package: []}
+
+        names, offsets, targets = graph.names, graph.offsets, graph.targets
+        filtered = self._get_filter_mask()
+        result = {}
+        for current in self._filtered_bfs(node_id, max_depth):
+            result[names[current]] = [names[target] for target in targets[offsets[current]:offsets[current + 1]]
+                                      if not filtered[target]]
+        return result
+
+    def find_reverse_dependencies(self, target_package: str, max_depth: Optional[int] = 1) -> Dict[str, List[str]]:
         """
         Находит обратные зависимости для заданного пакета
         (пакеты, которые зависят от target_package)
         
         Args:
             target_package: Пакет, для которого ищем обратные зависимости
+            max_depth: Глубина поиска (1 - только прямые, None - все транзитивные)
             
         Returns:
             Dict[str, List[str]]: Граф обратных зависимостей
         """
         print(f"🔍 Поиск обратных зависимостей для пакета: {target_package}")
         
-        # Строим полный граф для поиска обратных зависимостей
-        full_graph = self._build_full_graph_for_reverse_search()
-        
-        # Ищем пакеты, которые зависят от target_package
-        reverse_deps = {}
-        
-        for package, dependencies in full_graph.items():
-            if target_package in dependencies:
-                if package not in reverse_deps:
-                    reverse_deps[package] = []
-                reverse_deps[package].append(target_package)
-        
-        return reverse_deps
+        reverse_index = self.get_reverse_index()
+        with span('graph.reverse_search'):
+            return reverse_index.transitive(target_package, max_depth)
+    
+    def get_reverse_index(self) -> 'ReverseIndex':
+        """Возвращает индекс обратных зависимостей по всему репозиторию (строится один раз)"""
+        if self._reverse_index is None:
+            from reverse_index import ReverseIndex
+            graph = self.get_compact_graph()
+            with span('graph.reverse_index'):
+                self._reverse_index = ReverseIndex(graph)
+        return self._reverse_index
     
-    def _build_full_graph_for_reverse_search(self) -> Dict[str, List[str]]:
+    def get_compact_graph(self) -> CompactGraph:
         """
-        Строит полный граф всех доступных пакетов для поиска обратных зависимостей
+        Возвращает полный граф репозитория в компактном CSR-представлении
+        (строится один раз за один проход по индексу; при build_processes > 1 -
+        параллельно по шардам индекса)
         """
         if self._full_graph_cache is not None:
             return self._full_graph_cache
         
-        full_graph = {}
+        if self.parser.uses_store:
+            # Готовый граф из файла хранилища: без разбора, общий для всех процессов
+            self._full_graph_cache = self.parser.get_store()
+            return self._full_graph_cache
         
-        if self.test_mode:
-            # В тестовом режиме читаем все пакеты из файла
-            full_graph = self._load_all_test_packages()
+        # Ошибка загрузки индекса передаётся вызывающему: пустой граф не кэшируется,
+        # иначе он заменял бы репозиторий до перезапуска
+        index = self.parser.get_index()
+        if self.build_processes > 1:
+            # Зависимости разрешаются в пуле процессов, шарды склеиваются сразу в CSR
+            from sharded_build import build_compact_graph_sharded
+            with span('graph.sharded_build'):
+                graph = build_compact_graph_sharded(index, self.build_processes, self.test_mode)
         else:
-            # В реальном режиме используем BFS для построения полного графа
-            # с увеличенной глубиной для более полного покрытия
-            original_max_depth = self.max_depth
-            self.max_depth = 10  # Временное увеличение глубины для обратного поиска
+            # Один проход по всему индексу репозитория (тестового или реального)
+            with span('graph.full_graph'):
+                full_graph = self.parser.get_all_dependencies()
+            with span('graph.compact'):
+                graph = CompactGraph.from_dict(full_graph)
+        self._full_graph_cache = graph
+        count('graph.full_edges', graph.edge_count)
+        return graph
+    
+    def get_components(self) -> 'SCCResult':
+        """Компоненты сильной связности полного графа репозитория (вычисляются один раз)"""
+        if self._components is None:
+            from scc import strongly_connected_components
+            graph = self.get_compact_graph()
+            with span('graph.scc'):
+                self._components = strongly_connected_components(graph)
+        return self._components
+    
+    def get_closure(self, package_name: str, max_depth: Optional[int] = None) -> int:
+        """
+        Транзитивное замыкание пакета (включая сам пакет) по полному графу репозитория
+        
+        Результат - битовое множество идентификаторов CompactGraph, кэшируемое
+        по ключу (пакет, глубина, фильтр). Полные замыкания без фильтра
+        вычисляются на графе компонент сильной связности: общие подграфы
+        считаются один раз и переиспользуются всеми зависящими пакетами.
+        
+        Args:
+            package_name: Корневой пакет
+            max_depth: Глубина в смысле max_depth построителя (None - без ограничения)
             
-            # Получаем список популярных пакетов для старта
-            starter_packages = self._get_starter_packages()
+        Returns:
+            int: Битовое множество (0, если пакет неизвестен или отфильтрован)
+        """
+        graph = self.get_compact_graph()
+        node_id = graph.node_id(package_name)
+        if node_id is None or self._should_filter_package(package_name):
+            return 0
+        
+        if max_depth is None and not self.package_filter:
+            return self._component_closure(node_id)
+        
+        key = (package_name, max_depth, self.package_filter)
+        bits = self.closure_cache.get(key)
+        if bits is None:
+            bits = bits_from_ids(self._filtered_bfs(node_id, max_depth))
+            self.closure_cache.put(key, bits)
+        return bits
+    
+    def get_union_closure(self, package_names: List[str], max_depth: Optional[int] = None) -> int:
+        """Замыкание объединения пакетов: побитовое ИЛИ замыканий каждого из них"""
+        bits = 0
+        for package_name in package_names:
+            bits |= self.get_closure(package_name, max_depth)
+        return bits
+    
+    def get_reachability_index(self) -> 'ReachabilityIndex':
+        """Индекс достижимости полного графа репозитория (строится один раз)"""
+        if self._reachability is None:
+            from reachability import ReachabilityIndex
+            components = self.get_components()
+            with span('graph.reachability'):
+                self._reachability = ReachabilityIndex.build(components)
+        return self._reachability
+    
+    def depends_on(self, package_name: str, dependency: str) -> bool:
+        """
+        Проверяет, зависит ли пакет транзитивно от dependency
+        
+        Ответ даётся по индексу достижимости полного графа (без учёта max_depth
+        и фильтра) проверкой одного бита; пакет считается зависящим от себя.
+        
+        Returns:
+            bool: False, если какого-либо из пакетов нет в графе
+        """
+        graph = self.get_compact_graph()
+        node_id = graph.node_id(package_name)
+        dependency_id = graph.node_id(dependency)
+        if node_id is None or dependency_id is None:
+            return False
+        return self.get_reachability_index().reaches(node_id, dependency_id)
+    
+    def filter_depending_on(self, package_names: List[str], dependency: str) -> List[str]:
+        """
+        Оставляет из списка пакеты, транзитивно зависящие от dependency
+        
+        Порядок списка сохраняется; неизвестные пакеты отбрасываются.
+        """
+        graph = self.get_compact_graph()
+        dependency_id = graph.node_id(dependency)
+        if dependency_id is None:
+            return []
+        node_ids = [node_id for node_id in map(graph.node_id, package_names) if node_id is not None]
+        names = graph.names
+        return [names[node_id] for node_id in self.get_reachability_index().filter_reaching(node_ids, dependency_id)]
+    
+    def resolve_dependency(self, dependency: str) -> Optional[Dict[str, str]]:
+        """
+        Запись о пакете (конкретная версия), которую apk выберет для зависимости
+        
+        Args:
+            dependency: Зависимость с возможным ограничением версии (pkg>=1.2, so:libfoo.so.1=1)
             
-            for starter in starter_packages:
-                try:
-                    graph_part = self.build_dependency_graph(starter)
-                    full_graph.update(graph_part)
-                except Exception:
+        Returns:
+            Optional[Dict[str, str]]: Запись о пакете или None, если ограничение не выполняется
+        """
+        return self.parser.get_index().resolve_record(dependency)
+    
+    def closure_names(self, bits: int) -> List[str]:
+        """Имена пакетов битового множества в порядке идентификаторов"""
+        names = self.get_compact_graph().names
+        return [names[node_id] for node_id in iter_bits(bits)]
+    
+    def _component_closure(self, node_id: int) -> int:
+        """Полное замыкание через компоненты сильной связности (с кэшированием по компонентам)"""
+        components = self.get_components()
+        condensed = self._get_condensed()
+        names = components.graph.names
+        
+        def key(component_id: int) -> tuple:
+            # Все пакеты компоненты имеют одинаковое замыкание - ключ по её первому пакету
+            return (names[min(components.components[component_id])], None, "")
+        
+        root_component = components.component_of[node_id]
+        bits = self.closure_cache.get(key(root_component))
+        if bits is not None:
+            return bits
+        
+        # Собираем достижимые компоненты без закэшированного замыкания
+        computed: Dict[int, int] = {}
+        pending = {root_component}
+        stack = [root_component]
+        while stack:
+            component_id = stack.pop()
+            for successor in condensed.successors(component_id):
+                if successor in pending or successor in computed:
                     continue
-            
-            self.max_depth = original_max_depth
+                cached = self.closure_cache.get(key(successor))
+                if cached is not None:
+                    computed[successor] = cached
+                else:
+                    pending.add(successor)
+                    stack.append(successor)
+        
+        # Алгоритм Тарьяна нумерует компоненты так, что зависимости идут раньше
+        for component_id in sorted(pending):
+            bits = bits_from_ids(components.components[component_id])
+            for successor in condensed.successors(component_id):
+                bits |= computed[successor]
+            computed[component_id] = bits
+            self.closure_cache.put(key(component_id), bits)
         
-        self._full_graph_cache = full_graph
-        return full_graph
+        return computed[root_component]
     
-    def _load_all_test_packages(self) -> Dict[str, List[str]]:
-        """Загружает все пакеты из тестового файла"""
-        full_graph = {}
+    def _filtered_bfs(self, node_id: int, max_depth: Optional[int]) -> List[int]:
+        """BFS по полному графу с пропуском отфильтрованных пакетов"""
+        graph = self.get_compact_graph()
+        offsets, targets = graph.offsets, graph.targets
+        filtered = self._get_filter_mask()
+        # Как в build_dependency_graph: раскрываются пакеты на глубине меньше max_depth - 1
+        levels = None if max_depth is None else max_depth - 1
         
-        try:
-            with open(self.repository_url, 'r', encoding='utf-8') as f:
-                content = f.read()
+        seen = bytearray(len(graph))
+        seen[node_id] = 1
+        order = [node_id]
+        frontier = [node_id]
+        depth = 0
+        while frontier and (levels is None or depth < levels):
+            next_frontier = []
+            for current in frontier:
+                for target in targets[offsets[current]:offsets[current + 1]]:
+                    if not seen[target] and not filtered[target]:
+                        seen[target] = 1
+                        next_frontier.append(target)
+            order.extend(next_frontier)
+            frontier = next_frontier
+            depth += 1
+        
+        return order
+    
+    def _get_filter_mask(self) -> bytearray:
+        """Маска отфильтрованных пакетов полного графа для текущего фильтра"""
+        graph = self.get_compact_graph()
+        if self._filter_mask is None or self._filter_mask[0] != self.package_filter or len(self._filter_mask[1]) != len(graph):
+            mask = bytearray(len(graph))
+            if self.package_filter:
+                for node_id, name in enumerate(graph.names):
+                    if self._should_filter_package(name):
+                        mask[node_id] = 1
+            self._filter_mask = (self.package_filter, mask)
+        return self._filter_mask[1]
+    
+    def _get_condensed(self) -> CompactGraph:
+        """Конденсированный граф компонент полного графа (строится один раз)"""
+        if self._condensed is None:
+            self._condensed = self.get_components().condensation()
+        return self._condensed
+    
+    def update_index(self, new_index: RepositoryIndex) -> 'IndexDiff':
+        """
+        Применяет новую версию индекса репозитория к закэшированным графам
+        
+        Пересчитываются зависимости только добавленных и изменённых пакетов
+        (по 'C'/'V'), а также пакетов, чьи виртуальные зависимости (so:, cmd:, ...)
+        могли разрешиться иначе из-за изменения поставщиков. Полный граф и индекс
+        обратных зависимостей обновляются без повторного разбора остальных записей;
+        компоненты сильной связности сбрасываются, только если изменились рёбра, а
+        построенный индекс достижимости пересчитывается только для пакетов, из
+        которых достижим изменённый пакет.
+        
+        Args:
+            new_index: Новая версия индекса
             
-            lines = content.split('\n')
-            for line in lines:
-                if ':' in line:
-                    package, deps_str = line.split(':', 1)
-                    package = package.strip()
-                    dependencies = deps_str.strip().split()
-                    full_graph[package] = dependencies
-                    
-        except Exception as e:
-            print(f"⚠️ Ошибка при загрузке тестовых пакетов: {e}")
+        Returns:
+            IndexDiff: Изменения индекса и затронутые пакеты
+        """
+        if self.parser.uses_store:
+            raise RuntimeError("Хранилище графа доступно только для чтения: пересоберите его через --build-store")
+        with span('graph.update_index'):
+            return self._update_index(new_index)
+    
+    def _update_index(self, new_index: RepositoryIndex) -> 'IndexDiff':
+        """Применение нового индекса (см. update_index)"""
+        from index_diff import diff_indexes
+        
+        old_index = self.parser.index
+        
+        if old_index is None or self._full_graph_cache is None:
+            # Закэшированного графа по этому индексу нет - заменяем индекс и сбрасываем
+            # все производные структуры: они строятся заново при следующем запросе
+            diff = diff_indexes(old_index or RepositoryIndex(), new_index)
+            self.parser.index = new_index
+            self.parser.package_cache.clear()
+            self._reset_graph_caches()
+            return diff
+        
+        diff = diff_indexes(old_index, new_index)
+        if not diff:
+            self.parser.index = new_index
+            return diff
         
-        return full_graph
+        raw_dependents = self._get_raw_dependents(old_index)
+        
+        # Имена, разрешение которых могло измениться: сами пакеты и всё, что они предоставляют
+        affected_names = set()
+        for name in diff.touched:
+            affected_names.add(name)
+            for record in (old_index.get(name), new_index.get(name)):
+                if record is not None:
+                    affected_names.update(VERSION_SPLIT_RE.split(provided, 1)[0]
+                                          for provided in record.get('p', '').split())
+        
+        recompute = diff.added | diff.changed
+        for name in affected_names:
+            recompute.update(raw_dependents.get(name, ()))
+        recompute -= diff.removed
+        
+        # Обновляем индекс и вспомогательные структуры
+        self.parser.index = new_index
+        for name in diff.touched | recompute:
+            self.parser.package_cache.pop(name, None)
+        for name in diff.removed | diff.changed:
+            for dep in dependency_names(old_index.get(name)):
+                raw_dependents.get(dep, set()).discard(name)
+        for name in diff.added | diff.changed:
+            for dep in dependency_names(new_index.get(name)):
+                raw_dependents.setdefault(dep, set()).add(name)
+        
+        # Пересчитываем рёбра только для затронутых пакетов
+        old_graph = self._full_graph_cache
+        old_view = old_graph.as_dict_view()
+        updates = {}
+        for name in recompute:
+            dependencies = self.parser.get_record_dependencies(new_index.get(name))
+            if old_view.get(name) != dependencies:
+                updates[name] = dependencies
+        
+        diff.updated_packages = set(updates) | diff.removed
+        if not diff.updated_packages:
+            return diff
+        
+        new_graph = old_graph.with_updates(updates, diff.removed)
+        self._full_graph_cache = new_graph
+        if self._reverse_index is not None:
+            # Обратные строки пересчитываются только у старых и новых зависимостей изменённых пакетов
+            self._reverse_index = self._reverse_index.updated(
+                new_graph, (new_graph.ids[name] for name in diff.updated_packages))
+        # Компоненты сильной связности строятся заново (Тарьян, O(V + E)) при следующем обращении
+        self._components = None
+        self._condensed = None
+        self._filter_mask = None
+        
+        # Транзитивные замыкания меняются у пакетов, из которых достижим изменённый пакет
+        affected = diff.updated_packages | self.get_reverse_index().dependents_of_any(diff.updated_packages)
+        diff.affected_packages = affected
+        self.closure_cache.invalidate(lambda key: key[0] in affected)
+        
+        if self._reachability is not None:
+            components = self.get_components()
+            with span('graph.reachability'):
+                self._reachability = self._reachability.updated(
+                    components, (new_graph.ids[name] for name in affected))
+        
+        return diff
+    
+    def _reset_graph_caches(self) -> None:
+        """Сбрасывает полный граф и все построенные по нему структуры"""
+        self._full_graph_cache = None
+        self._reverse_index = None
+        self._components = None
+        self._condensed = None
+        self._filter_mask = None
+        self._reachability = None
+        self._raw_dependents = None
+        self.closure_cache.clear()
+    
+    def load_index(self) -> RepositoryIndex:
+        """
+        Загружает свежую версию индекса из тех же источников, что и текущий
+        
+        Индекс не применяется: это делает update_index, поэтому загрузку
+        можно выполнять, не блокируя запросы к текущему графу.
+        """
+        if self.index_loader is not None:
+            return self.index_loader()
+        return self.parser._load_index()
     
-    def _get_starter_packages(self) -> List[str]:
-        """Возвращает список пакетов для начала построения полного графа"""
-        # В реальном режиме используем несколько популярных пакетов как стартовые точки
-        popular_packages = [
-            'nginx', 'bash', 'python3', 'openssl', 'curl', 
-            'git', 'gcc', 'make', 'linux-firmware'
-        ]
-        return popular_packages
+    def refresh_index(self) -> 'IndexDiff':
+        """Загружает свежую версию индекса и применяет изменения инкрементально"""
+        return self.update_index(self.load_index())
+    
+    def _get_raw_dependents(self, index: RepositoryIndex) -> Dict[str, Set[str]]:
+        """Имя зависимости из поля 'D' (до разрешения поставщиков) -> пакеты, которые её указывают"""
+        if self._raw_dependents is None:
+            raw_dependents: Dict[str, Set[str]] = {}
+            for name, record in index.packages.items():
+                for dep in dependency_names(record):
+                    raw_dependents.setdefault(dep, set()).add(name)
+            self._raw_dependents = raw_dependents
+        return self._raw_dependents
     
     def _should_filter_package(self, package_name: str) -> bool:
         """Проверяет, нужно ли фильтровать пакет"""
@@ -162,10 +568,54 @@ class DependencyGraph:
             return False
         return self.package_filter in package_name.lower()
     
-    def get_statistics(self) -> Dict[str, int]:
-        """Возвращает статистику по графу"""
+    def get_repository_analytics(self) -> List[Dict]:
+        """
+        Метрики сразу для всех пакетов репозитория (по полному графу, без фильтра)
+        
+        Число транзитивных зависимостей, суммарный установленный размер ('I')
+        замыкания, реальная максимальная глубина и число зависящих пакетов
+        вычисляются распространением битовых множеств по графу компонент
+        сильной связности, а не отдельным BFS для каждого пакета.
+        
+        Returns:
+            List[Dict]: Метрики пакетов (см. analytics.analyze_repository)
+        """
+        from analytics import analyze_repository
+        
+        graph = self.get_compact_graph()
+        components = self.get_components()
+        with span('graph.analytics'):
+            return analyze_repository(graph, components, self._installed_sizes(graph))
+    
+    def _installed_sizes(self, graph: CompactGraph) -> List[int]:
+        """Установленный размер пакетов (поле 'I') по идентификаторам графа"""
+        sizes = [0] * len(graph)
+        if self.parser.uses_store:
+            # Хранилище графа не содержит полей записей
+            return sizes
+        
+        index = self.parser.get_index()
+        for node_id, name in enumerate(graph.names):
+            record = index.get(name)
+            if record is not None and record.get('I', '').isdigit():
+                sizes[node_id] = int(record['I'])
+        return sizes
+    
+    def get_statistics(self, root_packages: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Возвращает статистику по графу
+        
+        Args:
+            root_packages: Корневые пакеты; если заданы, число пакетов считается
+                по объединению их замыканий (с учётом max_depth и фильтра),
+                иначе - по последнему построенному графу
+        """
+        if root_packages is not None:
+            total_packages = popcount(self.get_union_closure(root_packages, self.max_depth))
+        else:
+            total_packages = len(self.visited)
         return {
-            'total_packages': len(self.visited),
+            'total_packages': total_packages,
             'cycles_detected': len(self.cycles_detected),
             'max_depth': self.max_depth
         }
\ No newline at end of file
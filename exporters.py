@@ -0,0 +1,251 @@
+import json
+import re
+from typing import Dict, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+from compact_graph import CompactGraph
+from scc import strongly_connected_components
+
+EXPORT_FORMATS = ('plantuml', 'dot', 'graphml', 'json')
+
+_UNSAFE_ID_RE = re.compile(r'[^A-Za-z0-9_]')
+
+GraphLike = Union[CompactGraph, Mapping[str, List[str]]]
+
+
+class NodeIds:
+    """
+    Выдаёт безопасные идентификаторы узлов для PlantUML/DOT/GraphML
+
+    Имена вида py3-foo или so:libc.musl-x86_64.so.1 недопустимы как алиасы,
+    поэтому недопустимые символы заменяются на '_', а совпадения после замены
+    (py3-foo и py3_foo) различаются числовым суффиксом.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, str] = {}
+        self._used = set()
+
+    def __getitem__(self, name: str) -> str:
+        node_id = self._ids.get(name)
+        if node_id is None:
+            base = _UNSAFE_ID_RE.sub('_', name) or '_'
+            if base[0].isdigit():
+                base = '_' + base
+            node_id = base
+            suffix = 1
+            while node_id in self._used:
+                suffix += 1
+                node_id = f"{base}_{suffix}"
+            self._used.add(node_id)
+            self._ids[name] = node_id
+        return node_id
+
+
+def export_graph(out: TextIO, graph: GraphLike, export_format: str, root_package: Optional[str] = None,
+                 condensed: bool = False, max_depth: Optional[int] = None,
+                 max_nodes: Optional[int] = None) -> None:
+    """
+    Записывает граф в указанном формате, при необходимости сокращая его
+
+    Args:
+        out: Файловый объект для записи
+        graph: Граф зависимостей
+        export_format: plantuml, dot, graphml или json
+        root_package: Корневой пакет (для выделения и ограничения подграфа)
+        condensed: Выводить конденсированный граф компонент сильной связности
+        max_depth: Ограничение глубины подграфа от root_package
+        max_nodes: Ограничение числа раскрываемых узлов подграфа
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат экспорта: {export_format} "
+                         f"(допустимо: {', '.join(EXPORT_FORMATS)})")
+
+    if condensed:
+        graph, root_package = condense_graph(graph, root_package)
+    if root_package is not None and (max_depth is not None or max_nodes is not None):
+        graph = limit_graph(graph, root_package, max_depth, max_nodes)
+
+    writers = {
+        'plantuml': write_plantuml,
+        'dot': write_dot,
+        'graphml': write_graphml,
+        'json': write_json_edges
+    }
+    writers[export_format](out, graph, root_package)
+
+
+def write_plantuml(out: TextIO, graph: GraphLike, root_package: Optional[str] = None,
+                   reverse_deps: Optional[Mapping[str, List[str]]] = None, sort_nodes: bool = False) -> None:
+    """
+    Потоково записывает описание графа на языке PlantUML
+
+    Узлы объявляются при первом проходе по графу, рёбра - при втором,
+    так что в памяти не накапливается текст всего описания.
+    """
+    graph = _as_mapping(graph)
+    ids = NodeIds()
+
+    out.write("@startuml\nskinparam monochrome true\nskinparam shadowing false\n")
+
+    nodes = _iter_nodes(graph, reverse_deps)
+    if sort_nodes:
+        nodes = iter(sorted(nodes))
+
+    for package in nodes:
+        label = package.replace('"', "'")
+        if package == root_package:
+            out.write(f"rectangle \"{label}\" as {ids[package]} #lightblue\n")
+        elif package in graph:
+            out.write(f"rectangle \"{label}\" as {ids[package]}\n")
+        else:
+            out.write(f"rectangle \"{label}\" as {ids[package]} #pink\n")
+
+    for package, dep in _iter_edges(graph):
+        out.write(f"{ids[package]} --> {ids[dep]}\n")
+
+    if reverse_deps:
+        for package, dep in _iter_edges(reverse_deps):
+            out.write(f"{ids[package]} -[dashed]-> {ids[dep]} : reverse\n")
+
+    out.write("@enduml")
+
+
+def write_dot(out: TextIO, graph: GraphLike, root_package: Optional[str] = None) -> None:
+    """Потоково записывает граф в формате Graphviz DOT"""
+    graph = _as_mapping(graph)
+    ids = NodeIds()
+
+    out.write("digraph dependencies {\n  node [shape=box];\n")
+    for package in _iter_nodes(graph):
+        # Строка DOT экранирует только кавычки и обратную косую черту: \uXXXX Graphviz не понимает
+        attributes = [f"label={json.dumps(package, ensure_ascii=False)}"]
+        if package == root_package:
+            attributes.append('style=filled, fillcolor=lightblue')
+        elif package not in graph:
+            attributes.append('style=filled, fillcolor=pink')
+        out.write(f"  {ids[package]} [{', '.join(attributes)}];\n")
+
+    for package, dep in _iter_edges(graph):
+        out.write(f"  {ids[package]} -> {ids[dep]};\n")
+    out.write("}\n")
+
+
+def write_graphml(out: TextIO, graph: GraphLike, root_package: Optional[str] = None) -> None:
+    """Потоково записывает граф в формате GraphML"""
+    # xml.sax.saxutils тянет за собой urllib.request - импортируем только для GraphML
+    from xml.sax.saxutils import escape, quoteattr
+    
+    graph = _as_mapping(graph)
+    ids = NodeIds()
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+              '  <key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+              '  <key id="root" for="node" attr.name="root" attr.type="boolean"/>\n'
+              '  <graph id="dependencies" edgedefault="directed">\n')
+
+    for package in _iter_nodes(graph):
+        out.write(f'    <node id={quoteattr(ids[package])}><data key="name">{escape(package)}</data>')
+        if package == root_package:
+            out.write('<data key="root">true</data>')
+        out.write('</node>\n')
+
+    for package, dep in _iter_edges(graph):
+        out.write(f'    <edge source={quoteattr(ids[package])} target={quoteattr(ids[dep])}/>\n')
+
+    out.write('  </graph>\n</graphml>\n')
+
+
+def write_json_edges(out: TextIO, graph: GraphLike, root_package: Optional[str] = None) -> None:
+    """Потоково записывает граф как JSON-массив рёбер [[пакет, зависимость], ...]"""
+    graph = _as_mapping(graph)
+
+    out.write("[")
+    separator = "\n"
+    for edge in _iter_edges(graph):
+        out.write(separator + json.dumps(edge, ensure_ascii=False))
+        separator = ",\n"
+    out.write("\n]\n")
+
+
+def condense_graph(graph: GraphLike, root_package: Optional[str] = None) -> Tuple[Mapping[str, List[str]], Optional[str]]:
+    """
+    Заменяет граф конденсированным графом компонент сильной связности
+
+    Returns:
+        Tuple: (конденсированный граф, имя компоненты, содержащей root_package)
+    """
+    components = strongly_connected_components(graph)
+    condensed = components.condensation()
+
+    root_component = None
+    if root_package is not None:
+        root_id = components.graph.node_id(root_package)
+        if root_id is not None:
+            root_component = condensed.names[components.component_of[root_id]]
+
+    return condensed.as_dict_view(), root_component
+
+
+def limit_graph(graph: GraphLike, root_package: str, max_depth: Optional[int] = None,
+                max_nodes: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Выделяет подграф, достижимый из root_package, с ограничением глубины и размера
+
+    Args:
+        graph: Граф зависимостей
+        root_package: Корневой пакет
+        max_depth: Число уровней от корня (None - без ограничения)
+        max_nodes: Максимальное число раскрываемых узлов (None - без ограничения)
+
+    Returns:
+        Dict[str, List[str]]: Подграф {пакет: [зависимости]}
+    """
+    graph = _as_mapping(graph)
+    subgraph: Dict[str, List[str]] = {}
+    seen = {root_package}
+    frontier = [root_package]
+    depth = 0
+
+    while frontier and (max_depth is None or depth < max_depth):
+        next_frontier = []
+        for package in frontier:
+            if max_nodes is not None and len(subgraph) >= max_nodes:
+                return subgraph
+            dependencies = graph.get(package)
+            if dependencies is None:
+                continue
+            subgraph[package] = list(dependencies)
+            for dep in dependencies:
+                if dep not in seen:
+                    seen.add(dep)
+                    next_frontier.append(dep)
+        frontier = next_frontier
+        depth += 1
+
+    return subgraph
+
+
+def _as_mapping(graph: GraphLike) -> Mapping[str, List[str]]:
+    """Приводит CompactGraph к словарному представлению"""
+    if isinstance(graph, CompactGraph):
+        return graph.as_dict_view()
+    return graph
+
+
+def _iter_nodes(graph: Mapping[str, List[str]],
+                reverse_deps: Optional[Mapping[str, List[str]]] = None) -> Iterator[str]:
+    """Все узлы графа (ключи и зависимости) без повторов, в порядке первого появления"""
+    seen = set()
+    for source in (graph, reverse_deps or {}):
+        for package, dependencies in source.items():
+            for name in (package, *dependencies):
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def _iter_edges(graph: Mapping[str, List[str]]) -> Iterator[Tuple[str, str]]:
+    """Рёбра графа (пакет, зависимость) в порядке графа"""
+    for package, dependencies in graph.items():
+        for dep in dependencies:
+            yield package, dep
@@ -0,0 +1,213 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Iterator, Optional
+from compact_graph import CompactGraph
+
+MAGIC = b'APKGRAPH'
+FORMAT_VERSION = 1
+BYTE_ORDERS = {'little': 1, 'big': 2}
+
+# Секции файла в порядке записи
+SECTIONS = ('string_offsets', 'strings', 'sorted_ids', 'has_record',
+            'offsets', 'targets', 'reverse_offsets', 'reverse_targets')
+
+# Заголовок: сигнатура, версия формата, порядок байт, число вершин, рёбер и записей,
+# затем (смещение, длина) каждой секции
+HEADER = struct.Struct('<8sIIQQQ' + 'QQ' * len(SECTIONS))
+ALIGNMENT = 8
+
+
+def write_graph_store(path: str, graph: CompactGraph) -> None:
+    """
+    Записывает CSR-граф в файл хранилища
+
+    Файл содержит таблицу строк (смещения и UTF-8 имена), отсортированную
+    по именам перестановку идентификаторов для поиска без построения словаря,
+    а также массивы прямого и обратного графа, выровненные по 8 байт, чтобы
+    их можно было использовать напрямую через mmap.
+
+    Args:
+        path: Путь к файлу (запись атомарная: через временный файл)
+        graph: Граф (CompactGraph или MappedGraph)
+    """
+    encoded = [name.encode('utf-8') for name in graph.names]
+    string_offsets = array('I', [0])
+    total = 0
+    for name in encoded:
+        total += len(name)
+        string_offsets.append(total)
+
+    sorted_ids = array('i', sorted(range(len(encoded)), key=encoded.__getitem__))
+    reverse = graph.transpose()
+    sections = {
+        'string_offsets': string_offsets.tobytes(),
+        'strings': b''.join(encoded),
+        'sorted_ids': sorted_ids.tobytes(),
+        'has_record': bytes(graph.has_record),
+        'offsets': array('i', graph.offsets).tobytes(),
+        'targets': array('i', graph.targets).tobytes(),
+        'reverse_offsets': array('i', reverse.offsets).tobytes(),
+        'reverse_targets': array('i', reverse.targets).tobytes()
+    }
+
+    table = []
+    position = _align(HEADER.size)
+    for name in SECTIONS:
+        table.extend((position, len(sections[name])))
+        position = _align(position + len(sections[name]))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDERS[sys.byteorder],
+                         len(encoded), len(graph.targets), bytes(graph.has_record).count(1), *table)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for index, name in enumerate(SECTIONS):
+            f.write(b'\x00' * (table[2 * index] - f.tell()))
+            f.write(sections[name])
+    os.replace(tmp_path, path)
+
+
+def open_graph_store(path: str) -> 'MappedGraph':
+    """Открывает файл хранилища графа (FileNotFoundError, если файла нет)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Хранилище графа {path} не найдено")
+    return MappedGraph(path)
+
+
+class MappedGraph(CompactGraph):
+    """
+    CSR-граф, отображённый в память из файла хранилища (только для чтения)
+
+    Открытие не требует разбора: массивы смещений и рёбер - это memoryview
+    поверх mmap, имена декодируются по запросу, а поиск имени - двоичный
+    поиск по отсортированной перестановке. Все процессы, открывшие один
+    файл, разделяют одну копию страниц в кэше ОС. Обратный граф также
+    хранится в файле, поэтому transpose() ничего не вычисляет.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        if len(view) < HEADER.size:
+            raise ValueError(f"Файл {path} не является хранилищем графа")
+        magic, version, byte_order, node_count, edge_count, record_count, *table = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"Файл {path} не является хранилищем графа")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища графа: {version}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise ValueError("Хранилище графа записано на платформе с другим порядком байт")
+
+        sections = {name: view[table[2 * index]:table[2 * index] + table[2 * index + 1]]
+                    for index, name in enumerate(SECTIONS)}
+        casts = {name: sections[name].cast('I' if name == 'string_offsets' else 'i')
+                 for name in SECTIONS if name not in ('strings', 'has_record')}
+        # Все представления буфера освобождаются перед закрытием mmap
+        self._buffers = [view] + list(sections.values()) + list(casts.values())
+        self._node_count = node_count
+        self._record_count = record_count
+        self.names = StringTable(casts['string_offsets'], sections['strings'])
+        self.ids = NameIndex(self.names, casts['sorted_ids'])
+        self.has_record = sections['has_record']
+        self.offsets = casts['offsets']
+        self.targets = casts['targets']
+        self._reverse_offsets = casts['reverse_offsets']
+        self._reverse_targets = casts['reverse_targets']
+
+    def __len__(self) -> int:
+        return self._node_count
+
+    def record_count(self) -> int:
+        return self._record_count
+
+    def transpose(self) -> 'MappedGraph':
+        """Обратный граф из файла (без вычислений)"""
+        reverse = MappedGraph.__new__(MappedGraph)
+        reverse.__dict__.update(self.__dict__)
+        reverse.offsets, reverse._reverse_offsets = self._reverse_offsets, self.offsets
+        reverse.targets, reverse._reverse_targets = self._reverse_targets, self.targets
+        return reverse
+
+    def close(self) -> None:
+        """Освобождает отображение файла (граф после этого использовать нельзя)"""
+        for buffer in reversed(self._buffers):
+            buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'MappedGraph':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class StringTable(Sequence):
+    """Имена вершин: декодируются из таблицы строк при обращении"""
+
+    def __init__(self, offsets: memoryview, strings: memoryview):
+        self._offsets = offsets
+        self._strings = strings
+
+    def __getitem__(self, node_id):
+        if isinstance(node_id, slice):
+            return [self[index] for index in range(*node_id.indices(len(self)))]
+        return str(self._strings[self._offsets[node_id]:self._offsets[node_id + 1]], 'utf-8')
+
+    def encoded(self, node_id: int) -> bytes:
+        return self._strings[self._offsets[node_id]:self._offsets[node_id + 1]].tobytes()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        for node_id in range(len(self)):
+            yield self[node_id]
+
+
+class NameIndex(Mapping):
+    """Имя -> идентификатор: двоичный поиск по перестановке, отсортированной по именам"""
+
+    def __init__(self, names: StringTable, sorted_ids: memoryview):
+        self._names = names
+        self._sorted_ids = sorted_ids
+
+    def get(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        key = name.encode('utf-8')
+        sorted_ids, names = self._sorted_ids, self._names
+        low, high = 0, len(sorted_ids)
+        while low < high:
+            middle = (low + high) // 2
+            if names.encoded(sorted_ids[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(sorted_ids) and names.encoded(sorted_ids[low]) == key:
+            return sorted_ids[low]
+        return default
+
+    def __getitem__(self, name: str) -> int:
+        node_id = self.get(name)
+        if node_id is None:
+            raise KeyError(name)
+        return node_id
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self.get(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
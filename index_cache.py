@@ -0,0 +1,184 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from typing import BinaryIO, Callable, ContextManager, Dict, Iterator, Mapping, Optional, Tuple
+from repository_index import RepositoryIndex
+from profiler import PROFILER, count
+
+# Версия формата снимка: при изменении структуры индекса старые снимки игнорируются
+SNAPSHOT_VERSION = 3
+
+# Транспорт: (URL, заголовки запроса) -> контекст с (HTTP-статус, заголовки ответа, тело)
+IndexOpener = Callable[[str, Dict[str, str]], ContextManager[Tuple[int, Mapping[str, str], BinaryIO]]]
+
+
+@contextlib.contextmanager
+def urlopen_index(url: str, headers: Dict[str, str]) -> Iterator[Tuple[int, Mapping[str, str], BinaryIO]]:
+    """Транспорт через urllib: http(s) с учётом прокси, file:// и другие схемы"""
+    import urllib.request
+    import urllib.error
+
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as e:
+        with e:
+            yield e.code, e.headers, e
+        return
+    with response:
+        # Для file:// статуса нет - содержимое получено целиком
+        yield response.status or 200, response.headers, response
+
+
+class IndexCache:
+    """
+    Локальный кэш APKINDEX с условной перепроверкой (ETag / Last-Modified)
+
+    Для каждой пары (репозиторий, архитектура) в каталоге кэша хранятся:
+      <key>.tar.gz  - загруженный архив APKINDEX
+      <key>.pickle  - предварительно разобранный снимок индекса
+      <key>.json    - метаданные HTTP (ETag, Last-Modified, время проверки)
+    """
+
+    def __init__(self, cache_dir: str, max_age: float = 0):
+        """
+        Args:
+            cache_dir: Каталог для файлов кэша (создаётся при необходимости)
+            max_age: Время в секундах, в течение которого снимок используется
+                     без обращения к серверу (0 - перепроверять при каждом запуске)
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_age = max_age
+
+    def get_index(self, repository_url: str, arch: str,
+                  parse: Callable[[BinaryIO], RepositoryIndex],
+                  opener: Optional['IndexOpener'] = None) -> RepositoryIndex:
+        """
+        Возвращает индекс из кэша или загружает его заново
+
+        Args:
+            repository_url: URL репозитория
+            arch: Архитектура (x86_64, aarch64, ...)
+            parse: Функция потокового разбора архива APKINDEX.tar.gz
+            opener: Транспорт для запросов (по умолчанию urlopen_index - urllib)
+
+        Returns:
+            RepositoryIndex: Актуальный индекс пакетов
+        """
+        opener = opener or urlopen_index
+        index_url = f"{repository_url}/{arch}/APKINDEX.tar.gz"
+        paths = self._paths(repository_url, arch)
+        meta = self._load_meta(paths['meta'])
+
+        if meta and self.max_age and time.time() - meta.get('checked_at', 0) < self.max_age:
+            index = self._load_snapshot(paths['snapshot'])
+            if index is not None:
+                count('index_cache.hit')
+                return index
+
+        headers = {}
+        if meta and os.path.exists(paths['snapshot']):
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        print(f"📥 Проверка индекса пакетов: {index_url}")
+
+        with opener(index_url, headers) as (status, response_headers, body):
+            if status != 304:
+                return self._store(paths, status, response_headers, body, parse)
+
+        index = self._load_snapshot(paths['snapshot'])
+        if index is not None:
+            count('index_cache.hit')
+            meta['checked_at'] = time.time()
+            self._write_file(paths['meta'], json.dumps(meta).encode('utf-8'))
+            return index
+
+        # Снимок повреждён - загружаем индекс без условных заголовков
+        with opener(index_url, {}) as (status, response_headers, body):
+            return self._store(paths, status, response_headers, body, parse)
+
+    def _store(self, paths: Dict[str, str], status: int, headers: Mapping[str, str], body: BinaryIO,
+               parse: Callable[[BinaryIO], RepositoryIndex]) -> RepositoryIndex:
+        """Разбирает архив по мере загрузки и сохраняет архив, снимок и метаданные"""
+        if status != 200:
+            raise ConnectionError(f"Не удалось загрузить индекс пакетов: {status}")
+        count('index_cache.miss')
+        body = PROFILER.wrap_reader(body, 'index.download', 'bytes_fetched')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{paths['archive']}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as archive:
+            index = parse(_TeeReader(body, archive))
+            # Дописываем остаток ответа, который не понадобился для разбора
+            shutil.copyfileobj(body, archive)
+        os.replace(tmp_path, paths['archive'])
+
+        self._write_file(paths['snapshot'], pickle.dumps(
+            {'version': SNAPSHOT_VERSION, 'index': index},
+            protocol=pickle.HIGHEST_PROTOCOL))
+        meta = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'checked_at': time.time()
+        }
+        self._write_file(paths['meta'], json.dumps(meta).encode('utf-8'))
+
+        return index
+
+    def _paths(self, repository_url: str, arch: str) -> Dict[str, str]:
+        """Пути к файлам кэша для пары (репозиторий, архитектура)"""
+        key = hashlib.sha256(f"{repository_url.rstrip('/')}|{arch}".encode('utf-8')).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return {
+            'archive': base + '.tar.gz',
+            'snapshot': base + '.pickle',
+            'meta': base + '.json'
+        }
+
+    def _load_meta(self, path: str) -> Optional[Dict]:
+        """Читает метаданные кэша (None, если их нет или они повреждены)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_snapshot(self, path: str) -> Optional[RepositoryIndex]:
+        """Загружает разобранный снимок индекса (None, если он недоступен)"""
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            # Повреждённый снимок может вызвать почти любую ошибку разбора - загружаем индекс заново
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            return None
+
+        return snapshot['index']
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        """Атомарно записывает файл кэша"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class _TeeReader:
+    """Поток-обёртка, копирующая всё прочитанное в файл"""
+
+    def __init__(self, source: BinaryIO, sink: BinaryIO):
+        self.source = source
+        self.sink = sink
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.sink.write(data)
+        return data
@@ -0,0 +1,68 @@
+from typing import Dict, Set
+from repository_index import RepositoryIndex
+
+
+class IndexDiff:
+    """Различия между двумя версиями индекса репозитория"""
+
+    def __init__(self):
+        self.added: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.changed: Set[str] = set()
+        # Заполняются при применении изменений к графу
+        self.updated_packages: Set[str] = set()
+        self.affected_packages: Set[str] = set()
+
+    @property
+    def touched(self) -> Set[str]:
+        """Все добавленные, удалённые и изменённые пакеты"""
+        return self.added | self.removed | self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (f"IndexDiff(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)}, updated={len(self.updated_packages)}, "
+                f"affected={len(self.affected_packages)})")
+
+
+def record_fingerprint(record: Dict[str, str]) -> tuple:
+    """
+    Отпечаток записи для сравнения версий индекса
+
+    Для записей APKINDEX достаточно контрольной суммы 'C' и версии 'V';
+    записи тестового репозитория их не имеют, поэтому сравниваются по полям 'D' и 'p'.
+    """
+    if 'C' in record or 'V' in record:
+        return record.get('C'), record.get('V')
+    return record.get('D'), record.get('p')
+
+
+def diff_indexes(old_index: RepositoryIndex, new_index: RepositoryIndex) -> IndexDiff:
+    """
+    Сравнивает два индекса по имени пакета и отпечатку записи
+
+    Args:
+        old_index: Предыдущая версия индекса
+        new_index: Новая версия индекса
+
+    Returns:
+        IndexDiff: Добавленные, удалённые и изменённые пакеты
+    """
+    diff = IndexDiff()
+    old_packages = old_index.packages
+    new_packages = new_index.packages
+
+    for name, record in new_packages.items():
+        old_record = old_packages.get(name)
+        if old_record is None:
+            diff.added.add(name)
+        elif record_fingerprint(old_record) != record_fingerprint(record):
+            diff.changed.add(name)
+
+    for name in old_packages:
+        if name not in new_packages:
+            diff.removed.add(name)
+
+    return diff
@@ -3,7 +3,23 @@
 Основной модуль для визуализации графа зависимостей пакетов
 """
 
-from cli import main as cli_main
+import sys
+
+
+def main():
+    """
+    Точка входа: без аргументов сразу запускается визуализация по config.json
+
+    Разбор аргументов (argparse) и модули остальных режимов загружаются,
+    только если они заданы в командной строке.
+    """
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        cli_main()
+    else:
+        from cli import DEFAULT_CONFIG, run_visualization
+        run_visualization(DEFAULT_CONFIG)
+
 
 if __name__ == "__main__":
-    cli_main()
\ No newline at end of file
+    main()
@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+from typing import BinaryIO, Dict, List, Optional, TextIO
+
+
+class _NullSpan:
+    """Пустой интервал: используется, когда профилирование выключено"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Интервал времени, записываемый в профиль при выходе из блока with"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler._record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class _TimedReader:
+    """Обёртка файлового объекта: время внутри read() и число прочитанных байт"""
+
+    def __init__(self, profiler: 'Profiler', fileobj: BinaryIO, name: str, bytes_counter: Optional[str]):
+        self._profiler = profiler
+        self._fileobj = fileobj
+        self._name = name
+        self._bytes_counter = bytes_counter
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter_ns()
+        data = self._fileobj.read(size)
+        self._profiler.add_time(self._name, time.perf_counter_ns() - start)
+        if self._bytes_counter:
+            self._profiler.count(self._bytes_counter, len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+
+
+class Profiler:
+    """
+    Инструментирование горячих участков: интервалы времени и счётчики
+
+    Пока профилирование выключено, span() возвращает общий пустой контекст,
+    а count() сразу возвращается, поэтому накладные расходы сводятся к одной
+    проверке флага. Включённый профиль печатается сводкой по этапам и может
+    быть сохранён в формате Chrome trace events (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Очищает накопленные интервалы и счётчики"""
+        self.events: List[tuple] = []
+        self.totals: Dict[str, List[int]] = {}
+        self.counters: Dict[str, int] = {}
+        self._origin = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str):
+        """Контекстный менеджер, измеряющий время блока"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличивает счётчик"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name: str, duration_ns: int, calls: int = 1) -> None:
+        """Добавляет время к этапу без отдельного интервала (для частых мелких вызовов)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self.totals.setdefault(name, [0, 0])
+            total[0] += calls
+            total[1] += duration_ns
+
+    def wrap_reader(self, fileobj: BinaryIO, name: str, bytes_counter: Optional[str] = None) -> BinaryIO:
+        """Оборачивает поток для учёта времени чтения (без обёртки, если профилирование выключено)"""
+        if not self.enabled:
+            return fileobj
+        return _TimedReader(self, fileobj, name, bytes_counter)
+
+    def _record(self, name: str, start: int, end: int) -> None:
+        with self._lock:
+            self.events.append((name, start, end, threading.get_ident()))
+            total = self.totals.setdefault(name, [0, 0])
+            total[0] += 1
+            total[1] += end - start
+
+    def report(self, out: TextIO) -> None:
+        """Печатает сводку: время по этапам (включая вложенные) и счётчики"""
+        wall = max(time.perf_counter_ns() - self._origin, 1)
+        out.write("\n⏱ Профиль выполнения (время этапа включает вложенные этапы):\n")
+        out.write(f"  {'Этап':<28}{'Вызовы':>8}{'Время, мс':>12}{'Доля':>8}\n")
+        with self._lock:
+            totals = sorted(self.totals.items(), key=lambda item: -item[1][1])
+            counters = sorted(self.counters.items())
+        for name, (calls, duration) in totals:
+            out.write(f"  {name:<28}{calls:>8}{duration / 1e6:>12.1f}{duration / wall:>8.1%}\n")
+        out.write(f"  {'всего':<28}{'':>8}{wall / 1e6:>12.1f}\n")
+        if counters:
+            out.write("  Счётчики:\n")
+            for name, value in counters:
+                out.write(f"    {name}: {value}\n")
+
+    def chrome_trace(self) -> Dict:
+        """Профиль в формате Chrome trace events"""
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        trace_events = [
+            {'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': 1, 'tid': thread_id,
+             'ts': (start - self._origin) / 1000, 'dur': (end - start) / 1000}
+            for name, start, end, thread_id in events
+        ]
+        if counters:
+            trace_events.append({'name': 'counters', 'ph': 'C', 'pid': 1, 'tid': 0,
+                                 'ts': (time.perf_counter_ns() - self._origin) / 1000, 'args': counters})
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Сохраняет профиль в JSON-файл для chrome://tracing или Perfetto"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+# Общий профилировщик процесса
+PROFILER = Profiler()
+
+
+def span(name: str):
+    """Интервал времени общего профилировщика"""
+    if not PROFILER.enabled:
+        return _NULL_SPAN
+    return _Span(PROFILER, name)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Счётчик общего профилировщика"""
+    if PROFILER.enabled:
+        PROFILER.count(name, value)
@@ -0,0 +1,83 @@
+from typing import Iterable, List, Optional, Set
+from compact_graph import CompactGraph
+from scc import SCCResult
+from closure_cache import bits_from_ids, popcount
+
+
+class ReachabilityIndex:
+    """
+    Индекс достижимости полного графа: для каждой вершины - битовое множество
+    всех пакетов, от которых она транзитивно зависит (включая её саму)
+
+    Множества вычисляются один раз по графу компонент сильной связности в
+    топологическом порядке: замыкание компоненты - её вершины, объединённые
+    (ИЛИ) с замыканиями компонент, от которых она зависит. Все вершины
+    компоненты разделяют один объект множества. Вопрос «зависит ли X от Y»
+    сводится к проверке одного бита.
+    """
+
+    def __init__(self, graph: CompactGraph, closures: List[int]):
+        self.graph = graph
+        self.closures = closures
+
+    @classmethod
+    def build(cls, components: SCCResult) -> 'ReachabilityIndex':
+        """Строит индекс по компонентам сильной связности графа"""
+        return cls._compute(components, None, set())
+
+    def updated(self, components: SCCResult, affected: Iterable[int]) -> 'ReachabilityIndex':
+        """
+        Индекс для изменённого графа с пересчётом только затронутых компонент
+
+        Идентификаторы вершин CompactGraph.with_updates сохраняются, а
+        замыкание вершины, из которой не достижим ни один изменённый пакет,
+        не меняется. Поэтому заново вычисляются лишь компоненты, содержащие
+        затронутые или новые вершины; остальные множества переиспользуются.
+
+        Args:
+            components: Компоненты сильной связности нового графа
+            affected: Изменённые вершины и все вершины, из которых они достижимы
+        """
+        return self._compute(components, self.closures, set(affected))
+
+    @classmethod
+    def _compute(cls, components: SCCResult, previous: Optional[List[int]],
+                 affected: Set[int]) -> 'ReachabilityIndex':
+        graph = components.graph
+        condensed = components.condensation()
+        members = components.components
+        reused = 0 if previous is None else len(previous)
+
+        closures: List[int] = [0] * len(graph)
+        component_bits: List[int] = [0] * len(members)
+        # Компоненты пронумерованы так, что зависимости обрабатываются раньше
+        for component_id, component in enumerate(members):
+            first = component[0]
+            if reused and all(node_id < reused and node_id not in affected for node_id in component):
+                bits = previous[first]
+            else:
+                bits = 1 << first if len(component) == 1 else bits_from_ids(component)
+                for successor in condensed.successors(component_id):
+                    bits |= component_bits[successor]
+            component_bits[component_id] = bits
+            for node_id in component:
+                closures[node_id] = bits
+
+        return cls(graph, closures)
+
+    def reaches(self, source_id: int, target_id: int) -> bool:
+        """Зависит ли вершина source_id (транзитивно) от target_id"""
+        return bool(self.closures[source_id] >> target_id & 1)
+
+    def filter_reaching(self, source_ids: Iterable[int], target_id: int) -> List[int]:
+        """Вершины из source_ids, которые транзитивно зависят от target_id"""
+        closures = self.closures
+        return [source_id for source_id in source_ids if closures[source_id] >> target_id & 1]
+
+    def closure(self, node_id: int) -> int:
+        """Битовое множество всех зависимостей вершины (включая её саму)"""
+        return self.closures[node_id]
+
+    def closure_size(self, node_id: int) -> int:
+        """Число транзитивных зависимостей вершины (без неё самой)"""
+        return popcount(self.closures[node_id]) - 1
@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import http.client
+import queue
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Tuple, TYPE_CHECKING
+from apkindex_reader import iter_index_records
+from profiler import PROFILER, span
+from repository_index import RepositoryIndex
+
+if TYPE_CHECKING:
+    from index_cache import IndexCache, IndexOpener
+
+# Ошибки повторно используемого соединения, которое сервер уже закрыл по таймауту keep-alive
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class ConnectionPool:
+    """Пул keep-alive HTTP(S)-соединений, сгруппированных по хосту"""
+
+    def __init__(self, timeout: float = 60):
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], queue.SimpleQueue] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """Выдаёт свободное соединение с хостом или открывает новое (и признак повторного использования)"""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), queue.SimpleQueue())
+        try:
+            return idle.get_nowait(), True
+        except queue.Empty:
+            return self.connect(scheme, netloc), False
+
+    def connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        """Открывает новое соединение с хостом"""
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection) -> None:
+        """Возвращает соединение в пул для повторного использования"""
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), queue.SimpleQueue())
+        idle.put(connection)
+
+
+class AsyncRepositoryClient:
+    """
+    Асинхронный клиент для одновременной загрузки нескольких APKINDEX
+
+    Индексы всех пар (репозиторий, архитектура) загружаются параллельно через
+    общий пул соединений и объединяются в один RepositoryIndex. Приоритет
+    определяется порядком: запись из репозитория, указанного раньше, не
+    перекрывается одноимённой записью из следующих (как в /etc/apk/repositories).
+    Пул живёт вместе с клиентом, поэтому повторные загрузки (обновление индекса
+    сервером) используют уже открытые соединения. С локальным кэшем каждая пара
+    загружается через IndexCache с условной перепроверкой по тому же пулу;
+    file://, прочие схемы и запросы через прокси идут через urllib.
+    """
+
+    def __init__(self, repositories: List[str], arches: List[str] = None, max_connections: int = 8,
+                 cache: Optional['IndexCache'] = None):
+        self.repositories = [url.rstrip('/') for url in repositories]
+        self.arches = arches or ["x86_64"]
+        self.max_connections = max_connections
+        self.cache = cache
+        self.pool = ConnectionPool()
+
+    def load_index(self) -> RepositoryIndex:
+        """Синхронная обёртка: загружает и объединяет все индексы"""
+        with span('index.load'):
+            return asyncio.run(self.fetch_all())
+
+    async def fetch_all(self) -> RepositoryIndex:
+        """
+        Загружает индексы всех репозиториев и архитектур одновременно
+
+        Returns:
+            RepositoryIndex: Объединённый индекс с учётом приоритета репозиториев
+        """
+        loop = asyncio.get_running_loop()
+        sources = [(url, arch) for url in self.repositories for arch in self.arches]
+
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            indexes = await asyncio.gather(*(
+                loop.run_in_executor(executor, self._fetch_index, url, arch)
+                for url, arch in sources
+            ))
+
+        merged = RepositoryIndex()
+        for index in indexes:
+            merged.merge(index)
+        return merged
+
+    def _fetch_index(self, repository_url: str, arch: str) -> RepositoryIndex:
+        """Загружает индекс одной пары (репозиторий, архитектура): через кэш или напрямую"""
+        index_url = f"{repository_url}/{arch}/APKINDEX.tar.gz"
+        opener = self._opener_for(index_url)
+        if self.cache is not None:
+            # Условная перепроверка идёт через тот же транспорт (пул соединений)
+            return self.cache.get_index(repository_url, arch, self._parse_index_stream, opener)
+
+        print(f"📥 Загрузка индекса пакетов: {index_url}")
+
+        with opener(index_url, {}) as (status, _, body):
+            if status != 200:
+                raise ConnectionError(f"Не удалось загрузить индекс пакетов {index_url}: {status}")
+            return self._parse_index_stream(PROFILER.wrap_reader(body, 'index.download', 'bytes_fetched'))
+
+    def _parse_index_stream(self, fileobj: BinaryIO) -> RepositoryIndex:
+        """Строит индекс из потока с архивом APKINDEX.tar.gz"""
+        with span('index.parse'):
+            return RepositoryIndex(iter_index_records(fileobj))
+
+    def _opener_for(self, url: str) -> 'IndexOpener':
+        """Пул соединений для http(s) без прокси; file://, другие схемы и прокси - через urllib"""
+        import urllib.request
+        
+        parsed = urllib.parse.urlsplit(url)
+        proxies = urllib.request.getproxies()
+        if parsed.scheme in ('http', 'https') and not (
+                parsed.scheme in proxies and not urllib.request.proxy_bypass(parsed.hostname or '')):
+            return self.open_pooled
+        from index_cache import urlopen_index
+        return urlopen_index
+
+    @contextlib.contextmanager
+    def open_pooled(self, url: str, headers: Dict[str, str]) -> Iterator[Tuple[int, Mapping[str, str], BinaryIO]]:
+        """
+        GET через keep-alive соединение из пула (транспорт IndexOpener)
+
+        После выхода из контекста ответ дочитывается и соединение возвращается
+        в пул; при ошибке соединение закрывается.
+        """
+        parsed = urllib.parse.urlsplit(url)
+        path = f"{parsed.path}?{parsed.query}" if parsed.query else parsed.path
+        request_headers = dict(headers, Connection='keep-alive')
+        connection, reused = self.pool.acquire(parsed.scheme, parsed.netloc)
+
+        try:
+            try:
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # Сервер закрыл простаивавшее соединение - повторяем запрос через новое
+                connection.close()
+                connection = self.pool.connect(parsed.scheme, parsed.netloc)
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+
+            yield response.status, response.headers, response
+            # Дочитываем ответ, чтобы соединение можно было использовать повторно
+            response.read()
+        except ConnectionError:
+            connection.close()
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise ConnectionError(f"Не удалось загрузить индекс пакетов {url}: {e}")
+        except BaseException:
+            connection.close()
+            raise
+
+        self.pool.release(parsed.scheme, parsed.netloc, connection)
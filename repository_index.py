@@ -0,0 +1,245 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Iterable, Iterator
+from apk_version import version_key, parse_dependency, satisfies, best_match
+
+# Разделитель имени и ограничения версии в полях 'D' и 'p' (so:libc.so=1, pkg>=2.0)
+VERSION_SPLIT_RE = re.compile(r'[=<>~]')
+
+
+class RepositoryIndex:
+    """
+    Индекс пакетов репозитория: имя пакета -> запись из APKINDEX
+
+    Дополнительно хранит индекс поставщиков: виртуальное имя из поля 'p'
+    (so:..., cmd:..., pc:... или обычное имя) -> пакеты, которые его предоставляют,
+    и все версии каждого пакета, отсортированные по возрастанию в порядке apk
+    (для выбора версии, удовлетворяющей ограничению, двоичным поиском).
+    """
+
+    def __init__(self, records: Optional[Iterable[Dict[str, str]]] = None):
+        self.packages: Dict[str, Dict[str, str]] = {}
+        self.providers: Dict[str, List[str]] = {}
+        # Имя пакета -> записи всех версий и их ключи сравнения (по возрастанию версии)
+        self.versions: Dict[str, List[Dict[str, str]]] = {}
+        self.version_keys: Dict[str, List[tuple]] = {}
+        if records is not None:
+            for record in records:
+                self.add_record(record)
+
+    @classmethod
+    def from_test_file(cls, path: str) -> 'RepositoryIndex':
+        """
+        Строит индекс из файла тестового репозитория (формат: A: B C D)
+
+        Файл читается построчно за один проход; пустые строки и комментарии
+        ('#' до конца строки) пропускаются.
+
+        Args:
+            path: Путь к файлу тестового репозитория
+
+        Returns:
+            RepositoryIndex: Индекс с записями {'P': пакет, 'D': зависимости}
+        """
+        return cls(iter_test_records(path))
+
+    def add_record(self, record: Dict[str, str]) -> None:
+        """
+        Добавляет запись о пакете в индекс (записи без поля 'P' игнорируются)
+
+        Основной записью пакета становится его наибольшая версия; при равных
+        версиях - запись, добавленная последней.
+        """
+        name = record.get('P')
+        if not name:
+            return
+
+        self._add_version(name, record)
+        self.packages[name] = self.versions[name][-1]
+        self._add_provides(name, record)
+
+    def _add_version(self, name: str, record: Dict[str, str]) -> None:
+        """Вставляет запись в отсортированный список версий пакета"""
+        key = version_key(record.get('V', ''))
+        keys = self.version_keys.setdefault(name, [])
+        versions = self.versions.setdefault(name, [])
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        versions.insert(position, record)
+
+    def _add_provides(self, name: str, record: Dict[str, str]) -> None:
+        """Регистрирует пакет как поставщика имён из поля 'p'"""
+        for provided in record.get('p', '').split():
+            provided_name = VERSION_SPLIT_RE.split(provided, 1)[0]
+            if not provided_name:
+                continue
+            providers = self.providers.setdefault(provided_name, [])
+            if name not in providers:
+                providers.append(name)
+
+    def merge(self, other: 'RepositoryIndex') -> None:
+        """
+        Добавляет записи другого индекса с более низким приоритетом
+
+        Основные записи пакетов, уже присутствующих в этом индексе, не
+        перекрываются, но их версии из другого индекса становятся доступны
+        при разрешении зависимостей с ограничением версии.
+        """
+        for name, records in other.versions.items():
+            if name not in self.packages:
+                for record in records:
+                    self.add_record(record)
+                continue
+            for record in records:
+                self._add_version(name, record)
+                self._add_provides(name, record)
+
+    def get(self, package_name: str) -> Optional[Dict[str, str]]:
+        """Возвращает запись о пакете или None, если пакета нет в индексе"""
+        return self.packages.get(package_name)
+
+    def resolve(self, dependency: str) -> Optional[str]:
+        """
+        Определяет пакет, удовлетворяющий зависимости
+
+        Args:
+            dependency: Имя пакета или виртуальное имя (so:, cmd:, pc:, ...),
+                возможно с ограничением версии (pkg>=1.2, so:libfoo.so.1=1)
+
+        Returns:
+            Optional[str]: Имя реального пакета или None, если поставщик не найден
+        """
+        # Быстрый путь для зависимостей без ограничения версии (большинство записей 'D')
+        if dependency in self.packages:
+            return dependency
+        providers = self.providers.get(dependency)
+        if providers:
+            return max(providers, key=self._provider_priority)
+
+        record = self.resolve_record(dependency)
+        if record is not None:
+            return record['P']
+
+        # Ограничение не выполняется ни одной версией - зависимость всё равно указывает на пакет
+        name = parse_dependency(dependency)[0]
+        return name if name in self.packages else None
+
+    def resolve_record(self, dependency: str) -> Optional[Dict[str, str]]:
+        """
+        Определяет запись (конкретную версию пакета), удовлетворяющую зависимости
+
+        Для реального пакета выбирается наибольшая версия, подходящая под
+        ограничение (без ограничения - основная запись пакета). Для виртуального
+        имени - поставщик с наибольшим приоритетом 'k' среди тех, чья
+        предоставляемая версия удовлетворяет ограничению.
+
+        Args:
+            dependency: Зависимость из поля 'D' (без префикса конфликта '!')
+
+        Returns:
+            Optional[Dict[str, str]]: Запись о пакете или None
+        """
+        name, op, required = parse_dependency(dependency)
+
+        if name in self.packages:
+            if op is None:
+                return self.packages[name]
+            versions = self.versions[name]
+            if op in ('~', '~='):
+                position = best_match(self.version_keys[name], op, required,
+                                      [record.get('V', '') for record in versions])
+            else:
+                position = best_match(self.version_keys[name], op, required)
+            if position is not None:
+                return versions[position]
+
+        providers = self.providers.get(name)
+        if not providers:
+            return None
+
+        if op is None:
+            # При нескольких поставщиках выбирается пакет с наибольшим приоритетом 'k'
+            return self.packages[max(providers, key=self._provider_priority)]
+
+        candidates = []
+        for provider in providers:
+            record = self._providing_version(provider, name, op, required)
+            if record is not None:
+                candidates.append(record)
+        if not candidates:
+            return None
+        return max(candidates, key=lambda record: self._provider_priority(record['P']))
+
+    def _providing_version(self, provider: str, provided_name: str,
+                           op: str, required: str) -> Optional[Dict[str, str]]:
+        """Наибольшая версия поставщика, предоставляющая имя в подходящей версии"""
+        for record in reversed(self.versions.get(provider, ())):
+            for provided in record.get('p', '').split():
+                name, _, version = parse_dependency(provided)
+                if name == provided_name and satisfies(version, op, required):
+                    return record
+        return None
+
+    def _provider_priority(self, package_name: str) -> int:
+        """Приоритет поставщика из поля 'k' (0, если поле не задано)"""
+        try:
+            return int(self.packages[package_name].get('k', 0))
+        except ValueError:
+            return 0
+
+    def __contains__(self, package_name: str) -> bool:
+        return package_name in self.packages
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.packages)
+
+
+def dependency_specs(record: Dict[str, str]) -> List[str]:
+    """Зависимости из поля 'D' вместе с ограничениями версий, без конфликтов ('!pkg')"""
+    # Конфликты не являются зависимостями
+    return [dep for dep in record.get('D', '').split() if not dep.startswith('!')]
+
+
+def dependency_names(record: Dict[str, str]) -> List[str]:
+    """
+    Имена зависимостей из поля 'D' без ограничений версий и без конфликтов ('!pkg')
+
+    Виртуальные имена (so:, cmd:, pc:) возвращаются как есть, без разрешения.
+    """
+    names = []
+    for dep in dependency_specs(record):
+        # Убираем информацию о версиях (всё что после =, <, >, ~)
+        name = VERSION_SPLIT_RE.split(dep, 1)[0]
+        if name:
+            names.append(name)
+    return names
+
+
+def parse_package_block(package_block: str) -> Dict[str, str]:
+    """Парсит блок информации о пакете"""
+    info = {}
+    lines = package_block.split('\n')
+
+    for line in lines:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            info[key.strip()] = value.strip()
+
+    return info
+
+
+def iter_test_records(path: str) -> Iterator[Dict[str, str]]:
+    """Построчно читает тестовый репозиторий, возвращая записи о пакетах"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            if ':' not in line:
+                continue
+
+            package, deps_str = line.split(':', 1)
+            package = package.strip()
+            if package:
+                yield {'P': package, 'D': ' '.join(deps_str.split())}
@@ -0,0 +1,135 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Union
+from compact_graph import CompactGraph
+
+
+class ReverseIndex:
+    """Индекс обратных зависимостей: пакет -> пакеты, которые от него зависят"""
+
+    def __init__(self, graph: Union[CompactGraph, Dict[str, List[str]]]):
+        """
+        Строит обратные рёбра за один проход по полному графу
+
+        Args:
+            graph: Полный граф зависимостей (CompactGraph или {пакет: [зависимости]})
+        """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_dict(graph)
+        self.graph = graph
+        self.reverse = graph.transpose()
+
+    def updated(self, graph: CompactGraph, changed: Iterable[int]) -> 'ReverseIndex':
+        """
+        Индекс для графа после CompactGraph.with_updates без полного транспонирования
+
+        Обратные строки меняются только у пакетов, которые были или стали
+        зависимостями изменённых вершин; остальные строки копируются срезами.
+        Источники в строке упорядочены по идентификатору, как в transpose().
+
+        Args:
+            graph: Новый граф (идентификаторы прежних вершин сохранены)
+            changed: Вершины, чьи списки зависимостей изменились
+        """
+        old_graph, old_reverse = self.graph, self.reverse
+        old_count = len(old_graph)
+        changed = set(changed)
+
+        rows: Dict[int, List[int]] = {}
+        for source in changed:
+            if source < old_count:
+                for target in old_graph.successors(source):
+                    rows.setdefault(target, [])
+        for source in changed:
+            for target in graph.successors(source):
+                rows.setdefault(target, []).append(source)
+        for target, added in rows.items():
+            if target < old_count:
+                added.extend(source for source in old_reverse.successors(target) if source not in changed)
+            added.sort()
+
+        offsets = array('i', [0])
+        sources = array('i')
+        for node_id in range(len(graph)):
+            row = rows.get(node_id)
+            if row is not None:
+                sources.extend(row)
+            elif node_id < old_count:
+                sources.extend(old_reverse.targets[old_reverse.offsets[node_id]:old_reverse.offsets[node_id + 1]])
+            offsets.append(len(sources))
+
+        reverse = CompactGraph.__new__(CompactGraph)
+        reverse.names = graph.names
+        reverse.ids = graph.ids
+        reverse.offsets = offsets
+        reverse.targets = sources
+        reverse.has_record = graph.has_record
+
+        index = ReverseIndex.__new__(ReverseIndex)
+        index.graph = graph
+        index.reverse = reverse
+        return index
+
+    def transitive(self, target_package: str, max_depth: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Находит прямые и транзитивные обратные зависимости обходом BFS
+
+        Время работы пропорционально размеру ответа (числу найденных рёбер).
+
+        Args:
+            target_package: Пакет, для которого ищем обратные зависимости
+            max_depth: Максимальная глубина (1 - только прямые, None - без ограничения)
+
+        Returns:
+            Dict[str, List[str]]: {зависящий пакет: [пакеты из ответа, от которых он зависит]}
+        """
+        reverse_deps: Dict[str, List[str]] = {}
+        target_id = self.graph.node_id(target_package)
+        if target_id is None:
+            return reverse_deps
+
+        names = self.graph.names
+        offsets, sources = self.reverse.offsets, self.reverse.targets
+        seen = {target_id}
+        frontier = [target_id]
+        depth = 0
+
+        while frontier and (max_depth is None or depth < max_depth):
+            next_frontier = []
+            for node_id in frontier:
+                for dependent in sources[offsets[node_id]:offsets[node_id + 1]]:
+                    reverse_deps.setdefault(names[dependent], []).append(names[node_id])
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        next_frontier.append(dependent)
+            frontier = next_frontier
+            depth += 1
+
+        return reverse_deps
+
+    def dependents_of_any(self, packages: Iterable[str]) -> Set[str]:
+        """
+        Все пакеты, транзитивно зависящие хотя бы от одного из packages
+
+        Один обход BFS из всех пакетов сразу, за O(V + E) независимо от их числа.
+        """
+        seen = bytearray(len(self.graph))
+        frontier = []
+        for package in packages:
+            node_id = self.graph.node_id(package)
+            if node_id is not None and not seen[node_id]:
+                seen[node_id] = 1
+                frontier.append(node_id)
+
+        offsets, sources = self.reverse.offsets, self.reverse.targets
+        result = set()
+        while frontier:
+            next_frontier = []
+            for node_id in frontier:
+                for dependent in sources[offsets[node_id]:offsets[node_id + 1]]:
+                    if not seen[dependent]:
+                        seen[dependent] = 1
+                        next_frontier.append(dependent)
+                        result.add(self.graph.names[dependent])
+            frontier = next_frontier
+
+        return result
@@ -0,0 +1,156 @@
+from array import array
+from typing import List, Mapping, Union
+from compact_graph import CompactGraph
+
+
+class SCCResult:
+    """
+    Результат разбиения графа на компоненты сильной связности
+
+    Компоненты пронумерованы в порядке, в котором их находит алгоритм Тарьяна:
+    каждая компонента идёт после всех компонент, от которых она зависит, то есть
+    нумерация уже является топологическим порядком конденсированного графа
+    (сначала зависимости, затем зависящие от них пакеты).
+    """
+
+    def __init__(self, graph: CompactGraph, components: List[List[int]], component_of: array):
+        self.graph = graph
+        self.components = components
+        self.component_of = component_of
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def is_cyclic(self, component_id: int) -> bool:
+        """Компонента образует цикл: больше одной вершины или петля"""
+        members = self.components[component_id]
+        if len(members) > 1:
+            return True
+        node_id = members[0]
+        return node_id in self.graph.successors(node_id)
+
+    def cycle_groups(self) -> List[List[str]]:
+        """
+        Возвращает все группы пакетов, связанных циклическими зависимостями
+
+        Группы упорядочены по первому появлению пакета в графе, пакеты внутри
+        группы - в порядке графа.
+        """
+        names = self.graph.names
+        groups = [sorted(members) for component_id, members in enumerate(self.components)
+                  if self.is_cyclic(component_id)]
+        groups.sort()
+        return [[names[node_id] for node_id in members] for members in groups]
+
+    def component_name(self, component_id: int) -> str:
+        """Подпись компоненты: имя пакета или {A, B, C} для цикла"""
+        names = self.graph.names
+        members = sorted(self.components[component_id])
+        if len(members) == 1:
+            return names[members[0]]
+        return "{" + ", ".join(names[node_id] for node_id in members) + "}"
+
+    def condensation(self) -> CompactGraph:
+        """
+        Строит конденсированный граф (DAG): каждая компонента - одна вершина
+
+        Идентификатор вершины совпадает с номером компоненты, повторяющиеся
+        рёбра и рёбра внутри компоненты отбрасываются.
+        """
+        offsets = array('i', [0])
+        targets = array('i')
+        component_of = self.component_of
+        graph_offsets, graph_targets = self.graph.offsets, self.graph.targets
+
+        for component_id, members in enumerate(self.components):
+            seen = {component_id}
+            for node_id in members:
+                for target in graph_targets[graph_offsets[node_id]:graph_offsets[node_id + 1]]:
+                    target_component = component_of[target]
+                    if target_component not in seen:
+                        seen.add(target_component)
+                        targets.append(target_component)
+            offsets.append(len(targets))
+
+        names = [self.component_name(component_id) for component_id in range(len(self.components))]
+        return CompactGraph(names, offsets, targets, bytearray(b'\x01') * len(names))
+
+    def topological_order(self) -> List[str]:
+        """Пакеты в топологическом порядке: зависимости раньше зависящих пакетов"""
+        names = self.graph.names
+        return [names[node_id] for members in self.components for node_id in sorted(members)]
+
+
+def strongly_connected_components(graph: Union[CompactGraph, Mapping[str, List[str]]]) -> SCCResult:
+    """
+    Итеративный алгоритм Тарьяна за O(V + E) без рекурсии
+
+    Args:
+        graph: CompactGraph или граф {пакет: [зависимости]}
+
+    Returns:
+        SCCResult: Компоненты сильной связности
+    """
+    if not isinstance(graph, CompactGraph):
+        graph = CompactGraph.from_dict(graph)
+
+    node_count = len(graph)
+    offsets, targets = graph.offsets, graph.targets
+    order = array('i', [-1]) * node_count
+    low = array('i', [0]) * node_count
+    component_of = array('i', [-1]) * node_count
+    on_stack = bytearray(node_count)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(node_count):
+        if order[root] != -1:
+            continue
+
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # Явный стек вызовов: (вершина, позиция следующего ребра)
+        work = [(root, offsets[root])]
+
+        while work:
+            node_id, position = work[-1]
+            if position < offsets[node_id + 1]:
+                work[-1] = (node_id, position + 1)
+                target = targets[position]
+                if order[target] == -1:
+                    order[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append((target, offsets[target]))
+                elif on_stack[target] and order[target] < low[node_id]:
+                    low[node_id] = order[target]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node_id] < low[parent]:
+                    low[parent] = low[node_id]
+
+            if low[node_id] == order[node_id]:
+                component_id = len(components)
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component_of[member] = component_id
+                    members.append(member)
+                    if member == node_id:
+                        break
+                components.append(members)
+
+    return SCCResult(graph, components, component_of)
+
+
+def find_cycle_groups(graph: Mapping[str, List[str]]) -> List[List[str]]:
+    """Возвращает группы пакетов с циклическими зависимостями в графе"""
+    return strongly_connected_components(graph).cycle_groups()
@@ -0,0 +1,314 @@
+import io
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from dependency_graph import DependencyGraph
+from visualizer import GraphVisualizer
+from exporters import EXPORT_FORMATS
+from index_diff import IndexDiff
+
+
+class PackageNotFoundError(LookupError):
+    """Запрошенного пакета нет в графе репозитория (ответ 404)"""
+
+
+class ReadWriteLock:
+    """
+    Блокировка «много читателей / один писатель» для фонового обновления индекса
+
+    Писатель имеет приоритет: пока он ждёт, новые читатели не допускаются,
+    поэтому непрерывный поток запросов не откладывает обновление индекса.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    def acquire_read(self) -> None:
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+class QueryService:
+    """
+    Обработчик запросов к графу зависимостей, общий для всех потоков сервера
+
+    Индекс, полный граф, индекс обратных зависимостей и кэш замыканий
+    загружаются один раз и остаются в памяти; обновление индекса выполняется
+    в фоне под блокировкой записи, запросы - параллельно под блокировкой чтения.
+    """
+
+    def __init__(self, graph_builder: DependencyGraph, refresh_interval: float = 0):
+        self.graph_builder = graph_builder
+        self.refresh_interval = refresh_interval
+        self.visualizer = GraphVisualizer()
+        self.lock = ReadWriteLock()
+        self._stop = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def warm_up(self) -> None:
+        """
+        Загружает индекс и строит все структуры до приёма запросов
+
+        Raises:
+            RuntimeError: Индекс не загрузился или пуст - сервер не должен
+                отвечать по пустому графу
+        """
+        try:
+            graph = self.graph_builder.get_compact_graph()
+        except Exception as e:
+            raise RuntimeError(f"Не удалось загрузить индекс пакетов: {e}") from e
+        if not len(graph):
+            raise RuntimeError("Индекс пакетов пуст: сервер не запущен")
+        self.graph_builder.get_reverse_index()
+        self.graph_builder.get_components()
+
+    def start_refresh(self) -> None:
+        """Запускает фоновое обновление индекса (если задан интервал)"""
+        if self.refresh_interval > 0 and self._refresh_thread is None:
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh(self) -> IndexDiff:
+        """
+        Загружает свежий индекс и применяет изменения инкрементально
+
+        Загрузка идёт без блокировки (запросы продолжают обслуживаться
+        по старому индексу), блокировка записи берётся только на время
+        применения изменений.
+        """
+        new_index = self.graph_builder.load_index()
+        self.lock.acquire_write()
+        try:
+            return self.graph_builder.update_index(new_index)
+        finally:
+            self.lock.release_write()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                diff = self.refresh()
+            except Exception as e:
+                print(f"⚠️ Ошибка обновления индекса: {e}")
+                continue
+            if diff:
+                print(f"🔄 Индекс обновлён: добавлено {len(diff.added)}, удалено {len(diff.removed)}, "
+                      f"изменено {len(diff.changed)}, затронуто пакетов {len(diff.affected_packages)}")
+
+    def handle(self, path: str, params: Dict[str, str]):
+        """
+        Выполняет запрос
+
+        Returns:
+            Tuple[int, str, str]: (HTTP-статус, тип содержимого, тело ответа)
+        """
+        handlers = {
+            '/deps': self._deps,
+            '/rdeps': self._rdeps,
+            '/depends': self._depends,
+            '/resolve': self._resolve,
+            '/cycles': self._cycles,
+            '/render': self._render,
+            '/health': self._health
+        }
+        handler = handlers.get(path)
+        if handler is None:
+            return self._json(404, {'error': f"Неизвестный запрос: {path}"})
+
+        self.lock.acquire_read()
+        try:
+            return handler(params)
+        except PackageNotFoundError as e:
+            return self._json(404, {'error': str(e)})
+        except ValueError as e:
+            return self._json(400, {'error': str(e)})
+        except Exception as e:
+            # Ответ об ошибке вместо разрыва соединения
+            return self._json(500, {'error': f"Внутренняя ошибка: {e}"})
+        finally:
+            self.lock.release_read()
+
+    def _deps(self, params: Dict[str, str]):
+        package = self._require_package(params)
+        depth = self._depth(params, self.graph_builder.max_depth)
+        graph = self.graph_builder.query_dependency_graph(package, depth)
+        return self._json(200, {'package': package, 'max_depth': depth, 'graph': graph})
+
+    def _rdeps(self, params: Dict[str, str]):
+        package = self._require_package(params)
+        depth = self._depth(params, 1)
+        reverse_deps = self.graph_builder.get_reverse_index().transitive(package, depth)
+        return self._json(200, {'package': package, 'max_depth': depth, 'reverse_dependencies': reverse_deps})
+
+    def _depends(self, params: Dict[str, str]):
+        package = self._require_package(params)
+        dependency = params.get('on')
+        if not dependency:
+            raise ValueError("Не указан параметр on")
+        self._check_package(dependency)
+        return self._json(200, {'package': package, 'dependency': dependency,
+                                'depends_on': self.graph_builder.depends_on(package, dependency)})
+
+    def _resolve(self, params: Dict[str, str]):
+        dependency = params.get('dependency')
+        if not dependency:
+            raise ValueError("Не указан параметр dependency")
+        record = self.graph_builder.resolve_dependency(dependency)
+        if record is None:
+            raise PackageNotFoundError(f"Нет пакета, удовлетворяющего зависимости '{dependency}'")
+        return self._json(200, {'dependency': dependency, 'package': record['P'], 'version': record.get('V')})
+
+    def _cycles(self, params: Dict[str, str]):
+        package = params.get('package')
+        if package:
+            self._check_package(package)
+            graph = self.graph_builder.query_dependency_graph(package, self._depth(params, self.graph_builder.max_depth))
+            cycles = self.visualizer.find_cycles(graph)
+        else:
+            cycles = self.graph_builder.get_components().cycle_groups()
+        return self._json(200, {'package': package, 'cycles': cycles})
+
+    def _render(self, params: Dict[str, str]):
+        package = self._require_package(params)
+        depth = self._depth(params, self.graph_builder.max_depth)
+        render_format = params.get('format', 'plantuml')
+        graph = self.graph_builder.query_dependency_graph(package, depth)
+
+        out = io.StringIO()
+        if render_format == 'ascii':
+            self.visualizer.write_ascii_tree(out, graph, package)
+        elif render_format == 'plantuml':
+            reverse_deps = self.graph_builder.get_reverse_index().transitive(package, 1)
+            self.visualizer.write_plantuml(out, graph, package, reverse_deps)
+        elif render_format in EXPORT_FORMATS:
+            self.visualizer.export(out, graph, package, export_format=render_format)
+        else:
+            raise ValueError(f"Неизвестный формат: {render_format}")
+        return 200, 'text/plain; charset=utf-8', out.getvalue()
+
+    def _health(self, params: Dict[str, str]):
+        graph = self.graph_builder.get_compact_graph()
+        cache = self.graph_builder.closure_cache
+        return self._json(200, {
+            'packages': len(graph.as_dict_view()),
+            'edges': graph.edge_count,
+            'closure_cache_entries': len(cache),
+            'closure_cache_hits': cache.hits,
+            'closure_cache_misses': cache.misses
+        })
+
+    def _require_package(self, params: Dict[str, str]) -> str:
+        package = params.get('package')
+        if not package:
+            raise ValueError("Не указан параметр package")
+        self._check_package(package)
+        return package
+
+    def _check_package(self, package: str) -> None:
+        if self.graph_builder.get_compact_graph().node_id(package) is None:
+            raise PackageNotFoundError(f"Пакет '{package}' не найден в репозитории")
+
+    def _depth(self, params: Dict[str, str], default: Optional[int]) -> Optional[int]:
+        value = params.get('depth')
+        if value is None:
+            return default
+        if value in ('', 'all'):
+            return None
+        try:
+            depth = int(value)
+        except ValueError:
+            raise ValueError("depth должен быть целым числом или 'all'")
+        if depth < 1:
+            raise ValueError("depth должен быть положительным числом")
+        return depth
+
+    def _json(self, status: int, payload: Dict):
+        return status, 'application/json; charset=utf-8', json.dumps(payload, ensure_ascii=False)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """HTTP-обработчик: GET /deps, /rdeps, /depends, /resolve, /cycles, /render, /health"""
+
+    service: QueryService = None
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(parsed.query))
+        status, content_type, body = self.service.handle(parsed.path, params)
+
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Журнал запросов не нужен: сервис вызывается сотни раз в минуту
+        pass
+
+
+def create_server(graph_builder: DependencyGraph, host: str = "127.0.0.1", port: int = 8080,
+                  refresh_interval: float = 0) -> ThreadingHTTPServer:
+    """
+    Создаёт сервер запросов с прогретыми структурами данных
+
+    Args:
+        graph_builder: Построитель графа (индекс загружается при создании сервера)
+        host: Адрес для прослушивания
+        port: Порт (0 - выбрать свободный)
+        refresh_interval: Период фонового обновления индекса в секундах (0 - отключено)
+    """
+    service = QueryService(graph_builder, refresh_interval)
+    service.warm_up()
+
+    handler = type('BoundQueryRequestHandler', (QueryRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(graph_builder: DependencyGraph, host: str = "127.0.0.1", port: int = 8080,
+          refresh_interval: float = 0) -> None:
+    """Запускает сервер запросов и обслуживает его до прерывания"""
+    server = create_server(graph_builder, host, port, refresh_interval)
+    server.service.start_refresh()
+    print(f"🚀 Сервер запросов: http://{host}:{server.server_address[1]} (/deps, /rdeps, /depends, /resolve, /cycles, /render)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.service.stop()
+        server.server_close()
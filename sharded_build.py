@@ -0,0 +1,134 @@
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+from apk_parser import APKParser
+from compact_graph import CompactGraph
+from repository_index import RepositoryIndex
+
+# Шардов на процесс: мелкие шарды выравнивают нагрузку, если часть записей тяжелее
+SHARDS_PER_PROCESS = 4
+
+# Состояние процесса-исполнителя: парсер над общим индексом, имена пакетов и их позиции
+_worker_state: Optional[Tuple[APKParser, List[str], Dict[str, int]]] = None
+
+
+def shard_of(package_name: str, shard_count: int) -> int:
+    """Номер шарда пакета (crc32 имени одинаков во всех процессах, в отличие от hash())"""
+    return zlib.crc32(package_name.encode('utf-8')) % shard_count
+
+
+def build_compact_graph_sharded(index: RepositoryIndex, processes: int,
+                                test_mode: bool = False) -> CompactGraph:
+    """
+    Строит полный граф репозитория, разрешая зависимости в пуле процессов
+
+    Пакеты индекса делятся на шарды по хэшу имени; каждый процесс получает
+    весь индекс (он нужен для разрешения поставщиков и версий) и разрешает
+    зависимости пакетов своих шардов, возвращая их сразу в виде CSR-массивов
+    с позициями пакетов в индексе. Родительский процесс только склеивает
+    строки шардов, поэтому граф совпадает с графом последовательной сборки
+    (CompactGraph.from_dict(parser.get_all_dependencies())), включая
+    идентификаторы вершин. Обратный граф получается из него транспонированием.
+
+    Args:
+        index: Индекс репозитория (объединённый для всех репозиториев и архитектур)
+        processes: Число процессов
+        test_mode: Записи тестового репозитория (зависимости без разрешения)
+
+    Returns:
+        CompactGraph: Полный граф репозитория
+    """
+    names = list(index.packages)
+    shard_count = processes * SHARDS_PER_PROCESS
+    shards = [array('i') for _ in range(shard_count)]
+    for position, name in enumerate(names):
+        shards[shard_of(name, shard_count)].append(position)
+
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # При запуске через fork индекс наследуется процессами без сериализации
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(index, test_mode)) as executor:
+        results = list(executor.map(_resolve_shard, shards))
+
+    return _merge_shards(names, shards, results)
+
+
+def _init_worker(index: RepositoryIndex, test_mode: bool) -> None:
+    """Готовит процесс-исполнитель: парсер над индексом и позиции пакетов"""
+    global _worker_state
+    names = list(index.packages)
+    parser = APKParser("", test_mode=test_mode, index=index)
+    _worker_state = (parser, names, {name: position for position, name in enumerate(names)})
+
+
+def _resolve_shard(positions: array) -> Tuple[array, array, List[str], array]:
+    """
+    Разрешает зависимости пакетов шарда
+
+    Returns:
+        Tuple[array, array, List[str], array]: Смещения и цели в формате CSR
+        (по порядку positions), имена зависимостей, которых нет в индексе
+        (цель node_count + i означает i-е такое имя), и номера строк с такими целями
+    """
+    parser, names, package_ids = _worker_state
+    packages = parser.index.packages
+    node_count = len(names)
+
+    offsets = array('i', [0])
+    targets = array('i')
+    extras: Dict[str, int] = {}
+    extra_rows = array('i')
+    for row, position in enumerate(positions):
+        has_extras = False
+        for dep in parser.get_record_dependencies(packages[names[position]]):
+            dep_id = package_ids.get(dep)
+            if dep_id is None:
+                dep_id = extras.setdefault(dep, node_count + len(extras))
+                has_extras = True
+            targets.append(dep_id)
+        offsets.append(len(targets))
+        if has_extras:
+            extra_rows.append(row)
+    return offsets, targets, list(extras), extra_rows
+
+
+def _merge_shards(names: List[str], shards: List[array],
+                  results: List[Tuple[array, array, List[str], array]]) -> CompactGraph:
+    """Склеивает строки шардов в CSR-граф в порядке индекса"""
+    node_count = len(names)
+    rows: List[Optional[array]] = [None] * node_count
+    # Позиция пакета -> имена вне индекса его шарда (только для строк с такими целями)
+    row_extras: Dict[int, List[str]] = {}
+    for positions, (offsets, targets, extras, extra_rows) in zip(shards, results):
+        start = 0
+        for position, end in zip(positions, offsets[1:]):
+            rows[position] = targets[start:end]
+            start = end
+        for row in extra_rows:
+            row_extras[positions[row]] = extras
+
+    # Имена вне индекса получают идентификаторы в порядке первого появления, как в from_dict
+    graph_names = list(names)
+    extra_ids: Dict[str, int] = {}
+    offsets = array('i', [0])
+    targets = array('i')
+    for position, row in enumerate(rows):
+        extras = row_extras.get(position)
+        if extras is None:
+            targets.extend(row)
+        else:
+            for target in row:
+                if target >= node_count:
+                    name = extras[target - node_count]
+                    target = extra_ids.get(name)
+                    if target is None:
+                        target = extra_ids[name] = len(graph_names)
+                        graph_names.append(name)
+                targets.append(target)
+        offsets.append(len(targets))
+
+    missing = len(graph_names) - node_count
+    offsets.extend([len(targets)] * missing)
+    has_record = bytearray(b'\x01') * node_count + bytearray(missing)
+    return CompactGraph(graph_names, offsets, targets, has_record)
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from functools import lru_cache
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from analytics import rank_packages
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records
+
+
+class RepositoryAnalyticsTest(unittest.TestCase):
+    """Метрики analyze_repository совпадают с подсчётом по обходам в ширину"""
+
+    @classmethod
+    def setUpClass(cls):
+        records = generate_records(packages=250, cycle_density=0.05, seed=21)
+        # Зависимость, которой нет в индексе (входит в замыкание с нулевым размером)
+        records.append({'P': 'dangling', 'V': '1', 'I': '100', 'D': 'missing-dep pkg-0'})
+        cls.sizes = {record['P']: int(record['I']) for record in records}
+        graph_builder = DependencyGraph("", index=RepositoryIndex(records))
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.metrics = {item['package']: item for item in graph_builder.get_repository_analytics()}
+            cls.graph = dict(graph_builder.get_compact_graph().as_dict_view())
+            cls.closures = {name: cls.bfs_closure(graph_builder.query_dependency_graph(name, None))
+                            for name in cls.graph}
+            cls.dependents = {name: set(graph_builder.find_reverse_dependencies(name, None)) - {name}
+                              for name in cls.graph}
+
+    @staticmethod
+    def bfs_closure(graph) -> set:
+        return set(graph) | {dep for deps in graph.values() for dep in deps}
+
+    def test_closure_sizes(self):
+        self.assertEqual(set(self.metrics), set(self.graph))
+        for name, item in self.metrics.items():
+            closure = self.closures[name]
+            with self.subTest(package=name):
+                self.assertEqual(item['dependencies'], len(closure - {name}))
+                self.assertEqual(item['installed_size'], sum(self.sizes.get(dep, 0) for dep in closure))
+                self.assertEqual(item['size'], self.sizes[name])
+
+    def test_fan_in(self):
+        for name, item in self.metrics.items():
+            direct = {other for other, deps in self.graph.items() if name in deps}
+            with self.subTest(package=name):
+                self.assertEqual(item['fan_in'], len(direct))
+                self.assertEqual(item['transitive_fan_in'], len(self.dependents[name]))
+
+    def test_cycles_and_depth(self):
+        closures, graph = self.closures, self.graph
+
+        def component(name):
+            return frozenset(other for other in closures.get(name, {name}) if name in closures.get(other, {other}))
+
+        @lru_cache(maxsize=None)
+        def longest_chain(name):
+            own = component(name)
+            return max((longest_chain(dep) + 1 for member in own for dep in graph.get(member, ())
+                        if dep not in own), default=0)
+
+        self.assertTrue(any(item['in_cycle'] for item in self.metrics.values()))
+        self.assertIn('missing-dep', self.closures['dangling'])
+        for name, item in self.metrics.items():
+            in_cycle = len(component(name)) > 1 or name in graph[name]
+            with self.subTest(package=name):
+                self.assertEqual(item['in_cycle'], in_cycle)
+                self.assertEqual(item['max_depth'], longest_chain(name))
+
+    def test_rank_packages(self):
+        ranked = rank_packages(self.metrics.values())
+        sizes = [item['installed_size'] for item in ranked]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
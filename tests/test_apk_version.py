@@ -0,0 +1,162 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from apk_version import best_match, compare_versions, parse_dependency, satisfies, version_key
+from repository_index import RepositoryIndex
+
+# Версии в порядке возрастания по правилам apk-tools
+ORDERED_VERSIONS = [
+    'not-a-version',
+    '0.9',
+    '1.0_alpha',
+    '1.0_alpha2',
+    '1.0_beta',
+    '1.0_pre1',
+    '1.0_rc1',
+    '1.0_rc1-r5',
+    '1.0_rc2',
+    '1.0_rc10',
+    '1.0',
+    '1.0-r1',
+    '1.0-r2',
+    '1.0-r10',
+    '1.0_cvs',
+    '1.0_git20240101',
+    '1.0_p1',
+    '1.0_p2-r1',
+    '1.0a',
+    '1.0z',
+    '1.0.1',
+    '1.2',
+    '1.10',
+    '2',
+]
+
+SATISFIES_CASES = [
+    ('1.3-r1', '>=', '1.3', True),
+    ('1.3_rc1', '>=', '1.3', False),
+    ('1.3', '>', '1.3', False),
+    ('1.3_p1', '>', '1.3-r9', True),
+    ('1.3', '=', '1.3', True),
+    ('1.3', '==', '1.3', True),
+    ('1.3-r1', '=', '1.3', False),
+    ('1.2', '<', '1.3_rc1', True),
+    ('1.3', '<=', '1.3', True),
+    ('1.3.1', '~', '1.3', True),
+    ('1.3-r2', '~', '1.3', True),
+    ('1.30', '~', '1.3', False),
+    ('1.2', '~=', '1.3', False),
+    ('0.1', '><', '9', True),
+    ('1.0', None, None, True),
+    (None, '>=', '1.0', False),
+]
+
+# Версии пакета в индексе (по возрастанию) и ожидаемый выбор best_match
+INDEX_VERSIONS = ['1.2', '1.3_rc1', '1.3', '1.3-r1', '1.3.1', '1.4']
+BEST_MATCH_CASES = [
+    (None, None, '1.4'),
+    ('<', '1.3', '1.3_rc1'),
+    ('<=', '1.3', '1.3'),
+    ('<', '1.2', None),
+    ('=', '1.3-r1', '1.3-r1'),
+    ('=', '1.3.2', None),
+    ('>', '1.3', '1.4'),
+    ('>=', '1.5', None),
+    ('~', '1.3', '1.3.1'),
+    ('~', '1.2', '1.2'),
+    ('~', '2', None),
+    ('><', '1', '1.4'),
+]
+
+
+class VersionOrderTest(unittest.TestCase):
+    """version_key и compare_versions повторяют порядок apk"""
+
+    def test_known_order(self):
+        for lower, higher in zip(ORDERED_VERSIONS, ORDERED_VERSIONS[1:]):
+            with self.subTest(lower=lower, higher=higher):
+                self.assertLess(version_key(lower), version_key(higher))
+                self.assertEqual(compare_versions(lower, higher), -1)
+                self.assertEqual(compare_versions(higher, lower), 1)
+
+    def test_equal_versions(self):
+        self.assertEqual(compare_versions('1.0', '1.0-r0'), 0)
+        self.assertEqual(compare_versions('01.2', '1.2'), 0)
+
+    def test_sorting(self):
+        shuffled = ORDERED_VERSIONS[::2] + ORDERED_VERSIONS[1::2]
+        self.assertEqual(sorted(shuffled, key=version_key), ORDERED_VERSIONS)
+
+
+class ConstraintTest(unittest.TestCase):
+    """Разбор ограничений, satisfies и best_match"""
+
+    def test_parse_dependency(self):
+        cases = [
+            ('musl', ('musl', None, None)),
+            ('so:libc.musl-x86_64.so.1', ('so:libc.musl-x86_64.so.1', None, None)),
+            ('pkg>=1.2', ('pkg', '>=', '1.2')),
+            ('so:libfoo.so.1=1.0', ('so:libfoo.so.1', '=', '1.0')),
+            ('pkg~3.1', ('pkg', '~', '3.1')),
+            ('pkg=~1', ('pkg', None, None)),
+        ]
+        for dependency, expected in cases:
+            with self.subTest(dependency=dependency):
+                self.assertEqual(parse_dependency(dependency), expected)
+
+    def test_satisfies(self):
+        for version, op, required, expected in SATISFIES_CASES:
+            with self.subTest(version=version, op=op, required=required):
+                self.assertIs(satisfies(version, op, required), expected)
+
+    def test_best_match(self):
+        keys = [version_key(version) for version in INDEX_VERSIONS]
+        for op, required, expected in BEST_MATCH_CASES:
+            with self.subTest(op=op, required=required):
+                position = best_match(keys, op, required, INDEX_VERSIONS)
+                self.assertEqual(None if position is None else INDEX_VERSIONS[position], expected)
+
+    def test_best_match_agrees_with_satisfies(self):
+        keys = [version_key(version) for version in INDEX_VERSIONS]
+        for op in ('<', '<=', '=', '>', '>=', '~'):
+            for required in INDEX_VERSIONS + ['1', '1.3.2', '0.1', '9']:
+                matching = [version for version in INDEX_VERSIONS if satisfies(version, op, required)]
+                position = best_match(keys, op, required, INDEX_VERSIONS)
+                with self.subTest(op=op, required=required):
+                    self.assertEqual(None if position is None else INDEX_VERSIONS[position],
+                                     matching[-1] if matching else None)
+
+
+class ResolveRecordTest(unittest.TestCase):
+    """RepositoryIndex.resolve_record выбирает версию и поставщика как apk"""
+
+    def setUp(self):
+        records = [{'P': 'foo', 'V': version} for version in reversed(INDEX_VERSIONS)]
+        records += [
+            {'P': 'libssl1', 'V': '1.1-r0', 'p': 'so:libssl.so=1.1', 'k': '10'},
+            {'P': 'libssl3', 'V': '3.0-r0', 'p': 'so:libssl.so=3.0', 'k': '5'},
+        ]
+        self.index = RepositoryIndex(records)
+
+    def resolved_version(self, dependency: str):
+        record = self.index.resolve_record(dependency)
+        return None if record is None else (record['P'], record['V'])
+
+    def test_versions(self):
+        self.assertEqual(self.resolved_version('foo'), ('foo', '1.4'))
+        self.assertEqual(self.resolved_version('foo<1.3'), ('foo', '1.3_rc1'))
+        self.assertEqual(self.resolved_version('foo~1.3'), ('foo', '1.3.1'))
+        self.assertIsNone(self.resolved_version('foo>2'))
+
+    def test_providers(self):
+        self.assertEqual(self.resolved_version('so:libssl.so'), ('libssl1', '1.1-r0'))
+        self.assertEqual(self.resolved_version('so:libssl.so>=3'), ('libssl3', '3.0-r0'))
+        self.assertIsNone(self.resolved_version('so:libssl.so>3.0'))
+        self.assertIsNone(self.resolved_version('missing'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import apkindex_reader
+from apkindex_reader import INDEX_FIELDS, SCAN_CHUNK_SIZE, iter_index_records, iter_records, scan_records
+from synthetic_repository import generate_records, write_apkindex
+
+SAMPLE_INDEX = (
+    b"C:Q1abc=\nP:musl\nV:1.2.4-r2\nA:x86_64\nT:the musl c library\nI:622592\n\n"
+    b"P:busybox\nV:1.36.1-r5\nD:so:libc.musl-x86_64.so.1\np:cmd:sh=1.36.1-r5 /bin/sh\n\n\n\n"
+    b"P:openssl\nV:3.1.4-r0\nk:100\nD:musl libssl3=3.1.4-r0\nL:Apache-2.0\n\n"
+    b"P:libssl3\nV:3.1.4-r0\np:so:libssl.so.3=3\nI:"
+    b"1024"
+)
+
+
+def selected(records, fields=INDEX_FIELDS):
+    """Записи, сокращённые до заданных полей (эталон для scan_records)"""
+    return [{key: value for key, value in record.items() if key in fields} for record in records]
+
+
+class ScanRecordsTest(unittest.TestCase):
+    """Выборочный разбор scan_records совпадает с построчным iter_records"""
+
+    def test_sample_index(self):
+        records = list(scan_records(io.BytesIO(SAMPLE_INDEX)))
+        self.assertEqual([record['P'] for record in records], ['musl', 'busybox', 'openssl', 'libssl3'])
+        self.assertNotIn('T', records[0])
+        self.assertEqual(records[1]['p'], 'cmd:sh=1.36.1-r5 /bin/sh')
+        self.assertEqual(records[3]['I'], '1024')
+        self.assertEqual(records, selected(iter_records(io.BytesIO(SAMPLE_INDEX))))
+
+    def test_every_chunk_boundary(self):
+        # Граница порции в каждой позиции: внутри значения, между '\n\n', среди пустых строк
+        expected = selected(iter_records(io.BytesIO(SAMPLE_INDEX)))
+        for chunk_size in range(1, len(SAMPLE_INDEX) + 2):
+            with self.subTest(chunk_size=chunk_size), \
+                    mock.patch.object(apkindex_reader, 'SCAN_CHUNK_SIZE', chunk_size):
+                self.assertEqual(list(scan_records(io.BytesIO(SAMPLE_INDEX))), expected)
+
+    def test_record_split_across_real_chunk(self):
+        padding = b"T:" + b"x" * (SCAN_CHUNK_SIZE - 20) + b"\n"
+        text = b"P:first\nV:1\n" + padding + b"\nP:second\nV:2\nD:first\n\n\nP:third\nV:3"
+        self.assertGreater(len(text), SCAN_CHUNK_SIZE)
+        self.assertLess(text.index(b"P:second"), SCAN_CHUNK_SIZE)
+        self.assertGreater(text.index(b"D:first"), SCAN_CHUNK_SIZE)
+        self.assertEqual(list(scan_records(io.BytesIO(text))), [
+            {'P': 'first', 'V': '1'},
+            {'P': 'second', 'V': '2', 'D': 'first'},
+            {'P': 'third', 'V': '3'},
+        ])
+
+    def test_blank_lines_only(self):
+        self.assertEqual(list(scan_records(io.BytesIO(b"\n\n\n\n"))), [])
+        self.assertEqual(list(scan_records(io.BytesIO(b""))), [])
+
+
+class IterIndexRecordsTest(unittest.TestCase):
+    """Разбор архива APKINDEX.tar.gz с выборкой полей и без неё"""
+
+    def test_synthetic_apkindex(self):
+        records = generate_records(packages=5000, seed=3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'APKINDEX.tar.gz')
+            write_apkindex(path, records)
+            with open(path, 'rb') as f:
+                full = list(iter_index_records(f, fields=None))
+            with open(path, 'rb') as f:
+                scanned = list(iter_index_records(f))
+
+        expected = [{key: value for key, value in record.items() if value} for record in records]
+        self.assertEqual(full, expected)
+        self.assertEqual(scanned, selected(full))
+        # Индекс больше одной порции scan_records
+        self.assertGreater(sum(len(f"{key}:{value}\n") for record in full for key, value in record.items()),
+                           SCAN_CHUNK_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
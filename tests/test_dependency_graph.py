@@ -0,0 +1,38 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records
+
+
+def build_graph(index: RepositoryIndex, root: str, **options):
+    graph_builder = DependencyGraph("", index=index, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graph_builder.build_dependency_graph(root)
+
+
+class ParallelBFSTest(unittest.TestCase):
+    """Уровни BFS в пуле потоков дают тот же граф, что и последовательный обход"""
+
+    def setUp(self):
+        self.index = RepositoryIndex(generate_records(packages=1500))
+        # Самый широкий корень, как build-base
+        self.root = max(self.index.packages, key=lambda name: len(self.index.packages[name]['D'].split()))
+
+    def test_same_graph_and_order(self):
+        for options in ({'max_depth': 3}, {'max_depth': 6}, {'max_depth': 6, 'package_filter': 'pkg-1'}):
+            sequential = build_graph(self.index, self.root, **options)
+            for workers in (2, 4, 7):
+                parallel = build_graph(self.index, self.root, max_workers=workers, **options)
+                self.assertEqual(list(parallel.items()), list(sequential.items()), (options, workers))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import re
+import sys
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from exporters import NodeIds, export_graph
+
+# Имена с символами, которые нужно экранировать в каждом из форматов
+GRAPH = {
+    'py3-foo': ['py3_foo', 'so:libc.musl-x86_64.so.1'],
+    'py3_foo': ['quote"name', 'back\\slash'],
+    'quote"name': ['<xml & "attr">', "apostrophe'"],
+    'back\\slash': ['пакет-ё'],
+    '1starts-with-digit': ['py3-foo'],
+}
+NODES = set(GRAPH) | {dep for deps in GRAPH.values() for dep in deps}
+EDGES = {(package, dep) for package, deps in GRAPH.items() for dep in deps}
+
+DOT_NODE_RE = re.compile(r'^  ([A-Za-z_][A-Za-z0-9_]*) \[label="((?:[^"\\]|\\.)*)"(.*)\];$')
+DOT_EDGE_RE = re.compile(r'^  ([A-Za-z_][A-Za-z0-9_]*) -> ([A-Za-z_][A-Za-z0-9_]*);$')
+
+
+def export(export_format: str) -> str:
+    out = io.StringIO()
+    export_graph(out, GRAPH, export_format, 'py3-foo')
+    return out.getvalue()
+
+
+class ExportEscapingTest(unittest.TestCase):
+    """Имена пакетов переживают экспорт без искажений и не ломают синтаксис"""
+
+    def test_node_ids_are_unique_identifiers(self):
+        ids = NodeIds()
+        node_ids = {name: ids[name] for name in sorted(NODES)}
+        self.assertEqual(len(set(node_ids.values())), len(NODES))
+        for node_id in node_ids.values():
+            self.assertRegex(node_id, r'^[A-Za-z_][A-Za-z0-9_]*$')
+        self.assertEqual(ids['py3-foo'], node_ids['py3-foo'])
+
+    def test_dot(self):
+        labels, edges = {}, set()
+        lines = export('dot').splitlines()
+        self.assertEqual(lines[0], 'digraph dependencies {')
+        self.assertEqual(lines[-1], '}')
+        for line in lines[2:-1]:
+            node = DOT_NODE_RE.match(line)
+            if node:
+                labels[node.group(1)] = re.sub(r'\\(.)', r'\1', node.group(2))
+                if 'lightblue' in node.group(3):
+                    self.assertEqual(labels[node.group(1)], 'py3-foo')
+                continue
+            edge = DOT_EDGE_RE.match(line)
+            self.assertIsNotNone(edge, line)
+            edges.add((labels[edge.group(1)], labels[edge.group(2)]))
+        self.assertEqual(set(labels.values()), NODES)
+        self.assertEqual(edges, EDGES)
+
+    def test_graphml(self):
+        namespace = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+        root = ElementTree.fromstring(export('graphml').encode('utf-8'))
+        names = {}
+        for node in root.iterfind('g:graph/g:node', namespace):
+            names[node.get('id')] = node.find("g:data[@key='name']", namespace).text
+            if node.find("g:data[@key='root']", namespace) is not None:
+                self.assertEqual(names[node.get('id')], 'py3-foo')
+        edges = {(names[edge.get('source')], names[edge.get('target')])
+                 for edge in root.iterfind('g:graph/g:edge', namespace)}
+        self.assertEqual(set(names.values()), NODES)
+        self.assertEqual(edges, EDGES)
+
+    def test_plantuml(self):
+        text = export('plantuml')
+        self.assertTrue(text.startswith('@startuml\n') and text.endswith('@enduml'))
+        self.assertIn("rectangle \"quote'name\" as quote_name", text)
+        for line in text.splitlines():
+            if line.startswith('rectangle'):
+                self.assertEqual(line.count('"'), 2, line)
+
+    def test_json(self):
+        self.assertEqual({tuple(edge) for edge in json.loads(export('json'))}, EDGES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from dependency_graph import DependencyGraph
+from graph_store import open_graph_store, write_graph_store
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records
+
+
+class GraphStoreTest(unittest.TestCase):
+    """MappedGraph из файла хранилища совпадает с исходным CompactGraph"""
+
+    def setUp(self):
+        records = generate_records(packages=400, seed=5)
+        # Имя не в ASCII и зависимость без записи в индексе
+        records.append({'P': 'пакет-ё', 'V': '1.0-r0', 'D': 'musl-missing ' + records[0]['P']})
+        self.source = DependencyGraph("", index=RepositoryIndex(records))
+        self.graph = self.source.get_compact_graph()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'repository.apkgraph')
+        write_graph_store(self.path, self.graph)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_arrays_and_lookups(self):
+        with open_graph_store(self.path) as mapped:
+            self.assertEqual(len(mapped), len(self.graph))
+            self.assertEqual(mapped.record_count(), self.graph.record_count())
+            self.assertEqual(list(mapped.names), list(self.graph.names))
+            self.assertEqual(list(mapped.offsets), list(self.graph.offsets))
+            self.assertEqual(list(mapped.targets), list(self.graph.targets))
+            self.assertEqual(bytes(mapped.has_record), bytes(self.graph.has_record))
+            for node_id, name in enumerate(self.graph.names):
+                self.assertEqual(mapped.node_id(name), node_id)
+            self.assertIsNone(mapped.node_id('no-such-package'))
+            self.assertIsNone(mapped.node_id(''))
+            self.assertEqual(dict(mapped.as_dict_view()), dict(self.graph.as_dict_view()))
+
+    def test_transpose(self):
+        reverse = self.graph.transpose()
+        with open_graph_store(self.path) as mapped:
+            mapped_reverse = mapped.transpose()
+            self.assertEqual(list(mapped_reverse.offsets), list(reverse.offsets))
+            self.assertEqual(list(mapped_reverse.targets), list(reverse.targets))
+            self.assertEqual(list(mapped_reverse.transpose().targets), list(self.graph.targets))
+
+    def test_queries_from_store(self):
+        store_builder = DependencyGraph(self.path)
+        root = self.graph.names[0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(store_builder.query_dependency_graph(root, None),
+                             self.source.query_dependency_graph(root, None))
+            self.assertEqual(store_builder.query_dependency_graph('пакет-ё', 2),
+                             self.source.query_dependency_graph('пакет-ё', 2))
+            self.assertEqual(store_builder.get_reverse_index().transitive(root, None),
+                             self.source.get_reverse_index().transitive(root, None))
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'r+b') as f:
+            f.write(b'NOTGRAPH')
+        with self.assertRaises(ValueError):
+            open_graph_store(self.path)
+        with self.assertRaises(FileNotFoundError):
+            open_graph_store(self.path + '.missing')
+
+
+if __name__ == "__main__":
+    unittest.main()
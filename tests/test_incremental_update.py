@@ -0,0 +1,108 @@
+import contextlib
+import copy
+import io
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from closure_cache import iter_bits
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records
+
+
+def build(records) -> DependencyGraph:
+    """Построитель графа с уже построенными полным графом и всеми индексами"""
+    graph_builder = DependencyGraph("", index=RepositoryIndex(records))
+    graph_builder.get_reverse_index()
+    graph_builder.get_reachability_index()
+    return graph_builder
+
+
+def closures(graph_builder: DependencyGraph):
+    """{пакет: множество имён его транзитивных зависимостей} по индексу достижимости"""
+    graph = graph_builder.get_compact_graph()
+    reachability = graph_builder.get_reachability_index()
+    return {name: {graph.names[node_id] for node_id in iter_bits(reachability.closure(graph.ids[name]))}
+            for name in graph.as_dict_view()}
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    """DependencyGraph.update_index совпадает с полной пересборкой по новому индексу"""
+
+    def setUp(self):
+        self.records = generate_records(packages=300)
+
+    def updated_records(self):
+        records = copy.deepcopy(self.records)
+        by_name = {record['P']: record for record in records}
+
+        # Изменённые зависимости (в том числе ребро, замыкающее новый цикл); пересобранный
+        # пакет получает новую контрольную сумму 'C', по которой update_index находит изменения
+        for name, dependencies in (('pkg-10', 'pkg-299 pkg-42'), ('pkg-299', 'pkg-10')):
+            by_name[name]['D'] = dependencies
+            by_name[name]['C'] = f"Q1rebuilt-{name}"
+        by_name['pkg-11']['V'] = '99.0-r0'
+        # Удалённый пакет, от которого зависят другие
+        dependency = next(name for record in records for name in record['D'].split()
+                          if name in by_name and name not in ('pkg-10', 'pkg-42', 'pkg-299'))
+        records.remove(by_name[dependency])
+        # Новый пакет и новый поставщик уже используемого виртуального имени
+        used = {name for record in records for name in record['D'].split()}
+        provided = next(record['p'] for record in records
+                        if record.get('p', '').split('=')[0] in used and record['P'] != dependency)
+        records.append({'P': 'pkg-new', 'V': '1.0-r0', 'D': 'pkg-3', 'p': provided, 'k': '100'})
+        return records
+
+    def test_update_matches_full_rebuild(self):
+        incremental = build(self.records)
+        new_records = self.updated_records()
+        with contextlib.redirect_stdout(io.StringIO()):
+            diff = incremental.update_index(RepositoryIndex(new_records))
+        rebuilt = build(new_records)
+
+        self.assertEqual(diff.added, {'pkg-new'})
+        self.assertEqual(len(diff.removed), 1)
+        self.assertIn('pkg-10', diff.changed)
+
+        self.assertEqual(dict(incremental.get_compact_graph().as_dict_view()),
+                         dict(rebuilt.get_compact_graph().as_dict_view()))
+        self.assertEqual(closures(incremental), closures(rebuilt))
+        # Пропатченные строки обратного графа совпадают с полным транспонированием
+        reverse = incremental.get_reverse_index().reverse
+        transposed = incremental.get_compact_graph().transpose()
+        self.assertEqual((reverse.offsets, reverse.targets), (transposed.offsets, transposed.targets))
+        for target in ('pkg-10', 'pkg-42', 'pkg-299', 'pkg-new'):
+            self.assertEqual(incremental.get_reverse_index().transitive(target),
+                             rebuilt.get_reverse_index().transitive(target))
+        for name in ('pkg-0', 'pkg-10', 'pkg-new'):
+            self.assertEqual(set(incremental.closure_names(incremental.get_closure(name))),
+                             set(rebuilt.closure_names(rebuilt.get_closure(name))))
+
+    def test_unchanged_index_is_empty_diff(self):
+        graph_builder = build(self.records)
+        graph = graph_builder.get_compact_graph()
+        diff = graph_builder.update_index(RepositoryIndex(copy.deepcopy(self.records)))
+
+        self.assertFalse(diff)
+        self.assertIs(graph_builder.get_compact_graph(), graph)
+
+    def test_update_after_failed_load_rebuilds_graph(self):
+        graph_builder = DependencyGraph("file:///nonexistent/repository")
+        with self.assertRaises(OSError), contextlib.redirect_stdout(io.StringIO()):
+            graph_builder.get_compact_graph()
+
+        diff = graph_builder.update_index(RepositoryIndex(self.records))
+        rebuilt = build(self.records)
+
+        self.assertEqual(len(diff.added), len(self.records))
+        self.assertEqual(dict(graph_builder.get_compact_graph().as_dict_view()),
+                         dict(rebuilt.get_compact_graph().as_dict_view()))
+        self.assertEqual(graph_builder.query_dependency_graph('pkg-0'), rebuilt.query_dependency_graph('pkg-0'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from apkindex_reader import iter_index_records
+from index_cache import IndexCache
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records, write_apkindex
+
+ETAG = '"apkindex-1"'
+
+
+class IndexRequestHandler(BaseHTTPRequestHandler):
+    """Отдаёт архив APKINDEX с ETag и отвечает 304 на совпадающий If-None-Match"""
+
+    archive = b''
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(self.archive)))
+        self.end_headers()
+        self.wfile.write(self.archive)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class IndexCacheTest(unittest.TestCase):
+    """Условная перепроверка локального кэша APKINDEX"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.records = generate_records(packages=200)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'APKINDEX.tar.gz')
+            write_apkindex(path, cls.records)
+            with open(path, 'rb') as f:
+                archive = f.read()
+
+        cls.handler = type('BoundIndexRequestHandler', (IndexRequestHandler,),
+                           {'archive': archive, 'requests': []})
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), cls.handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.repository_url = f"http://127.0.0.1:{cls.server.server_address[1]}/main"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.handler.requests.clear()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = IndexCache(self.cache_dir.name)
+        self.parses = 0
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def parse(self, fileobj):
+        self.parses += 1
+        return RepositoryIndex(iter_index_records(fileobj))
+
+    def get_index(self) -> RepositoryIndex:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.cache.get_index(self.repository_url, 'x86_64', self.parse)
+
+    def test_not_modified_loads_snapshot(self):
+        first = self.get_index()
+        second = self.get_index()
+
+        self.assertEqual(self.handler.requests, [None, ETAG])
+        self.assertEqual(self.parses, 1)
+        self.assertEqual(list(second.packages), list(first.packages))
+        self.assertEqual(len(second), len(self.records))
+
+    def test_corrupt_snapshot_is_refetched(self):
+        first = self.get_index()
+        snapshot = self.cache._paths(self.repository_url, 'x86_64')['snapshot']
+        with open(snapshot, 'wb') as f:
+            f.write(b'not a pickle')
+
+        second = self.get_index()
+
+        # Ответ 304 на условный запрос, затем безусловная загрузка
+        self.assertEqual(self.handler.requests, [None, ETAG, None])
+        self.assertEqual(self.parses, 2)
+        self.assertEqual(list(second.packages), list(first.packages))
+        # Снимок перезаписан и снова используется
+        self.get_index()
+        self.assertEqual(self.parses, 2)
+
+    def test_snapshot_import_and_type_errors_are_refetched(self):
+        self.get_index()
+        snapshot = self.cache._paths(self.repository_url, 'x86_64')['snapshot']
+        for garbage in (b'cmissing_module\nRepositoryIndex\n.', b'\x80\x04K\x01)R.'):
+            with open(snapshot, 'wb') as f:
+                f.write(garbage)
+            self.get_index()
+        self.assertEqual(self.parses, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
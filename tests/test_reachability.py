@@ -0,0 +1,60 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from batch import BatchResolver
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from synthetic_repository import generate_records
+
+
+def bfs_closure(graph_builder: DependencyGraph, package: str) -> set:
+    """Транзитивные зависимости пакета (включая его самого) обходом в ширину"""
+    graph = graph_builder.query_dependency_graph(package, None)
+    return set(graph) | {dep for deps in graph.values() for dep in deps}
+
+
+class ReachabilityQueriesTest(unittest.TestCase):
+    """depends_on и filter_depending_on совпадают с обходом в ширину"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.graph_builder = DependencyGraph("", index=RepositoryIndex(generate_records(packages=300, seed=7)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.packages = sorted(cls.graph_builder.get_compact_graph().as_dict_view())
+            cls.closures = {package: bfs_closure(cls.graph_builder, package) for package in cls.packages}
+
+    def test_depends_on_matches_bfs(self):
+        for package in self.packages[::7]:
+            for dependency in self.packages[::11]:
+                self.assertEqual(self.graph_builder.depends_on(package, dependency),
+                                 dependency in self.closures[package], (package, dependency))
+
+    def test_filter_depending_on_matches_bfs(self):
+        candidates = self.packages[::-1] + ['no-such-package']
+        for dependency in self.packages[::13]:
+            expected = [package for package in candidates[:-1] if dependency in self.closures[package]]
+            self.assertEqual(self.graph_builder.filter_depending_on(candidates, dependency), expected)
+
+    def test_unknown_packages(self):
+        self.assertFalse(self.graph_builder.depends_on('no-such-package', self.packages[0]))
+        self.assertEqual(self.graph_builder.filter_depending_on(self.packages, 'no-such-package'), [])
+
+    def test_batch_depends_on(self):
+        dependency = max(self.packages, key=lambda name: sum(name in c for c in self.closures.values()))
+        out = io.StringIO()
+        count = BatchResolver(self.graph_builder).write_jsonl(out, self.packages, depends_on=dependency)
+        roots = [json.loads(line)['root'] for line in out.getvalue().splitlines()]
+        self.assertEqual(roots, [package for package in self.packages if dependency in self.closures[package]])
+        self.assertEqual(count, len(roots))
+        self.assertTrue(1 < count < len(self.packages))
+
+
+if __name__ == "__main__":
+    unittest.main()
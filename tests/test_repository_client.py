@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from index_cache import IndexCache
+from repository_client import AsyncRepositoryClient
+from synthetic_repository import generate_records, write_apkindex, write_repository
+
+ETAG = '"apkindex-1"'
+
+
+def repository_records(prefix: str, packages: int):
+    records = generate_records(packages=packages)
+    for record in records:
+        record['P'] = f"{prefix}-{record['P']}"
+    return records
+
+
+class KeepAliveIndexHandler(BaseHTTPRequestHandler):
+    """Keep-alive сервер APKINDEX с ETag: считает соединения и условные запросы"""
+
+    protocol_version = 'HTTP/1.1'
+    archives = {}
+    connections = []
+    requests = []
+
+    def setup(self):
+        self.connections.append(self.client_address)
+        super().setup()
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        archive = self.archives.get(self.path)
+        if archive is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+        else:
+            self.send_response(200)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(archive)))
+        self.end_headers()
+        if archive is not None and self.headers.get('If-None-Match') != ETAG:
+            self.wfile.write(archive)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AsyncRepositoryClientTest(unittest.TestCase):
+    """Загрузка нескольких репозиториев: пул соединений, кэш и file://"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load(self, client: AsyncRepositoryClient):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return client.load_index()
+
+    def test_file_repositories(self):
+        urls = [write_repository(os.path.join(self.directory.name, name), repository_records(name, 50))
+                for name in ('main', 'community')]
+
+        index = self.load(AsyncRepositoryClient(urls))
+
+        self.assertEqual(len(index), 100)
+        self.assertIn('main-pkg-0', index)
+        self.assertIn('community-pkg-49', index)
+
+    def test_cached_revalidation_reuses_pooled_connection(self):
+        archives = {}
+        for name in ('main', 'community'):
+            path = os.path.join(self.directory.name, f"{name}.tar.gz")
+            write_apkindex(path, repository_records(name, 50))
+            with open(path, 'rb') as f:
+                archives[f"/{name}/x86_64/APKINDEX.tar.gz"] = f.read()
+        handler = type('BoundHandler', (KeepAliveIndexHandler,),
+                       {'archives': archives, 'connections': [], 'requests': []})
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        cache = IndexCache(os.path.join(self.directory.name, 'cache'))
+        # Одно соединение: обе загрузки идут по очереди через один keep-alive сокет
+        client = AsyncRepositoryClient([f"{base_url}/main", f"{base_url}/community"],
+                                       max_connections=1, cache=cache)
+
+        first = self.load(client)
+        second = self.load(client)
+
+        self.assertEqual(list(second.packages), list(first.packages))
+        self.assertEqual(len(handler.connections), 1)
+        self.assertEqual([etag for _, etag in handler.requests], [None, None, ETAG, ETAG])
+        self.assertTrue(os.listdir(cache.cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
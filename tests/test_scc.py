@@ -0,0 +1,94 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scc import strongly_connected_components
+
+
+def assert_dependencies_first(test: unittest.TestCase, result) -> None:
+    """Каждое ребро ведёт в компоненту с номером не больше своего"""
+    graph, component_of = result.graph, result.component_of
+    for node_id in range(len(graph)):
+        for target in graph.successors(node_id):
+            test.assertGreaterEqual(component_of[node_id], component_of[target],
+                                    (graph.names[node_id], graph.names[target]))
+
+
+def reachable(graph, start):
+    seen, stack = {start}, [start]
+    while stack:
+        for dep in graph.get(stack.pop(), ()):
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    return seen
+
+
+class StronglyConnectedComponentsTest(unittest.TestCase):
+    """Итеративный алгоритм Тарьяна"""
+
+    def test_self_loop(self):
+        result = strongly_connected_components({'A': ['A', 'B'], 'B': []})
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.cycle_groups(), [['A']])
+        self.assertEqual(result.topological_order(), ['B', 'A'])
+
+    def test_nested_cycles(self):
+        graph = {
+            'E': ['A'],
+            'A': ['B'],
+            'B': ['C', 'D'],
+            'C': ['A'],
+            'D': ['B', 'F'],
+            'F': ['G'],
+            'G': ['F', 'H'],
+            'H': [],
+        }
+        result = strongly_connected_components(graph)
+        self.assertEqual(sorted(map(sorted, result.cycle_groups())), [['A', 'B', 'C', 'D'], ['F', 'G']])
+        assert_dependencies_first(self, result)
+        order = result.topological_order()
+        self.assertLess(order.index('H'), order.index('F'))
+        self.assertLess(order.index('G'), order.index('D'))
+        self.assertEqual(order[-1], 'E')
+
+    def test_condensation_is_acyclic(self):
+        graph = {'A': ['B'], 'B': ['A', 'C'], 'C': ['D'], 'D': ['C'], 'E': ['A', 'D']}
+        condensed = strongly_connected_components(graph).condensation()
+        self.assertEqual(len(condensed), 3)
+        for component_id in range(len(condensed)):
+            self.assertTrue(all(target < component_id for target in condensed.successors(component_id)))
+
+    def test_matches_mutual_reachability(self):
+        rng = random.Random(16)
+        names = [f"p{i}" for i in range(60)]
+        graph = {name: rng.sample(names, rng.randint(0, 3)) for name in names}
+        result = strongly_connected_components(graph)
+        assert_dependencies_first(self, result)
+        closures = {name: reachable(graph, name) for name in names}
+        ids = result.graph.ids
+        for first in names:
+            for second in names:
+                mutual = second in closures[first] and first in closures[second]
+                self.assertEqual(result.component_of[ids[first]] == result.component_of[ids[second]], mutual)
+
+    def test_deep_chain_beyond_recursion_limit(self):
+        length = sys.getrecursionlimit() * 20
+        chain = {f"p{i}": [f"p{i + 1}"] for i in range(length)}
+        chain[f"p{length}"] = []
+        result = strongly_connected_components(chain)
+        self.assertEqual(len(result), length + 1)
+        self.assertEqual(result.topological_order()[0], f"p{length}")
+        assert_dependencies_first(self, result)
+
+        chain[f"p{length}"] = ['p0']
+        result = strongly_connected_components(chain)
+        self.assertEqual(len(result), 1)
+        self.assertTrue(result.is_cyclic(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
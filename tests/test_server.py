@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from server import QueryService, ReadWriteLock, create_server
+
+TEST_REPOSITORY = os.path.join(os.path.dirname(__file__), '..', 'test_repository.txt')
+
+
+def new_builder() -> DependencyGraph:
+    return DependencyGraph(TEST_REPOSITORY, max_depth=4, test_mode=True)
+
+
+class QueryServerTest(unittest.TestCase):
+    """HTTP-запросы к серверу на тестовом репозитории"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = create_server(new_builder(), port=0)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path: str):
+        try:
+            with urllib.request.urlopen(self.base_url + path) as response:
+                return response.status, response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8')
+
+    def test_deps(self):
+        status, body = self.get('/deps?package=X')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['graph'], {'X': ['Y', 'Z'], 'Y': [], 'Z': []})
+
+    def test_rdeps_transitive(self):
+        status, body = self.get('/rdeps?package=C&depth=all')
+        self.assertEqual(status, 200)
+        self.assertEqual(set(json.loads(body)['reverse_dependencies']), {'A', 'B', 'C', 'N'})
+
+    def test_cycles(self):
+        status, body = self.get('/cycles?package=A')
+        self.assertEqual(status, 200)
+        self.assertTrue(any({'A', 'B', 'C'} <= set(cycle) for cycle in json.loads(body)['cycles']))
+
+    def test_render_ascii(self):
+        status, body = self.get('/render?package=X&format=ascii')
+        self.assertEqual(status, 200)
+        self.assertEqual(body.splitlines(), ['└── X', '    ├── Y', '    └── Z'])
+
+    def test_depends(self):
+        status, body = self.get('/depends?package=N&on=H')
+        self.assertEqual(status, 200)
+        self.assertTrue(json.loads(body)['depends_on'])
+        self.assertFalse(json.loads(self.get('/depends?package=X&on=A')[1])['depends_on'])
+        self.assertEqual(self.get('/depends?package=X')[0], 400)
+        self.assertEqual(self.get('/depends?package=X&on=missing')[0], 404)
+
+    def test_errors(self):
+        self.assertEqual(self.get('/deps?package=missing')[0], 404)
+        self.assertEqual(self.get('/deps')[0], 400)
+        self.assertEqual(self.get('/deps?package=A&depth=0')[0], 400)
+        self.assertEqual(self.get('/render?package=A&format=svg')[0], 400)
+        self.assertEqual(self.get('/unknown')[0], 404)
+
+
+class QueryServiceTest(unittest.TestCase):
+    """Обработка ошибок и прогрев сервиса без HTTP"""
+
+    def test_internal_error_is_500(self):
+        service = QueryService(new_builder())
+        service.warm_up()
+
+        def broken(package, depth):
+            raise KeyError(package)
+
+        service.graph_builder.query_dependency_graph = broken
+        status, _, body = service.handle('/deps', {'package': 'A'})
+        self.assertEqual(status, 500)
+        self.assertIn('error', json.loads(body))
+
+    def test_resolve(self):
+        records = [{'P': 'foo', 'V': version} for version in ('1.2', '1.3-r1', '2.0')]
+        service = QueryService(DependencyGraph("", index=RepositoryIndex(records)))
+        status, _, body = service.handle('/resolve', {'dependency': 'foo<2'})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {'dependency': 'foo<2', 'package': 'foo', 'version': '1.3-r1'})
+        self.assertEqual(service.handle('/resolve', {'dependency': 'foo>2.0'})[0], 404)
+        self.assertEqual(service.handle('/resolve', {})[0], 400)
+
+    def test_warm_up_fails_on_missing_index(self):
+        service = QueryService(DependencyGraph('missing_repository.txt', test_mode=True))
+        with self.assertRaises(RuntimeError):
+            service.warm_up()
+
+
+class ReadWriteLockTest(unittest.TestCase):
+    """Много читателей одновременно, ожидающий писатель не пропускает новых читателей"""
+
+    def start(self, target) -> threading.Thread:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_share_lock(self):
+        lock = ReadWriteLock()
+        lock.acquire_read()
+        entered = threading.Event()
+        reader = self.start(lambda: (lock.acquire_read(), entered.set(), lock.release_read()))
+        self.assertTrue(entered.wait(1))
+        reader.join(1)
+        lock.release_read()
+
+    def test_waiting_writer_blocks_new_readers(self):
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_read()
+
+        def write():
+            lock.acquire_write()
+            events.append('write')
+            lock.release_write()
+
+        def read():
+            lock.acquire_read()
+            events.append('read')
+            lock.release_read()
+
+        writer = self.start(write)
+        while not lock._writers_waiting:
+            time.sleep(0.001)
+        reader = self.start(read)
+        time.sleep(0.05)
+        # Новый читатель ждёт, пока писатель не получит блокировку
+        self.assertEqual(events, [])
+
+        lock.release_read()
+        writer.join(1)
+        reader.join(1)
+        self.assertEqual(events, ['write', 'read'])
+
+
+if __name__ == "__main__":
+    unittest.main()
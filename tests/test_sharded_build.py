@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from dependency_graph import DependencyGraph
+from repository_index import RepositoryIndex
+from sharded_build import build_compact_graph_sharded, shard_of
+from synthetic_repository import generate_records
+
+TEST_REPOSITORY = os.path.join(os.path.dirname(__file__), '..', 'test_repository.txt')
+
+
+class ShardedBuildTest(unittest.TestCase):
+    """Сборка в пуле процессов даёт те же CSR-массивы, что и последовательная"""
+
+    def assert_same_graph(self, sharded, serial):
+        self.assertEqual(list(sharded.names), list(serial.names))
+        self.assertEqual(list(sharded.offsets), list(serial.offsets))
+        self.assertEqual(list(sharded.targets), list(serial.targets))
+        self.assertEqual(bytes(sharded.has_record), bytes(serial.has_record))
+
+    def test_synthetic_repository(self):
+        records = generate_records(packages=600, seed=9)
+        # Зависимости вне индекса в разных шардах: одно имя должно получить один идентификатор
+        records += [{'P': f"extra-{i}", 'V': '1', 'D': f"missing-{i % 3} pkg-{i} missing-shared"}
+                    for i in range(12)]
+        index = RepositoryIndex(records)
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial = DependencyGraph("", index=index).get_compact_graph()
+            for processes in (2, 3):
+                with self.subTest(processes=processes):
+                    self.assert_same_graph(build_compact_graph_sharded(index, processes), serial)
+        self.assertGreater(len(serial), len(index))
+
+    def test_test_repository(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial = DependencyGraph(TEST_REPOSITORY, test_mode=True).get_compact_graph()
+            sharded = DependencyGraph(TEST_REPOSITORY, test_mode=True, build_processes=2).get_compact_graph()
+        self.assert_same_graph(sharded, serial)
+
+    def test_shards_cover_all(self):
+        self.assertEqual({shard_of(f"pkg-{i}", 4) for i in range(100)}, {0, 1, 2, 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
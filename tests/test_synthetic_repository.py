@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from apk_parser import APKParser
+from compact_graph import CompactGraph
+from repository_index import RepositoryIndex
+from scc import strongly_connected_components
+from synthetic_repository import generate_records
+
+
+def cycle_groups(records):
+    """Группы циклов полного графа синтетического репозитория"""
+    parser = APKParser("", index=RepositoryIndex(records))
+    graph = CompactGraph.from_dict(parser.get_all_dependencies())
+    return strongly_connected_components(graph).cycle_groups()
+
+
+class GenerateRecordsTest(unittest.TestCase):
+    """Генератор синтетических репозиториев для бенчмарков"""
+
+    def test_default_parameters_produce_cycles(self):
+        self.assertGreater(len(cycle_groups(generate_records(packages=2000))), 0)
+
+    def test_zero_cycle_density_is_acyclic(self):
+        self.assertEqual(cycle_groups(generate_records(packages=2000, cycle_density=0)), [])
+
+    def test_same_seed_same_records(self):
+        self.assertEqual(generate_records(packages=300), generate_records(packages=300))
+
+
+if __name__ == "__main__":
+    unittest.main()
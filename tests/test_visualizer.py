@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from visualizer import GraphVisualizer
+
+
+def tree(graph, root, **limits):
+    return list(GraphVisualizer().iter_ascii_tree(graph, root, **limits))
+
+
+class AsciiTreeTest(unittest.TestCase):
+    """ASCII-дерево: циклы, общие поддеревья и ограничения вывода"""
+
+    def test_cycle_and_shared_subtree(self):
+        graph = {'A': ['B', 'C'], 'B': ['C', 'D'], 'C': ['A', 'E'], 'D': [], 'E': []}
+        self.assertEqual(tree(graph, 'A'), [
+            '└── A',
+            '    ├── B',
+            '    │   ├── C',
+            '    │   │   ├── A ↺ (цикл)',
+            '    │   │   └── E',
+            '    │   └── D',
+            '    └── C (см. выше)',
+        ])
+
+    def test_diamond_is_not_a_cycle(self):
+        graph = {'A': ['B', 'C'], 'B': ['D'], 'C': ['D'], 'D': []}
+        lines = tree(graph, 'A')
+        self.assertIn('    │   └── D', lines)
+        self.assertIn('        └── D (см. выше)', lines)
+        self.assertFalse(any('цикл' in line for line in lines))
+
+    def test_truncated_node_is_expanded_later(self):
+        # X сначала встречается глубже max_depth, затем ближе к корню
+        graph = {'R': ['A', 'X'], 'A': ['B'], 'B': ['X'], 'X': ['Y'], 'Y': []}
+        self.assertEqual(tree(graph, 'R', max_depth=3), [
+            '└── R',
+            '    ├── A',
+            '    │   └── B',
+            '    │       └── X [+1]',
+            '    └── X',
+            '        └── Y',
+        ])
+
+    def test_max_lines(self):
+        graph = {'A': [f"P{i}" for i in range(10)]}
+        lines = tree(graph, 'A', max_lines=4)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[-1], '    … (вывод ограничен: 4 строк)')
+
+    def test_deep_chain_without_recursion(self):
+        depth = sys.getrecursionlimit() + 100
+        graph = {f"P{i}": [f"P{i + 1}"] for i in range(depth)}
+        graph[f"P{depth}"] = []
+        out = io.StringIO()
+        GraphVisualizer().write_ascii_tree(out, graph, 'P0')
+        self.assertEqual(len(out.getvalue().splitlines()), depth + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
-from typing import Dict, List, Set
-from collections import deque
+import io
+from typing import Dict, List, Set, Optional, TextIO, Iterator, Tuple
+from scc import find_cycle_groups
+from exporters import write_plantuml, export_graph
+from profiler import PROFILER, span, count
 
 class GraphVisualizer:
     """Класс для визуализации графа зависимостей"""
@@ -20,110 +23,150 @@ class GraphVisualizer:
         Returns:
             str: PlantUML код
         """
-        plantuml_code = ["@startuml", "skinparam monochrome true", "skinparam shadowing false"]
-        
-        # Добавляем все узлы
-        all_packages = set(graph.keys())
-        for deps in graph.values():
-            all_packages.update(deps)
-        
-        if reverse_deps:
-            all_packages.update(reverse_deps.keys())
-            for deps in reverse_deps.values():
-                all_packages.update(deps)
-        
-        # Создаем узлы
-        for package in sorted(all_packages):
-            if package == root_package:
-                plantuml_code.append(f"rectangle \"{package}\" as {package} #lightblue")
-            elif package in graph:
-                plantuml_code.append(f"rectangle \"{package}\" as {package}")
-            else:
-                plantuml_code.append(f"rectangle \"{package}\" as {package} #pink")
-        
-        # Добавляем прямые зависимости
-        for package, dependencies in graph.items():
-            for dep in dependencies:
-                plantuml_code.append(f"{package} --> {dep}")
+        out = io.StringIO()
+        self.write_plantuml(out, graph, root_package, reverse_deps)
+        return out.getvalue()
+    
+    def write_plantuml(self, out: TextIO, graph: Dict[str, List[str]], root_package: str,
+                       reverse_deps: Dict[str, List[str]] = None) -> None:
+        """
+        Записывает описание графа на языке PlantUML в файловый объект по мере генерации
         
-        # Добавляем обратные зависимости (если есть)
-        if reverse_deps:
-            for package, deps in reverse_deps.items():
-                for dep in deps:
-                    plantuml_code.append(f"{package} -[dashed]-> {dep} : reverse")
+        Args:
+            out: Файловый объект для записи
+            graph: Граф зависимостей
+            root_package: Корневой пакет
+            reverse_deps: Обратные зависимости
+        """
+        with span('render.plantuml'):
+            write_plantuml(out, graph, root_package, reverse_deps, sort_nodes=True)
+        self._count_edges('plantuml', graph)
+    
+    def export(self, out: TextIO, graph: Dict[str, List[str]], root_package: str,
+               export_format: str = "plantuml", condensed: bool = False,
+               max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> None:
+        """
+        Потоково экспортирует граф в PlantUML, DOT, GraphML или JSON
         
-        plantuml_code.append("@enduml")
-        return "\n".join(plantuml_code)
+        Args:
+            out: Файловый объект для записи
+            graph: Граф зависимостей
+            root_package: Корневой пакет
+            export_format: Формат экспорта (plantuml, dot, graphml, json)
+            condensed: Экспортировать только граф компонент сильной связности
+            max_depth: Ограничение глубины подграфа от корня
+            max_nodes: Ограничение числа раскрываемых узлов
+        """
+        with span('render.export'):
+            export_graph(out, graph, export_format, root_package,
+                         condensed=condensed, max_depth=max_depth, max_nodes=max_nodes)
+        self._count_edges('export', graph)
     
-    def generate_ascii_tree(self, graph: Dict[str, List[str]], root_package: str) -> str:
+    def generate_ascii_tree(self, graph: Dict[str, List[str]], root_package: str,
+                            max_depth: Optional[int] = None, max_lines: Optional[int] = None) -> str:
         """
         Генерирует ASCII-дерево зависимостей
         
         Args:
             graph: Граф зависимостей
             root_package: Корневой пакет
+            max_depth: Максимальная глубина раскрытия (None - без ограничения)
+            max_lines: Максимальное число строк (None - без ограничения)
             
         Returns:
             str: ASCII-дерево
         """
+        with span('render.ascii'):
+            lines = list(self.iter_ascii_tree(graph, root_package, max_depth, max_lines))
+        count('render.ascii_lines', len(lines))
+        return "\n".join(lines)
+    
+    def write_ascii_tree(self, out: TextIO, graph: Dict[str, List[str]], root_package: str,
+                         max_depth: Optional[int] = None, max_lines: Optional[int] = None) -> None:
+        """Записывает ASCII-дерево в файловый объект построчно"""
+        lines = 0
+        with span('render.ascii'):
+            for line in self.iter_ascii_tree(graph, root_package, max_depth, max_lines):
+                out.write(line + "\n")
+                lines += 1
+        count('render.ascii_lines', lines)
+    
+    def iter_ascii_tree(self, graph: Dict[str, List[str]], root_package: str,
+                        max_depth: Optional[int] = None, max_lines: Optional[int] = None) -> Iterator[str]:
+        """
+        Итеративно строит ASCII-дерево, возвращая строки по одной
+        
+        Каждое поддерево выводится один раз: повторная встреча пакета на
+        текущем пути помечается как цикл, а в другой ветке - ссылкой на уже
+        выведенное поддерево. Поэтому размер вывода не превышает числа рёбер
+        графа, а глубина обхода не ограничена стеком рекурсии.
+        """
         if root_package not in graph:
-            return f"{root_package}\n└── (нет зависимостей)"
+            yield f"{root_package}"
+            yield "└── (нет зависимостей)"
+            return
+        
+        printed = {root_package}
+        path = {root_package}
+        lines = 1
+        yield f"└── {root_package}"
         
-        tree_lines = []
-        visited = set()
+        # Стек кадров: (пакет, префикс потомков, глубина, итератор по потомкам)
+        stack = [(root_package, "    ", 1, iter(self._children(graph, root_package)))]
         
-        def build_tree(node: str, prefix: str = "", is_last: bool = True):
-            if node in visited:
-                tree_lines.append(f"{prefix}└── {node} ↺ (цикл)")
+        while stack:
+            node, prefix, depth, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                path.discard(node)
+                continue
+            
+            if max_lines is not None and lines >= max_lines:
+                yield f"{prefix}… (вывод ограничен: {max_lines} строк)"
                 return
+            lines += 1
             
-            visited.add(node)
+            child_name, is_last = child
             connector = "└── " if is_last else "├── "
-            tree_lines.append(f"{prefix}{connector}{node}")
             
-            if node in graph and graph[node]:
-                new_prefix = prefix + ("    " if is_last else "│   ")
-                children = graph[node]
-                for i, child in enumerate(children):
-                    build_tree(child, new_prefix, i == len(children) - 1)
-        
-        build_tree(root_package)
-        return "\n".join(tree_lines)
+            if child_name in path:
+                yield f"{prefix}{connector}{child_name} ↺ (цикл)"
+                continue
+            if child_name in printed:
+                yield f"{prefix}{connector}{child_name} (см. выше)"
+                continue
+            
+            grandchildren = graph.get(child_name) or []
+            if grandchildren and max_depth is not None and depth >= max_depth:
+                # Поддерево не раскрыто: ссылка «см. выше» на этот пакет была бы пустой
+                yield f"{prefix}{connector}{child_name} [+{len(grandchildren)}]"
+                continue
+            
+            printed.add(child_name)
+            yield f"{prefix}{connector}{child_name}"
+            if grandchildren:
+                path.add(child_name)
+                stack.append((child_name, prefix + ("    " if is_last else "│   "), depth + 1,
+                              iter(self._children(graph, child_name))))
+    
+    def _count_edges(self, writer: str, graph: Dict[str, List[str]]) -> None:
+        """Учитывает в профиле число рёбер, выведенных одним способом визуализации"""
+        if PROFILER.enabled:
+            count(f'render.{writer}_edges', sum(len(deps) for deps in graph.values()))
+    
+    def _children(self, graph: Dict[str, List[str]], node: str) -> Iterator[Tuple[str, bool]]:
+        """Потомки узла: (имя, является ли последним)"""
+        children = graph.get(node) or []
+        last = len(children) - 1
+        for index, child in enumerate(children):
+            yield child, index == last
     
     def find_cycles(self, graph: Dict[str, List[str]]) -> List[List[str]]:
         """
         Находит циклы в графе для пометки в ASCII-дереве
-        """
-        cycles = []
-        visited = set()
-        recursion_stack = set()
-        path = []
         
-        def dfs(node):
-            if node in recursion_stack:
-                # Найден цикл
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:]
-                if cycle not in cycles:
-                    cycles.append(cycle.copy())
-                return
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            recursion_stack.add(node)
-            path.append(node)
-            
-            if node in graph:
-                for neighbor in graph[node]:
-                    dfs(neighbor)
-            
-            path.pop()
-            recursion_stack.remove(node)
-        
-        for node in graph:
-            if node not in visited:
-                dfs(node)
-        
-        return cycles
\ No newline at end of file
+        Каждая группа - компонента сильной связности из нескольких пакетов
+        (или пакет с зависимостью на самого себя).
+        """
+        return find_cycle_groups(graph)